@@ -0,0 +1,195 @@
+"""
+Server move-selection strategies
+
+Every strategy exposes ``choose_move(game)`` and returns the ``(row, col)`` it
+wants to play for the server, or None when the board is full. Minimax-based
+strategies share a single process-wide transposition table keyed by the
+symmetry-canonical form of the position, so every game warms the same cache.
+"""
+import random
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from app.bitboard import FULL_BOARD, WIN_LINES
+
+
+WIN_SCORE = 10
+
+# The 8 symmetries of the square as cell permutations: new_cell = transform[old_cell]
+_TRANSFORMS: List[Tuple[int, ...]] = []
+for _turns in range(4):
+    for _mirror in (False, True):
+        _cells = []
+        for _cell in range(9):
+            _row, _col = divmod(_cell, 3)
+            if _mirror:
+                _col = 2 - _col
+            for _ in range(_turns):
+                _row, _col = _col, 2 - _row
+            _cells.append(_row * 3 + _col)
+        _TRANSFORMS.append(tuple(_cells))
+
+# For each symmetry, a 512-entry table mapping a bitboard to its transformed bitboard
+_BIT_TRANSFORMS: List[Tuple[int, ...]] = [
+    tuple(
+        sum(1 << transform[cell] for cell in range(9) if bits & (1 << cell))
+        for bits in range(FULL_BOARD + 1)
+    )
+    for transform in _TRANSFORMS
+]
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# canonical key -> (depth, flag, value); shared by every game in the process
+transposition_table: Dict[int, Tuple[int, int, int]] = {}
+
+
+def canonical_key(own_bits: int, other_bits: int) -> int:
+    """Smallest packed encoding of the position over all 8 board symmetries"""
+    return min(table[own_bits] | (table[other_bits] << 9) for table in _BIT_TRANSFORMS)
+
+
+def _has_line(bits: int) -> bool:
+    for line in WIN_LINES:
+        if bits & line == line:
+            return True
+    return False
+
+
+def negamax(own_bits: int, other_bits: int, depth: int, alpha: int, beta: int) -> int:
+    """
+    Score a position for the side to move with alpha-beta search
+    
+    ``own_bits`` belongs to the side to move and ``other_bits`` to the side that
+    just moved. Wins score ``WIN_SCORE`` plus the number of empty cells, so faster
+    wins rank higher; positions cut off by ``depth`` score 0.
+    """
+    occupied = own_bits | other_bits
+    empty = 9 - bin(occupied).count('1')
+    if _has_line(other_bits):
+        return -(WIN_SCORE + empty)
+    if empty == 0 or depth == 0:
+        return 0
+        
+    alpha_orig = alpha
+    key = canonical_key(own_bits, other_bits)
+    entry = transposition_table.get(key)
+    if entry is not None and entry[0] >= depth:
+        _, flag, value = entry
+        if flag == EXACT:
+            return value
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+            
+    best = -WIN_SCORE * 2
+    for cell in range(9):
+        bit = 1 << cell
+        if occupied & bit:
+            continue
+        value = -negamax(other_bits, own_bits | bit, depth - 1, -beta, -alpha)
+        if value > best:
+            best = value
+        if best > alpha:
+            alpha = best
+        if alpha >= beta:
+            break
+            
+    if best <= alpha_orig:
+        flag = UPPER
+    elif best >= beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    transposition_table[key] = (depth, flag, best)
+    return best
+
+
+class Strategy(ABC):
+    """Base class for server move-selection strategies"""
+    
+    name = ''
+    
+    def supports(self, size: int, k: int) -> bool:
+        """Whether the strategy can play on a ``size`` x ``size`` board with ``k`` in a row"""
+        return True
+        
+    @abstractmethod
+    def choose_move(self, game) -> Optional[Tuple[int, int]]:
+        """The ``(row, col)`` to play for the server, or None when the board is full"""
+
+
+class RandomStrategy(Strategy):
+    """Pick uniformly among the available positions"""
+    
+    name = 'random'
+    
+    def choose_move(self, game) -> Optional[Tuple[int, int]]:
+        return game.random_position()
+
+
+class MinimaxStrategy(Strategy):
+    """
+    Negamax with alpha-beta pruning and the shared transposition table
+    
+    With ``max_depth=None`` the search reaches the end of the game and plays
+    perfectly; smaller depths give weaker, cheaper opponents. Equally scored
+    moves are chosen at random so games do not all look the same.
+    """
+    
+    def __init__(self, name: str, max_depth: Optional[int] = None):
+        self.name = name
+        self.max_depth = max_depth
+        
+    def supports(self, size: int, k: int) -> bool:
+        return size == 3 and k == 3
+        
+    def choose_move(self, game) -> Optional[Tuple[int, int]]:
+        own_bits = game.server_bits
+        other_bits = game.player_bits
+        occupied = own_bits | other_bits
+        empty = 9 - bin(occupied).count('1')
+        if empty == 0:
+            return None
+        depth = empty if self.max_depth is None else min(self.max_depth, empty)
+        
+        best_value = None
+        best_cells: List[int] = []
+        for cell in range(9):
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            value = -negamax(other_bits, own_bits | bit, depth - 1, -WIN_SCORE * 2, WIN_SCORE * 2)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_cells = [cell]
+            elif value == best_value:
+                best_cells.append(cell)
+                
+        return divmod(random.choice(best_cells), 3)
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    strategy.name: strategy
+    for strategy in (
+        RandomStrategy(),
+        MinimaxStrategy('easy', max_depth=1),
+        MinimaxStrategy('medium', max_depth=3),
+        MinimaxStrategy('perfect'),
+    )
+}
+
+DEFAULT_STRATEGY = 'random'
+
+
+def get_strategy(name: str) -> Strategy:
+    """Look up a strategy by name, raising ValueError if it is unknown"""
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown strategy '{name}'. Choose one of: {', '.join(sorted(STRATEGIES))}"
+        ) from None
@@ -0,0 +1,449 @@
+"""
+asyncio server mode for Tic-Tac-Toe game
+
+Serves the same routes as app.server, backed by the same GameManager, from a
+single event loop with a small HTTP/1.1 implementation on asyncio streams. An
+idle keep-alive connection costs one suspended coroutine rather than one
+thread, so a process can hold tens of thousands of them.
+
+Game operations are short and CPU-bound and run directly on the loop while
+games are kept only in memory. When the store does disk I/O (TICTACTOE_DB,
+TICTACTOE_ARCHIVE_DB or the TICTACTOE_WAL_DIR move log) they are handed to a
+thread pool instead, which also lets concurrent moves share one log fsync.
+"""
+import asyncio
+import logging
+import re
+import sys
+import threading
+import time
+from http import HTTPStatus
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from app import json_provider, metrics, server, service
+from app.storage import MemoryGameStore
+from app.websocket import WebSocket, handshake_response
+
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+IDLE_TIMEOUT = 300.0
+MAX_PUSH_BUFFER = 256 * 1024
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+_compact = json_provider.dumps
+_dumps = json_provider.dumps_bytes
+
+
+def _event(kind: str, body: dict) -> str:
+    return json_provider.dumps({'type': kind, **body})
+
+
+class Hub:
+    """
+    Open WebSocket connections per game
+    
+    Every successful move in a game, whether made over a WebSocket or over
+    HTTP, is pushed to all sockets watching that game. A socket whose unsent
+    backlog exceeds MAX_PUSH_BUFFER is closed rather than buffered forever.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sockets: Dict[str, Dict[WebSocket, asyncio.AbstractEventLoop]] = {}
+        
+    def subscribe(self, game_id: str, ws: WebSocket):
+        """Watch a game; call from the socket's event loop"""
+        with self._lock:
+            self._sockets.setdefault(game_id, {})[ws] = asyncio.get_running_loop()
+            
+    def unsubscribe(self, game_id: str, ws: WebSocket):
+        with self._lock:
+            sockets = self._sockets.get(game_id)
+            if sockets is not None:
+                sockets.pop(ws, None)
+                if not sockets:
+                    del self._sockets[game_id]
+                    
+    def connections(self) -> int:
+        """Number of open WebSocket connections"""
+        with self._lock:
+            return sum(len(sockets) for sockets in self._sockets.values())
+            
+    def publish(self, body: dict):
+        """Push a move result to the game's watchers; safe to call from any thread"""
+        with self._lock:
+            sockets = list(self._sockets.get(body['game_id'], {}).items())
+        if not sockets:
+            return
+        message = _event('state' if body['status'] == 'in_progress' else 'game_over', body)
+        for ws, loop in sockets:
+            loop.call_soon_threadsafe(self._deliver, ws, message)
+            
+    @staticmethod
+    def _deliver(ws: WebSocket, message: str):
+        if ws.closed:
+            return
+        if ws.buffered() > MAX_PUSH_BUFFER:
+            logger.warning("Closing WebSocket that is not reading its updates")
+            asyncio.ensure_future(ws.close(CLOSE_TRY_AGAIN_LATER))
+        else:
+            ws.send(message)
+
+
+hub = Hub()
+
+
+def _create_game(games, match, query, data):
+    return service.create_game(games, data)
+
+
+def _list_games(games, match, query, data):
+    return service.list_games(games, query, server.DEFAULT_PAGE_SIZE, server.MAX_PAGE_SIZE)
+
+
+def _export_games(games, match, query, data):
+    after, status, winner, error = service.parse_list_args(query)
+    if error:
+        return error
+    return service.export_lines(games, after, status, winner, server.EXPORT_PAGE_SIZE, _compact), 200
+
+
+def _make_move(games, match, query, data):
+    body, status = service.play_move(games, match.group(1), data)
+    if status == 200:
+        hub.publish(body)
+    return body, status
+
+
+def _make_moves(games, match, query, data):
+    moves = data.get('moves') if isinstance(data, dict) else None
+    body, status = service.play_moves(games, moves, server.MAX_BATCH_SIZE)
+    for result in body.get('results', ()):
+        if result['code'] == 200:
+            hub.publish(result['body'])
+    return body, status
+
+
+def _game_moves(games, match, query, data):
+    return service.game_moves(games, match.group(1))
+
+
+def _health(games, match, query, data):
+    return service.health(games)
+
+
+def _metrics(games, match, query, data):
+    return metrics.render(games), 200
+
+
+# (method, path pattern, endpoint, handler); endpoints match the Flask view
+# names so metrics line up between modes. Handlers take the GameManager, the
+# path match, the query and the JSON body, and return (body, status code)
+# where body is a JSON-serialisable dict, a service.CachedJSON, a str of
+# Prometheus text or, for streaming routes, an iterator of str.
+ROUTES = [
+    ('POST', re.compile(r'/game'), 'create_game', _create_game),
+    ('GET', re.compile(r'/games'), 'get_all_games', _list_games),
+    ('GET', re.compile(r'/games/export'), 'export_games', _export_games),
+    ('POST', re.compile(r'/games/moves'), 'make_moves', _make_moves),
+    ('POST', re.compile(r'/game/([^/]+)/move'), 'make_move', _make_move),
+    ('GET', re.compile(r'/game/([^/]+)/moves'), 'get_game_moves', _game_moves),
+    ('GET', re.compile(r'/metrics'), 'get_metrics', _metrics),
+    ('GET', re.compile(r'/health'), 'health_check', _health),
+]
+WEBSOCKET_ROUTE = re.compile(r'/game/([^/]+)/ws')
+
+
+def _route(method: str, path: str):
+    """Return (endpoint, handler, match) for a request, or ('unmatched', None, status) if nothing matches"""
+    allowed = False
+    for route_method, pattern, endpoint, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if match:
+            if route_method == method:
+                return endpoint, handler, match
+            allowed = True
+    return 'unmatched', None, HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND
+
+
+def _offload(store) -> bool:
+    """Whether game operations on ``store`` may block on disk and belong in a thread"""
+    if not isinstance(store, MemoryGameStore):
+        return True
+    return store.archive is not None or store.wal is not None
+
+
+async def _call(games, fn, *args):
+    """Run ``fn(*args)`` for ``games``, in a thread if its store may block"""
+    if _offload(games.store):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    return fn(*args)
+
+
+def _head(status: int, headers: dict, keep_alive: bool) -> bytes:
+    lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}']
+    headers['Access-Control-Allow-Origin'] = '*'
+    headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool):
+    payload = _dumps(body)
+    writer.write(_head(status, {'Content-Type': 'application/json', 'Content-Length': len(payload)}, keep_alive) + payload)
+    await writer.drain()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == '*' or tag.strip('"') == etag:
+            return True
+    return False
+
+
+async def _respond_cached(writer: asyncio.StreamWriter, status: int, body: service.CachedJSON,
+                          if_none_match: Optional[str], keep_alive: bool) -> int:
+    """Send a CachedJSON, or 304 if the client has it already; returns the status sent"""
+    headers = {'ETag': f'"{body.etag}"'}
+    if _etag_matches(if_none_match, body.etag):
+        status, payload = 304, b''
+    else:
+        payload = body.render(_compact).encode()
+        headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = len(payload)
+    writer.write(_head(status, headers, keep_alive) + payload)
+    await writer.drain()
+    return status
+
+
+async def _respond_text(writer: asyncio.StreamWriter, status: int, text: str, keep_alive: bool):
+    payload = text.encode()
+    writer.write(_head(status, {'Content-Type': metrics.CONTENT_TYPE, 'Content-Length': len(payload)}, keep_alive) + payload)
+    await writer.drain()
+
+
+async def _stream(writer: asyncio.StreamWriter, games, lines, keep_alive: bool):
+    """Send an iterator of str with chunked transfer encoding"""
+    writer.write(_head(200, {'Content-Type': 'application/x-ndjson', 'Transfer-Encoding': 'chunked'}, keep_alive))
+    done = object()
+    while True:
+        line = await _call(games, next, lines, done)
+        if line is done:
+            break
+        data = line.encode()
+        writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+        await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader, idle_timeout: Optional[float]):
+    """
+    Read one request
+    
+    Returns:
+        Tuple of (method, target, version, headers, body), or None when the
+        client closed the connection or stayed idle for too long
+        
+    Raises:
+        ValueError: If the request is malformed or too large
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), idle_timeout)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError('request headers too large')
+    request_line, *header_lines = head[:-4].decode('latin-1').split('\r\n')
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise ValueError('malformed request line')
+    method, target, version = parts
+    headers = {}
+    for line in header_lines:
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise ValueError('malformed header')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise ValueError('invalid Content-Length')
+    if not 0 <= length <= MAX_BODY_BYTES:
+        raise ValueError('request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+def _json_body(headers: dict, body: bytes):
+    """Decoded JSON body, or None like Flask's ``get_json(silent=True)``"""
+    mimetype = headers.get('content-type', '').split(';')[0].strip().lower()
+    if not body or not (mimetype == 'application/json' or mimetype.endswith('+json')):
+        return None
+    try:
+        return json_provider.loads(body)
+    except ValueError:
+        return None
+
+
+async def _websocket(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, games, headers: dict, game_id: str):
+    """
+    Run the push channel for one game
+    
+    After the upgrade the client receives the game's current state, then a
+    'state' or 'game_over' event after every move in the game. It may send
+    {"row": r, "col": c} to play; invalid moves are answered with an 'error'
+    event to that client only.
+    """
+    key = headers.get('sec-websocket-key')
+    if headers.get('upgrade', '').lower() != 'websocket' or not key or headers.get('sec-websocket-version') != '13':
+        await _respond(writer, 400, {'error': 'Invalid request', 'details': 'expected a WebSocket upgrade'}, False)
+        return
+    state, status = await _call(games, service.game_state, games, game_id)
+    if status != 200:
+        await _respond(writer, status, state, False)
+        return
+        
+    writer.write(handshake_response(key))
+    ws = WebSocket(reader, writer)
+    hub.subscribe(game_id, ws)
+    logger.info("WebSocket opened for game %s", game_id)
+    try:
+        ws.send(_event('state' if state['status'] == 'in_progress' else 'game_over', state))
+        while True:
+            message = await ws.receive()
+            if message is None:
+                break
+            try:
+                data = json_provider.loads(message)
+            except ValueError:
+                data = None
+            started = time.perf_counter()
+            try:
+                body, status = await _call(games, service.play_move, games, game_id, data)
+            except Exception as e:
+                logger.error("Error making move in game %s: %s", game_id, e, exc_info=True)
+                body, status = {'error': 'Internal server error', 'details': str(e)}, 500
+            if status == 200:
+                hub.publish(body)
+            else:
+                ws.send(_event('error', {'code': status, **body}))
+            metrics.observe_request('websocket_move', status, time.perf_counter() - started)
+    finally:
+        hub.unsubscribe(game_id, ws)
+        await ws.close()
+        logger.info("WebSocket closed for game %s", game_id)
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, games,
+                            idle_timeout: Optional[float] = IDLE_TIMEOUT):
+    """Serve keep-alive requests for ``games`` (a GameManager) on one client connection until it closes"""
+    try:
+        while True:
+            try:
+                request = await _read_request(reader, idle_timeout)
+            except ValueError as e:
+                await _respond(writer, 400, {'error': 'Invalid request', 'details': str(e)}, False)
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+            
+            url = urlsplit(target)
+            path = unquote(url.path)
+            if method == 'OPTIONS':
+                writer.write(_head(204, {
+                    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                    'Access-Control-Allow-Headers': headers.get('access-control-request-headers', '*'),
+                    'Content-Length': 0
+                }, keep_alive))
+                await writer.drain()
+            elif method == 'GET' and WEBSOCKET_ROUTE.fullmatch(path):
+                await _websocket(reader, writer, games, headers, WEBSOCKET_ROUTE.fullmatch(path).group(1))
+                break
+            else:
+                started = time.perf_counter()
+                endpoint, handler, match = _route(method, path)
+                if handler is None:
+                    result, status = {'error': match.phrase}, match.value
+                else:
+                    query = dict(parse_qsl(url.query, keep_blank_values=True))
+                    try:
+                        result, status = await _call(games, handler, games, match, query, _json_body(headers, body))
+                    except Exception as e:
+                        logger.error("Error handling %s %s: %s", method, path, e, exc_info=True)
+                        result, status = {'error': 'Internal server error', 'details': str(e)}, 500
+                if isinstance(result, dict):
+                    await _respond(writer, status, result, keep_alive)
+                elif isinstance(result, service.CachedJSON):
+                    status = await _respond_cached(writer, status, result, headers.get('if-none-match'), keep_alive)
+                elif isinstance(result, str):
+                    await _respond_text(writer, status, result, keep_alive)
+                else:
+                    await _stream(writer, games, result, keep_alive)
+                metrics.observe_request(endpoint, status, time.perf_counter() - started)
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = '0.0.0.0', port: int = 5000, game_manager=None,
+                idle_timeout: Optional[float] = IDLE_TIMEOUT, **kwargs) -> asyncio.AbstractServer:
+    """
+    Start listening and return the asyncio server
+    
+    Args:
+        host: Address to bind
+        port: Port to bind; 0 picks a free one
+        game_manager: GameManager to serve; defaults to app.server's, built from the environment
+        idle_timeout: Seconds a keep-alive connection may stay idle
+        **kwargs: Passed to ``asyncio.start_server``
+    """
+    games = game_manager if game_manager is not None else server.game_manager
+    return await asyncio.start_server(
+        lambda reader, writer: handle_connection(reader, writer, games, idle_timeout),
+        host, port, limit=MAX_HEADER_BYTES, backlog=4096, **kwargs
+    )
+
+
+def run_server(host='0.0.0.0', port=5000, config: Optional[dict] = None):
+    """
+    Run the asyncio server until interrupted
+    
+    ``config`` is passed to ``app.server.create_app``, so it takes the same
+    settings (store, logging, warm-up, or a GAME_MANAGER) on top of the
+    TICTACTOE_* environment. The store, logging and warm-up are set up
+    before listening rather than inside the first request.
+    """
+    games = server.create_app(config).extensions['tictactoe']
+    
+    async def main():
+        http = await serve(host, port, games)
+        logger.info("Starting Tic-Tac-Toe asyncio server on %s:%s", host, port)
+        async with http:
+            await http.serve_forever()
+            
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    run_server(port=int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,37 @@
+"""
+Bitboard constants and helpers shared by the game logic and its lookup tables
+"""
+from typing import Optional, Tuple
+
+
+# Cell (row, col) is stored at bit ``row * 3 + col`` of a player's bitboard
+WIN_LINES: Tuple[int, ...] = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+FULL_BOARD = 0b111111111
+
+
+def encode(player_bits: int, server_bits: int) -> int:
+    """Pack both bitboards into a single 18-bit position key"""
+    return player_bits | (server_bits << 9)
+
+
+def winner_of(player_bits: int, server_bits: int) -> Optional[str]:
+    """
+    Evaluate a position with the win-line masks
+    
+    Returns:
+        'player', 'server', 'draw' or None, with the same meaning as TicTacToeGame.check_winner
+    """
+    for line in WIN_LINES:
+        if player_bits & line == line:
+            return 'player'
+        if server_bits & line == line:
+            return 'server'
+            
+    if player_bits | server_bits == FULL_BOARD:
+        return 'draw'
+        
+    return None
@@ -0,0 +1,71 @@
+"""
+Cache of serialized JSON fragments
+
+Games carry a version that changes whenever they do, so a fragment stored
+with the version it was built from is valid exactly while the game still
+has that version. One fragment is kept per (kind, game) and replaced when a
+newer version is built; the least recently used are dropped once the
+cached strings exceed a size budget.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from app.metrics import FRAGMENT_LOOKUPS
+
+
+class FragmentCache:
+    """
+    Bounded map of (kind, game_id) to the JSON built for one version of a game
+    
+    Args:
+        max_bytes: Total length of the cached strings to keep; 0 disables caching
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[int, str]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        
+    def get(self, kind: str, game_id: str, version: int, build: Callable[[], str]) -> str:
+        """
+        Return the cached fragment for this version of the game, building it on a miss
+        
+        Read ``version`` before building: the fragment may then reflect a
+        newer state than its version, never an older one.
+        """
+        key = (kind, game_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                hit = entry[1]
+            else:
+                hit = None
+        if hit is not None:
+            FRAGMENT_LOOKUPS.labels(kind, 'hit').inc()
+            return hit
+            
+        FRAGMENT_LOOKUPS.labels(kind, 'miss').inc()
+        fragment = build()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < version:
+                if entry is not None:
+                    self._size -= len(entry[1])
+                self._entries[key] = (version, fragment)
+                self._entries.move_to_end(key)
+                self._size += len(fragment)
+                while self._size > self.max_bytes and self._entries:
+                    _, (_, dropped) = self._entries.popitem(last=False)
+                    self._size -= len(dropped)
+        return fragment
+        
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            
+    def __len__(self) -> int:
+        return len(self._entries)
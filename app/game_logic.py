@@ -2,59 +2,305 @@
 Tic-Tac-Toe game logic implementation
 """
 import random
-from typing import List, Optional, Tuple, Dict
-from datetime import datetime
+import time
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+from typing import Iterator, List, Mapping, Optional, Tuple
+from datetime import datetime, timedelta
+
+from app import outcome_table
+from app.ai import DEFAULT_STRATEGY, get_strategy
+from app.cache import FragmentCache
+from app.metrics import AI_MOVE_SECONDS
+from app.storage import GameStore, MemoryGameStore
+
+
+DEFAULT_SIZE = 3
+DEFAULT_K = 3
+MAX_SIZE = 25
+STATUSES = ('in_progress', 'player_wins', 'server_wins', 'draw')
+# Winner for each entry of STATUSES
+WINNERS = (None, 'player', 'server', None)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_CODE_BY_RESULT = {result: STATUS_CODES[status]
+                   for result, (status, _) in outcome_table.STATUS_BY_RESULT.items()}
+
+# Line directions checked through the last placed stone: row, column and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Move history encoding: the cell index, with this bit set for server moves
+SERVER_MOVE = 0x8000
+_MILLISECOND = timedelta(milliseconds=1)
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _BoardRow(list):
+    """A row of the list-of-lists board view that writes through to the bitboards"""
+    
+    __slots__ = ('_game', '_row')
+    
+    def __init__(self, game: 'TicTacToeGame', row: int, cells: List[Optional[str]]):
+        super().__init__(cells)
+        self._game = game
+        self._row = row
+        
+    def __setitem__(self, col, value):
+        super().__setitem__(col, value)
+        self._game._set_cell(self._row, col, value)
+
+
+class MoveHistory(Sequence):
+    """
+    Read-only view of a game's moves as the API's move dictionaries
+    
+    Games store moves compactly (see TicTacToeGame); the dictionaries are
+    only built for the moves that are actually read. Timestamps are naive
+    UTC datetimes, which app.json_provider writes in ISO 8601 with a 'Z'.
+    """
+    
+    __slots__ = ('_game',)
+    
+    def __init__(self, game: 'TicTacToeGame'):
+        self._game = game
+        
+    def __len__(self) -> int:
+        return len(self._game._cells)
+        
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        game = self._game
+        cell = game._cells[index]
+        row, col = divmod(cell & ~SERVER_MOVE, game.size)
+        return {
+            'player': 'server' if cell & SERVER_MOVE else 'player',
+            'position': {'row': row, 'col': col},
+            'timestamp': game.created_at + game._offsets[index] * _MILLISECOND
+        }
+        
+    def __iter__(self) -> Iterator[dict]:
+        game = self._game
+        size = game.size
+        created_at = game.created_at
+        for cell, offset in zip(game._cells, game._offsets):
+            row, col = divmod(cell & ~SERVER_MOVE, size)
+            yield {
+                'player': 'server' if cell & SERVER_MOVE else 'player',
+                'position': {'row': row, 'col': col},
+                'timestamp': created_at + offset * _MILLISECOND
+            }
+            
+    def __repr__(self) -> str:
+        return f"MoveHistory({list(self)!r})"
 
 
 class TicTacToeGame:
-    """Represents a single tic-tac-toe game"""
+    """
+    Represents a single tic-tac-toe game
+    
+    The classic game is a 3x3 board with 3 in a row; larger boards with any
+    ``k`` up to ``size`` (for example 15x15, 5 in a row) are also supported.
+    Each player's stones are kept as a bitboard with cell (row, col) at bit
+    ``row * size + col``.
+    
+    The move history is two arrays rather than a list of dictionaries: the
+    cell of each move (with SERVER_MOVE set for the server) and the
+    milliseconds since ``created_at`` at which it was made. ``moves`` and
+    ``get_moves()`` present it in the API's shape.
     
+    Games use ``__slots__`` and keep the status as an index into STATUSES
+    and the creation time as integer microseconds since the epoch
+    (``created_us``); ``status``, ``winner`` and ``created_at`` are views
+    of those in the shapes the API returns.
+    
+    ``version`` is bumped on every change to the board or status, so
+    anything derived from a game can be cached under (game_id, version).
+    """
+    
+    __slots__ = ('game_id', 'strategy', 'size', 'k', 'player_bits', 'server_bits', 'version',
+                 'created_us', '_cells', '_offsets', '_status', '_standard', '_result')
+                 
     PLAYER = 'X'
     SERVER = 'O'
     EMPTY = None
     
-    def __init__(self, game_id: str):
+    def __init__(self, game_id: str, strategy: str = DEFAULT_STRATEGY,
+                 size: int = DEFAULT_SIZE, k: int = DEFAULT_K):
+        self.check_options(strategy, size, k)
         self.game_id = game_id
-        self.board: List[List[Optional[str]]] = [[None, None, None] for _ in range(3)]
-        self.moves: List[dict] = []
-        self.status = 'in_progress'
-        self.winner: Optional[str] = None
-        self.created_at = datetime.utcnow()
+        self.strategy = strategy
+        self.size = size
+        self.k = k
+        self.player_bits = 0
+        self.server_bits = 0
+        self.version = 0
+        self.created_us = time.time_ns() // 1000
+        self._cells = array('H')
+        self._offsets = array('q')
+        self._status = 0
+        # The classic board is answered by the outcome table; other boards track
+        # their result incrementally as stones are placed
+        self._standard = size == DEFAULT_SIZE and k == DEFAULT_K
+        self._result: Optional[str] = None
+        
+    @property
+    def status(self) -> str:
+        """One of STATUSES"""
+        return STATUSES[self._status]
         
-    def make_move(self, row: int, col: int, player: str) -> bool:
+    @status.setter
+    def status(self, value: str):
+        self._status = STATUS_CODES[value]
+        self.version += 1
+        
+    @property
+    def winner(self) -> Optional[str]:
+        """'player' or 'server' once one of them has won, otherwise None"""
+        return WINNERS[self._status]
+        
+    @property
+    def created_at(self) -> datetime:
+        """Creation time as a naive UTC datetime"""
+        return _EPOCH + timedelta(microseconds=self.created_us)
+        
+    @created_at.setter
+    def created_at(self, value: datetime):
+        self.created_us = (value - _EPOCH) // timedelta(microseconds=1)
+        
+    @staticmethod
+    def check_options(strategy: str, size: int, k: int):
+        """
+        Validate game options
+        
+        Raises:
+            ValueError: If the strategy is unknown or the board dimensions are invalid
+        """
+        if not isinstance(size, int) or isinstance(size, bool) or not 3 <= size <= MAX_SIZE:
+            raise ValueError(f"size must be an integer between 3 and {MAX_SIZE}")
+        if not isinstance(k, int) or isinstance(k, bool) or not 3 <= k <= size:
+            raise ValueError("k must be an integer between 3 and size")
+        if not get_strategy(strategy).supports(size, k):
+            raise ValueError(f"Strategy '{strategy}' only supports the standard 3x3 board")
+            
+    @property
+    def board(self) -> List[List[Optional[str]]]:
+        """List-of-lists view of the bitboards, used by to_dict and the JSON responses"""
+        player_bits = self.player_bits
+        server_bits = self.server_bits
+        size = self.size
+        rows = []
+        for row in range(size):
+            cells = []
+            for col in range(size):
+                bit = 1 << (row * size + col)
+                if player_bits & bit:
+                    cells.append(self.PLAYER)
+                elif server_bits & bit:
+                    cells.append(self.SERVER)
+                else:
+                    cells.append(None)
+            rows.append(_BoardRow(self, row, cells))
+        return rows
+        
+    def _set_cell(self, row: int, col: int, value: Optional[str]):
+        """Set a single cell directly, bypassing move validation and history"""
+        bit = 1 << (row * self.size + col)
+        cleared = (self.player_bits | self.server_bits) & bit
+        self.player_bits &= ~bit
+        self.server_bits &= ~bit
+        if value == self.PLAYER:
+            self.player_bits |= bit
+        elif value == self.SERVER:
+            self.server_bits |= bit
+        self.version += 1
+        
+        if self._standard:
+            return
+        if cleared:
+            self._rescan()
+        elif value is not None:
+            self._record_line(row, col, value)
+            
+    def make_move(self, row: int, col: int, player: str, offset_ms: Optional[int] = None) -> bool:
         """
         Make a move on the board
         
         Args:
-            row: Row index (0-2)
-            col: Column index (0-2)
+            row: Row index (0 to size - 1)
+            col: Column index (0 to size - 1)
             player: 'X' for player or 'O' for server
-            
+            offset_ms: Milliseconds after ``created_at`` the move was made;
+                defaults to now (set when replaying a stored move)
+                
         Returns:
             True if move was successful, False otherwise
         """
         if not self._is_valid_move(row, col):
             return False
             
-        self.board[row][col] = player
-        self.moves.append({
-            'player': 'player' if player == self.PLAYER else 'server',
-            'position': {'row': row, 'col': col},
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
-        })
+        cell = row * self.size + col
+        bit = 1 << cell
+        if player == self.PLAYER:
+            self.player_bits |= bit
+        else:
+            self.server_bits |= bit
+            cell |= SERVER_MOVE
+        if not self._standard:
+            self._record_line(row, col, player)
+        self._cells.append(cell)
+        if offset_ms is None:
+            offset_ms = (time.time_ns() // 1000 - self.created_us) // 1000
+        self._offsets.append(offset_ms)
+        self.version += 1
         
         return True
         
     def _is_valid_move(self, row: int, col: int) -> bool:
         """Check if a move is valid"""
-        if not (0 <= row <= 2 and 0 <= col <= 2):
+        if not (0 <= row < self.size and 0 <= col < self.size):
             return False
-        if self.board[row][col] is not None:
+        if (self.player_bits | self.server_bits) & (1 << (row * self.size + col)):
             return False
         if self.status != 'in_progress':
             return False
         return True
         
+    def _completes_line(self, bits: int, row: int, col: int) -> bool:
+        """Check whether the stone at (row, col) is part of k in a row, looking only through that cell"""
+        size = self.size
+        k = self.k
+        for d_row, d_col in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r = row + sign * d_row
+                c = col + sign * d_col
+                while 0 <= r < size and 0 <= c < size and bits & (1 << (r * size + c)):
+                    count += 1
+                    if count >= k:
+                        return True
+                    r += sign * d_row
+                    c += sign * d_col
+        return False
+        
+    def _record_line(self, row: int, col: int, player: str):
+        """Update the incremental result after a stone is placed at (row, col)"""
+        if self._result is not None:
+            return
+        bits = self.player_bits if player == self.PLAYER else self.server_bits
+        if self._completes_line(bits, row, col):
+            self._result = 'player' if player == self.PLAYER else 'server'
+            
+    def _rescan(self):
+        """Recompute the incremental result from scratch after a stone is removed"""
+        self._result = None
+        size = self.size
+        for cell in range(size * size):
+            bit = 1 << cell
+            if (self.player_bits | self.server_bits) & bit:
+                row, col = divmod(cell, size)
+                self._record_line(row, col, self.PLAYER if self.player_bits & bit else self.SERVER)
+                
     def check_winner(self) -> Optional[str]:
         """
         Check if there's a winner
@@ -62,52 +308,50 @@ class TicTacToeGame:
         Returns:
             'player' if player wins, 'server' if server wins, 'draw' if it's a draw, None if game continues
         """
-        # Check rows
-        for row in self.board:
-            if row[0] == row[1] == row[2] and row[0] is not None:
-                return 'player' if row[0] == self.PLAYER else 'server'
-                
-        # Check columns
-        for col in range(3):
-            if self.board[0][col] == self.board[1][col] == self.board[2][col] and self.board[0][col] is not None:
-                return 'player' if self.board[0][col] == self.PLAYER else 'server'
-                
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] and self.board[0][0] is not None:
-            return 'player' if self.board[0][0] == self.PLAYER else 'server'
-            
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] and self.board[0][2] is not None:
-            return 'player' if self.board[0][2] == self.PLAYER else 'server'
+        if self._standard:
+            return outcome_table.lookup(self.player_bits, self.server_bits).result
             
-        # Check for draw
-        if all(self.board[row][col] is not None for row in range(3) for col in range(3)):
+        if self._result is not None:
+            return self._result
+        if self.player_bits | self.server_bits == (1 << (self.size * self.size)) - 1:
             return 'draw'
-            
         return None
         
     def update_status(self):
         """Update game status based on current board state"""
-        result = self.check_winner()
-        if result == 'player':
-            self.status = 'player_wins'
-            self.winner = 'player'
-        elif result == 'server':
-            self.status = 'server_wins'
-            self.winner = 'server'
-        elif result == 'draw':
-            self.status = 'draw'
-            self.winner = None
-        else:
-            self.status = 'in_progress'
+        status = _CODE_BY_RESULT[self.check_winner()]
+        if status != self._status:
+            self._status = status
+            self.version += 1
             
     def get_available_positions(self) -> List[Tuple[int, int]]:
         """Get list of available positions"""
-        positions = []
-        for row in range(3):
-            for col in range(3):
-                if self.board[row][col] is None:
-                    positions.append((row, col))
-        return positions
+        if self._standard:
+            return list(outcome_table.lookup(self.player_bits, self.server_bits).available)
+            
+        occupied = self.player_bits | self.server_bits
+        size = self.size
+        return [divmod(cell, size) for cell in range(size * size) if not occupied & (1 << cell)]
+        
+    def random_position(self) -> Optional[Tuple[int, int]]:
+        """
+        Pick a uniformly random empty position
+        
+        Large, sparse boards are sampled directly so the cost does not grow with
+        the board area; crowded boards fall back to listing the empty cells.
+        """
+        if not self._standard:
+            occupied = self.player_bits | self.server_bits
+            area = self.size * self.size
+            for _ in range(8):
+                cell = random.randrange(area)
+                if not occupied & (1 << cell):
+                    return divmod(cell, self.size)
+                    
+        available = self.get_available_positions()
+        if not available:
+            return None
+        return random.choice(available)
         
     def make_random_move(self) -> Optional[Tuple[int, int]]:
         """
@@ -116,11 +360,28 @@ class TicTacToeGame:
         Returns:
             Tuple of (row, col) if move was made, None if no moves available
         """
-        available = self.get_available_positions()
-        if not available:
+        position = self.random_position()
+        if position is None:
             return None
             
-        row, col = random.choice(available)
+        row, col = position
+        self.make_move(row, col, self.SERVER)
+        return (row, col)
+        
+    def make_server_move(self) -> Optional[Tuple[int, int]]:
+        """
+        Server makes a move chosen by the game's strategy
+        
+        Returns:
+            Tuple of (row, col) if move was made, None if no moves available
+        """
+        started = time.perf_counter()
+        move = get_strategy(self.strategy).choose_move(self)
+        AI_MOVE_SECONDS.labels(self.strategy).observe(time.perf_counter() - started)
+        if move is None:
+            return None
+            
+        row, col = move
         self.make_move(row, col, self.SERVER)
         return (row, col)
         
@@ -129,36 +390,152 @@ class TicTacToeGame:
         return {
             'game_id': self.game_id,
             'board': self.board,
+            'size': self.size,
+            'k': self.k,
             'status': self.status,
             'winner': self.winner,
-            'created_at': self.created_at.isoformat() + 'Z'
+            'strategy': self.strategy,
+            'created_at': self.created_at
         }
         
+    @property
+    def moves(self) -> MoveHistory:
+        """Moves in chronological order, as a lazy read-only sequence"""
+        return MoveHistory(self)
+        
     def get_moves(self) -> List[dict]:
         """Get all moves in chronological order"""
-        return self.moves.copy()
+        return list(MoveHistory(self))
+        
+    def encoded_moves(self, start: int = 0) -> List[Tuple[int, int]]:
+        """(cell, milliseconds after created_at) of each move from ``start`` on; server cells have SERVER_MOVE set"""
+        return list(zip(self._cells[start:], self._offsets[start:]))
+        
+    def to_record(self) -> dict:
+        """Serialize the full game state to plain JSON-compatible values for storage"""
+        return {
+            'game_id': self.game_id,
+            'strategy': self.strategy,
+            'size': self.size,
+            'k': self.k,
+            'player_bits': self.player_bits,
+            'server_bits': self.server_bits,
+            'cells': self._cells.tolist(),
+            'offsets': self._offsets.tolist(),
+            'status': self.status,
+            'winner': self.winner,
+            'result': self._result,
+            'version': self.version,
+            'created_at': self.created_at.isoformat()
+        }
+        
+    @classmethod
+    def from_record(cls, record: dict) -> 'TicTacToeGame':
+        """Rebuild a game from a to_record() dictionary"""
+        game = cls(record['game_id'], record['strategy'], record['size'], record['k'])
+        game.player_bits = record['player_bits']
+        game.server_bits = record['server_bits']
+        game.status = record['status']
+        game._result = record['result']
+        game.created_at = datetime.fromisoformat(record['created_at'])
+        if 'cells' in record:
+            game._cells = array('H', record['cells'])
+            game._offsets = array('q', record['offsets'])
+        else:
+            # Records written before the compact history carry move dictionaries
+            for move in record['moves']:
+                position = move['position']
+                cell = position['row'] * game.size + position['col']
+                game._cells.append(cell | SERVER_MOVE if move['player'] == 'server' else cell)
+                moment = datetime.fromisoformat(move['timestamp'].rstrip('Z'))
+                game._offsets.append((moment - game.created_at) // _MILLISECOND)
+        # Records without a version were written by code that bumped it once
+        # per move and once when the game ended
+        game.version = record.get('version', len(game._cells) + (game._status != 0))
+        return game
 
 
 class GameManager:
-    """Manages multiple games"""
+    """
+    Manages multiple games
     
-    def __init__(self):
-        self.games: Dict[str, TicTacToeGame] = {}
-        self.game_counter = 0
-        
-    def create_game(self) -> TicTacToeGame:
-        """Create a new game"""
-        self.game_counter += 1
-        game_id = f"game_{self.game_counter}"
-        game = TicTacToeGame(game_id)
-        self.games[game_id] = game
-        return game
+    Games live in a pluggable store (see app.storage): in process memory by
+    default, or in a SQLite database shared by several worker processes. The
+    manager is safe to share between request threads; callers that change a
+    game do so inside ``locked_game``. ``fragments`` caches JSON built from
+    its games (see app.cache).
+    """
+    
+    def __init__(self, store: Optional[GameStore] = None):
+        self.store = store if store is not None else MemoryGameStore()
+        self.fragments = FragmentCache()
+        
+    @property
+    def games(self) -> Mapping[str, TicTacToeGame]:
+        """Mapping of game ID to game"""
+        return self.store.games
+        
+    @property
+    def game_counter(self) -> int:
+        """Number of games created so far"""
+        return self.store.game_counter
+        
+    def create_game(self, strategy: str = DEFAULT_STRATEGY,
+                    size: int = DEFAULT_SIZE, k: int = DEFAULT_K) -> TicTacToeGame:
+        """
+        Create a new game
+        
+        Args:
+            strategy: Name of the server strategy (see app.ai.STRATEGIES)
+            size: Board width and height
+            k: Number of stones in a row needed to win
+            
+        Raises:
+            ValueError: If the strategy is unknown or the board dimensions are invalid
+        """
+        TicTacToeGame.check_options(strategy, size, k)
+        return self.store.create(lambda game_id: TicTacToeGame(game_id, strategy, size, k))
         
     def get_game(self, game_id: str) -> Optional[TicTacToeGame]:
-        """Get a game by ID"""
-        return self.games.get(game_id)
+        """
+        Get a game by ID
+        
+        With a shared store this is a snapshot; use ``locked_game`` to change it.
+        """
+        return self.store.get(game_id)
         
+    @contextmanager
+    def locked_game(self, game_id: str) -> Iterator[Optional[TicTacToeGame]]:
+        """
+        Hold a game exclusively for a read-modify-write sequence
+        
+        Yields the game, or None if it does not exist. Changes made inside the
+        block are saved to the store when it exits.
+        """
+        with self.store.transaction(game_id) as game:
+            yield game
+            
     def get_all_games(self) -> List[TicTacToeGame]:
         """Get all games in chronological order"""
-        return sorted(self.games.values(), key=lambda g: g.created_at)
-
+        return self.store.all_games()
+        
+    def list_games(self, after: Optional[int] = None, limit: int = 100,
+                   status: Optional[str] = None, winner: Optional[str] = None
+                   ) -> Tuple[List[TicTacToeGame], Optional[int]]:
+        """
+        Get one page of games in chronological order
+        
+        Args:
+            after: Cursor from the previous page, or None for the first page
+            limit: Most games to return
+            status: Only return games with this status
+            winner: Only return games won by 'player' or 'server'
+            
+        Returns:
+            Tuple of (games, next cursor); the cursor is None on the last page
+        """
+        return self.store.page(after, limit, status, winner)
+        
+    def stats(self) -> dict:
+        """Store counters, such as resident and evicted game counts"""
+        return self.store.stats()
@@ -0,0 +1,98 @@
+"""
+JSON encoding for API responses
+
+Uses orjson when it is installed (``pip install tictactoe[fast]``) and the
+standard library otherwise. Both write naive UTC datetimes in ISO 8601 with
+a 'Z' suffix, the format the API has always used, so responses can carry
+datetime values as they are rather than formatting them first. orjson also
+encodes the board's row lists without a per-value Python callback.
+
+Integers beyond 64 bits, which orjson refuses, fall back to the standard
+library, so the output never depends on which encoder is installed.
+"""
+import json
+from datetime import datetime
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat() + 'Z'
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stdlib_dumps(obj: Any) -> str:
+    """Compact JSON from the standard library encoder"""
+    return json.dumps(obj, separators=(',', ':'), default=_default)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+    
+    def dumps_bytes(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes"""
+        try:
+            return orjson.dumps(obj, option=_OPTIONS)
+        except TypeError:
+            return stdlib_dumps(obj).encode()
+            
+    def dumps(obj: Any) -> str:
+        """Compact JSON"""
+        return dumps_bytes(obj).decode()
+        
+    def loads(data: Any) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects integers beyond 64 bits that are valid JSON
+            return json.loads(data)
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes"""
+        return stdlib_dumps(obj).encode()
+        
+    dumps = stdlib_dumps
+    loads = json.loads
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's own provider, writing datetimes as ISO 8601 instead of HTTP dates"""
+    
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, datetime):
+            return o.isoformat() + 'Z'
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson
+    
+    Output is always compact and keys keep their insertion order; keyword
+    arguments such as ``separators`` and ``indent`` are accepted and ignored.
+    """
+    
+    mimetype = 'application/json'
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+        
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+        
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+# The provider app.server installs
+PROVIDER = OrjsonProvider if orjson is not None else StdlibJSONProvider
@@ -0,0 +1,227 @@
+"""
+Logging setup for the servers
+
+Request threads only put records on an in-memory queue. A single listener
+thread drains the queue and writes whatever has accumulated to the log file
+and the console in one write and one flush per handler, so disk and console
+I/O stay off the request path.
+
+Per-move records go to the MOVE_LOGGER logger and can be sampled, because a
+busy server logs several of them for every move.
+"""
+import atexit
+import itertools
+import json
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import List, Optional
+
+
+MOVE_LOGGER = 'app.service.moves'
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+MAX_BATCH = 1024
+
+_listener = None
+_installed: List[logging.Handler] = []
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object per line"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class MoveSampler(logging.Filter):
+    """Let through one record in every ``1 / rate``"""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError('move log sample rate must be in (0, 1]')
+        self.every = round(1 / rate)
+        self._count = itertools.count()
+        
+    def filter(self, record: logging.LogRecord) -> bool:
+        return next(self._count) % self.every == 0
+
+
+class BatchWriter:
+    """
+    Mixin for stream handlers that writes a list of records at once
+    
+    As with ``Handler.emit``, a record that cannot be formatted is reported
+    through ``handleError`` and skipped; the rest of the batch is written.
+    """
+    
+    def handle_batch(self, records: List[logging.LogRecord]):
+        lines = []
+        for record in records:
+            if record.levelno >= self.level and self.filter(record):
+                try:
+                    lines.append(self.format(record))
+                except Exception:
+                    self.handleError(record)
+        if not lines:
+            return
+        with self.lock:
+            try:
+                self.stream.write(self.terminator.join(lines) + self.terminator)
+                self.flush()
+            except Exception:
+                self.handleError(records[0])
+
+
+class BatchStreamHandler(BatchWriter, logging.StreamHandler):
+    pass
+
+
+class BatchFileHandler(BatchWriter, logging.FileHandler):
+    pass
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    Queue records untouched
+    
+    The stock QueueHandler formats every record on the logging thread so it
+    can be pickled. Records here never leave the process, so formatting is
+    left to the listener thread; log arguments must not be mutated after
+    the call.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class BatchingQueueListener:
+    """
+    Thread that moves records from a queue to batch handlers
+    
+    Blocks for the first record, then takes every record already queued (up
+    to MAX_BATCH) and hands them to each handler as one batch.
+    """
+    
+    _stop = object()
+    
+    def __init__(self, log_queue: queue.SimpleQueue, handlers: List[BatchWriter]):
+        self.queue = log_queue
+        self.handlers = handlers
+        self._thread = None
+        
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+        
+    def stop(self):
+        """Write everything still queued, then stop the thread"""
+        if self._thread is not None:
+            self.queue.put(self._stop)
+            self._thread.join()
+            self._thread = None
+            
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < MAX_BATCH:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            # Records logged while stopping can land behind the sentinel
+            done = any(record is self._stop for record in batch)
+            records = [record for record in batch if record is not self._stop]
+            for handler in self.handlers:
+                try:
+                    handler.handle_batch(records)
+                except Exception:
+                    # Keep the thread alive, or every later record would queue forever
+                    if records:
+                        handler.handleError(records[0])
+            if done:
+                return
+
+
+def configure_logging(log_file: Optional[str], level: int = logging.INFO, fmt: str = 'text',
+                      move_sample_rate: float = 1.0, queued: bool = True):
+    """
+    Send root logger records to a file and the console
+    
+    Calling it again replaces the handlers installed by the previous call;
+    handlers added to the root logger by anyone else are left alone.
+    
+    Args:
+        log_file: Log file path, or None to log to the console only
+        level: Root log level
+        fmt: 'text' for the classic line format or 'json' for JSON lines
+        move_sample_rate: Fraction of per-move records (MOVE_LOGGER) to keep
+        queued: Write through the background listener; False writes
+            synchronously on the calling thread
+            
+    Raises:
+        ValueError: If the format or sample rate is invalid
+    """
+    global _listener
+    if fmt not in ('text', 'json'):
+        raise ValueError("log format must be 'text' or 'json'")
+    sampler = MoveSampler(move_sample_rate)
+    formatter = JsonLinesFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT)
+    
+    handlers = [BatchStreamHandler()]
+    if log_file:
+        handlers.append(BatchFileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in _installed:
+        root.removeHandler(handler)
+        handler.close()
+    _installed.clear()
+    root.setLevel(level)
+    
+    move_logger = logging.getLogger(MOVE_LOGGER)
+    for old in move_logger.filters[:]:
+        move_logger.removeFilter(old)
+    if sampler.every > 1:
+        move_logger.addFilter(sampler)
+        
+    if queued:
+        log_queue = queue.SimpleQueue()
+        _listener = BatchingQueueListener(log_queue, handlers)
+        _listener.start()
+        _installed.append(RecordQueueHandler(log_queue))
+    else:
+        _installed.extend(handlers)
+    for handler in _installed:
+        root.addHandler(handler)
+
+
+def shutdown_logging():
+    """Flush and stop the background listener, if one is running"""
+    global _listener
+    if _listener is not None:
+        # Stop queueing first, so no record is put behind the stop sentinel
+        root = logging.getLogger()
+        for handler in _installed:
+            if isinstance(handler, RecordQueueHandler):
+                root.removeHandler(handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
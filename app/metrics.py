@@ -0,0 +1,234 @@
+"""
+Prometheus-style metrics
+
+Counters and histograms are sharded per thread: every thread updates its own
+list of cells without taking a lock, and a scrape sums the shards. When a
+thread ends its shard is folded into the metric's retired totals, so servers
+that start a thread per connection do not grow without bound.
+
+Histograms use fixed bucket bounds chosen up front; an observation is one
+bisect and two list updates.
+"""
+import gc
+import itertools
+import sys
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.storage import MemoryGameStore
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+AI_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1, 1.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+MEMORY_SAMPLE = 100
+
+
+class _Owner:
+    """Per-thread object whose collection signals that the thread has ended"""
+    __slots__ = ('__weakref__',)
+
+
+class _Sharded:
+    """A fixed number of numeric cells, kept per thread and summed on read"""
+    
+    _keys = itertools.count()
+    
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: Dict[int, List[float]] = {}
+        self._retired = [0] * size
+        
+    # Subclasses read self._local.cells inline on the hot path and call this
+    # the first time a thread touches the metric
+    def _new_shard(self) -> List[float]:
+        cells = [0] * self._size
+        owner = _Owner()
+        key = next(self._keys)
+        with self._lock:
+            self._shards[key] = cells
+        weakref.finalize(owner, self._retire, key)
+        self._local.owner = owner
+        self._local.cells = cells
+        return cells
+        
+    def _retire(self, key: int):
+        with self._lock:
+            cells = self._shards.pop(key)
+            self._retired = [a + b for a, b in zip(self._retired, cells)]
+            
+    def _totals(self) -> List[float]:
+        with self._lock:
+            totals = list(self._retired)
+            for cells in self._shards.values():
+                for i, value in enumerate(cells):
+                    totals[i] += value
+        return totals
+
+
+class Counter(_Sharded):
+    """Monotonically increasing count"""
+    
+    def __init__(self):
+        super().__init__(1)
+        
+    def inc(self, amount: float = 1):
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._new_shard()
+        cells[0] += amount
+        
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class Histogram(_Sharded):
+    """Distribution of observed values over fixed buckets"""
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = tuple(buckets)
+        # one cell per bucket, one for +Inf, then the sum of observations
+        super().__init__(len(self.bounds) + 2)
+        
+    def observe(self, value: float):
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._new_shard()
+        cells[bisect_left(self.bounds, value)] += 1
+        cells[-1] += value
+        
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Return (cumulative bucket counts including +Inf, count, sum)"""
+        totals = self._totals()
+        cumulative = list(itertools.accumulate(totals[:-1]))
+        return cumulative, cumulative[-1], totals[-1]
+
+
+class Family:
+    """A named metric with one child per combination of label values"""
+    
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str], factory: Callable):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[tuple, _Sharded] = {}
+        self._lock = threading.Lock()
+        
+    def labels(self, *values) -> _Sharded:
+        """Child for these label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+        
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.kind}'
+        for values, child in sorted(self._children.items()):
+            labels = [f'{name}="{value}"' for name, value in zip(self.labelnames, values)]
+            if self.kind == 'counter':
+                yield f'{self.name}{_labels(labels)} {_number(child.value)}'
+                continue
+            cumulative, count, total = child.snapshot()
+            bounds = [repr(bound) for bound in child.bounds] + ['+Inf']
+            for le, bucket_count in zip(bounds, cumulative):
+                bucket_labels = _labels(labels + ['le="%s"' % le])
+                yield f'{self.name}_bucket{bucket_labels} {_number(bucket_count)}'
+            yield f'{self.name}_count{_labels(labels)} {_number(count)}'
+            yield f'{self.name}_sum{_labels(labels)} {_number(total)}'
+
+
+def _labels(labels: List[str]) -> str:
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+REQUESTS = Family('tictactoe_requests_total', 'HTTP requests by route and status code',
+                  'counter', ('route', 'status'), Counter)
+REQUEST_SECONDS = Family('tictactoe_request_duration_seconds', 'HTTP request latency by route',
+                         'histogram', ('route',), lambda: Histogram(LATENCY_BUCKETS))
+AI_MOVE_SECONDS = Family('tictactoe_ai_move_seconds', 'Time the server strategy takes to choose a move',
+                         'histogram', ('strategy',), lambda: Histogram(AI_BUCKETS))
+FRAGMENT_LOOKUPS = Family('tictactoe_fragment_cache_total', 'Serialized JSON fragment cache lookups by kind and result',
+                          'counter', ('kind', 'result'), Counter)
+FAMILIES = [REQUESTS, REQUEST_SECONDS, AI_MOVE_SECONDS, FRAGMENT_LOOKUPS]
+
+
+def observe_request(route: str, status: int, seconds: float):
+    """Count one handled request and record its latency"""
+    REQUESTS.labels(route, status).inc()
+    REQUEST_SECONDS.labels(route).observe(seconds)
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Bytes used by an object and everything it references that was not already counted"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return total
+
+
+def _game_memory(game_manager) -> Optional[float]:
+    """Average bytes per resident game over a sample, or None if games are not in memory"""
+    if not isinstance(game_manager.store, MemoryGameStore):
+        return None
+    # Request threads add and evict games under the store lock, which would
+    # otherwise change the dict's size while it is iterated
+    with game_manager.store._lock:
+        sample = list(itertools.islice(game_manager.games.values(), MEMORY_SAMPLE))
+    if not sample:
+        return 0.0
+    # Objects shared by every game (interned strings, small ints, strategy
+    # names) are counted once, against the first game that reaches them
+    seen: set = set()
+    return sum(deep_sizeof(game, seen) for game in sample) / len(sample)
+
+
+def render(game_manager) -> str:
+    """Every metric in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for family in FAMILIES:
+        lines.extend(family.render())
+        
+    stats = game_manager.stats()
+    finished = stats.get('resident_finished', 0)
+    lines += [
+        '# HELP tictactoe_games Games held by the store',
+        '# TYPE tictactoe_games gauge',
+        f'tictactoe_games{{state="live"}} {stats["resident"] - finished}',
+        f'tictactoe_games{{state="finished"}} {finished}',
+    ]
+    if 'evicted' in stats:
+        lines += [
+            '# HELP tictactoe_games_evicted_total Games evicted from memory',
+            '# TYPE tictactoe_games_evicted_total counter',
+            f'tictactoe_games_evicted_total {stats["evicted"]}',
+        ]
+    per_game = _game_memory(game_manager)
+    if per_game is not None:
+        lines += [
+            f'# HELP tictactoe_game_memory_bytes Average memory per resident game (sample of {MEMORY_SAMPLE})',
+            '# TYPE tictactoe_game_memory_bytes gauge',
+            f'tictactoe_game_memory_bytes {per_game:.0f}',
+        ]
+    return '\n'.join(lines) + '\n'
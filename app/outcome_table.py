@@ -0,0 +1,140 @@
+"""
+Precomputed outcome table for every reachable tic-tac-toe position
+
+The table is built lazily on first use (a few milliseconds) and shared by all
+games in the process. Positions that cannot arise in legal play (for example a
+board edited by hand) are evaluated on the fly and are not added to the table,
+so its size stays fixed at the 5,478 reachable positions.
+"""
+import sys
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.bitboard import FULL_BOARD, encode, winner_of
+
+
+STATUS_BY_RESULT = {
+    'player': ('player_wins', 'player'),
+    'server': ('server_wins', 'server'),
+    'draw': ('draw', None),
+    None: ('in_progress', None),
+}
+
+# Best-play values, from the player's ('X') point of view
+VALUE_BY_RESULT = {'player': 1, 'server': -1, 'draw': 0}
+
+
+class Position(NamedTuple):
+    """Everything the game needs to know about one board position"""
+    result: Optional[str]                   # check_winner() result
+    status: str                             # update_status() status
+    winner: Optional[str]                   # update_status() winner
+    available: Tuple[Tuple[int, int], ...]  # empty cells as (row, col)
+    value: Optional[int]                    # best-play value, None if unreachable
+
+
+# Shared (row, col) tuples and per-occupancy move lists keep the table compact
+CELLS = tuple(divmod(cell, 3) for cell in range(9))
+_AVAILABLE = tuple(
+    tuple(CELLS[cell] for cell in range(9) if not occupied & (1 << cell))
+    for occupied in range(FULL_BOARD + 1)
+)
+
+_table: Optional[Dict[int, Position]] = None
+_stats: dict = {}
+_lock = threading.Lock()
+
+
+def _evaluate(player_bits: int, server_bits: int, value: Optional[int]) -> Position:
+    result = winner_of(player_bits, server_bits)
+    status, winner = STATUS_BY_RESULT[result]
+    return Position(result, status, winner, _AVAILABLE[player_bits | server_bits], value)
+
+
+def _build() -> Dict[int, Position]:
+    """Walk the game tree from the empty board, player first, and solve every position"""
+    table: Dict[int, Position] = {}
+    
+    def solve(player_bits: int, server_bits: int, player_to_move: bool) -> int:
+        key = encode(player_bits, server_bits)
+        entry = table.get(key)
+        if entry is not None:
+            return entry.value
+            
+        result = winner_of(player_bits, server_bits)
+        if result is not None:
+            value = VALUE_BY_RESULT[result]
+        else:
+            occupied = player_bits | server_bits
+            values = []
+            for cell in range(9):
+                bit = 1 << cell
+                if occupied & bit:
+                    continue
+                if player_to_move:
+                    values.append(solve(player_bits | bit, server_bits, False))
+                else:
+                    values.append(solve(player_bits, server_bits | bit, True))
+            value = max(values) if player_to_move else min(values)
+            
+        table[key] = _evaluate(player_bits, server_bits, value)
+        return value
+        
+    solve(0, 0, True)
+    return table
+
+
+def get_table() -> Dict[int, Position]:
+    """Return the outcome table, building it on first use"""
+    global _table
+    if _table is None:
+        with _lock:
+            if _table is None:
+                started = time.perf_counter()
+                table = _build()
+                _stats['build_seconds'] = time.perf_counter() - started
+                _stats['positions'] = len(table)
+                _stats['bytes'] = _sizeof(table)
+                _table = table
+    return _table
+
+
+def lookup(player_bits: int, server_bits: int) -> Position:
+    """Look up a position, evaluating it directly if it is not reachable in legal play"""
+    entry = get_table().get(encode(player_bits, server_bits))
+    if entry is None:
+        entry = _evaluate(player_bits & FULL_BOARD, server_bits & FULL_BOARD, None)
+    return entry
+
+
+def table_stats() -> dict:
+    """Return build time (seconds), position count and approximate size (bytes) of the table"""
+    get_table()
+    return dict(_stats)
+
+
+def _sizeof(table: Dict[int, Position]) -> int:
+    """Approximate deep size of the table, counting shared objects once"""
+    seen = set()
+    total = 0
+    stack = [table]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, tuple):
+            stack.extend(obj)
+    return total
+
+
+if __name__ == '__main__':
+    stats = table_stats()
+    print(f"positions: {stats['positions']}")
+    print(f"build time: {stats['build_seconds'] * 1000:.1f} ms")
+    print(f"size: {stats['bytes'] / 1024:.1f} KiB")
@@ -0,0 +1,121 @@
+"""
+On-demand stack-sampling profiler for request threads
+
+While a profile runs, the calling thread wakes every ``interval`` seconds,
+reads every thread's current frame with ``sys._current_frames()`` and
+records the stack of each thread that is inside a Flask view function,
+from that view down to the executing frame. Nothing is installed in the
+request path, so there is no cost at all while no profile is running, and
+sampling costs one stack walk per busy thread per tick.
+
+Stacks are counted in collapsed form, one ``route;frame;frame count``
+line per distinct stack, which flamegraph.pl, speedscope and similar tools
+read directly. Frames are ``module:function``.
+"""
+import inspect
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Mapping, Tuple
+
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+DEFAULT_INTERVAL = 0.01
+TOP_FRAMES = 10
+
+# One profile at a time; a second request is refused rather than queued
+_running = threading.Lock()
+
+Stacks = Counter  # (route, frame, frame, ...) -> samples
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+
+def _label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def sample(seconds: float, interval: float, view_functions: Mapping[str, Callable]) -> Tuple[Stacks, int]:
+    """
+    Sample the stacks of threads running a view for ``seconds``
+    
+    Args:
+        seconds: How long to sample, at most MAX_SECONDS
+        interval: Seconds between samples, at least MIN_INTERVAL
+        view_functions: Endpoint name to view function, as Flask's app.view_functions
+        
+    Returns:
+        Tuple of (collapsed stack counts, number of ticks taken)
+        
+    Raises:
+        ProfilerBusy: If another profile is already running
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        views: Dict[object, str] = {inspect.unwrap(view).__code__: endpoint
+                                    for endpoint, view in view_functions.items()}
+        own = threading.get_ident()
+        stacks: Stacks = Counter()
+        ticks = 0
+        deadline = time.perf_counter() + min(seconds, MAX_SECONDS)
+        interval = max(interval, MIN_INTERVAL)
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    endpoint = views.get(frame.f_code)
+                    labels.append(_label(frame))
+                    if endpoint is not None:
+                        labels.append(endpoint)
+                        stacks[tuple(reversed(labels))] += 1
+                        break
+                    frame = frame.f_back
+            ticks += 1
+            time.sleep(interval)
+        return stacks, ticks
+    finally:
+        _running.release()
+
+
+def collapsed(stacks: Stacks) -> str:
+    """Stacks as ``route;frame;frame count`` lines, most sampled first"""
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def summary(stacks: Stacks, ticks: int, interval: float) -> dict:
+    """
+    Per-route breakdown of a profile
+    
+    For each route: its samples, its share of all samples, and the frames
+    where it spent most samples itself (``self``) and most samples in total,
+    including callees (``total``).
+    """
+    total_samples = sum(stacks.values())
+    routes: Dict[str, dict] = {}
+    for stack, count in stacks.items():
+        route = routes.setdefault(stack[0], {'samples': 0, 'self': Counter(), 'total': Counter()})
+        route['samples'] += count
+        route['self'][stack[-1]] += count
+        for frame in set(stack[1:]):
+            route['total'][frame] += count
+            
+    return {
+        'ticks': ticks,
+        'interval': interval,
+        'samples': total_samples,
+        'routes': {
+            endpoint: {
+                'samples': route['samples'],
+                'share': round(route['samples'] / total_samples, 4),
+                'self': route['self'].most_common(TOP_FRAMES),
+                'total': route['total'].most_common(TOP_FRAMES),
+            }
+            for endpoint, route in sorted(routes.items(), key=lambda item: -item[1]['samples'])
+        },
+    }
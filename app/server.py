@@ -1,198 +1,368 @@
 """
 Flask server implementation for Tic-Tac-Toe game
+
+``create_app(config)`` builds an app serving its own GameManager. Importing
+this module does nothing else: no log files, stores or apps are created
+until they are asked for. The module-level ``app`` and ``game_manager`` that
+``gunicorn app.server:app`` and the asyncio server use are built from the
+environment on first access.
 """
+import atexit
+import hmac
 import logging
+import math
 import os
+import threading
+import time
 from datetime import datetime
-from flask import Flask, request, jsonify
+from typing import Callable, List, Optional, Tuple
+
+from flask import Flask, Response, abort, current_app, g, request, jsonify
 from flask_cors import CORS
 
+from app import json_provider, metrics, outcome_table, profiler, service
+from app.ai import get_strategy
 from app.game_logic import GameManager, TicTacToeGame
+from app.logging_config import configure_logging
+from app.storage import GameStore, MemoryGameStore, SQLiteGameStore
+from app.wal import MoveLog
 
 
-# Configure logging
-log_dir = 'logs'
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, f'tictactoe_{datetime.now().strftime("%Y%m%d")}.log')
+logger = logging.getLogger(__name__)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+# create_app settings that can come from the environment: key -> (variable, parser)
+#
+# Logging: records go to LOG_DIR/tictactoe_YYYYMMDD.log and the console through
+# a background thread. LOG_FORMAT 'json' writes JSON lines and LOG_MOVE_SAMPLE,
+# a fraction such as 0.01, keeps only some of the per-move records.
+#
+# Games: DB_PATH, a SQLite file, is shared between worker processes. Otherwise
+# games are kept in memory, bounded by MAX_GAMES, IDLE_TTL and FINISHED_TTL
+# (seconds), and spilled to the SQLite file ARCHIVE_DB if set. WAL_DIR makes
+# in-memory games durable with a move log and snapshots (see app.wal).
+#
+# PROFILER_TOKEN enables POST /admin/profile for callers sending it as a bearer
+# token; without it the route answers 404. PROFILER_MAX_SECONDS bounds how long
+# one profile may block its request, and is kept below gunicorn's worker
+# timeout (30 s unless configured, see gunicorn.conf.py). WARM_UP builds the lookup tables
+# when the app is created rather than on the first request (see warm_up).
+ENVIRONMENT = {
+    'LOG_DIR': ('TICTACTOE_LOG_DIR', str),
+    'LOG_FORMAT': ('TICTACTOE_LOG_FORMAT', str),
+    'LOG_MOVE_SAMPLE': ('TICTACTOE_LOG_MOVE_SAMPLE', float),
+    'DB_PATH': ('TICTACTOE_DB', str),
+    'ARCHIVE_DB': ('TICTACTOE_ARCHIVE_DB', str),
+    'MAX_GAMES': ('TICTACTOE_MAX_GAMES', int),
+    'IDLE_TTL': ('TICTACTOE_IDLE_TTL', float),
+    'FINISHED_TTL': ('TICTACTOE_FINISHED_TTL', float),
+    'WAL_DIR': ('TICTACTOE_WAL_DIR', str),
+    'WAL_FSYNC': ('TICTACTOE_WAL_FSYNC', str),
+    'SNAPSHOT_INTERVAL': ('TICTACTOE_SNAPSHOT_INTERVAL', float),
+    'PROFILER_TOKEN': ('TICTACTOE_PROFILER_TOKEN', str),
+    'PROFILER_MAX_SECONDS': ('TICTACTOE_PROFILER_MAX_SECONDS', float),
+    'WARM_UP': ('TICTACTOE_WARM_UP', _flag),
+}
+
+DEFAULTS = {
+    'LOGGING': True,
+    'LOG_DIR': 'logs',
+    'LOG_FORMAT': 'text',
+    'LOG_MOVE_SAMPLE': 1.0,
+    'DB_PATH': None,
+    'ARCHIVE_DB': None,
+    'MAX_GAMES': None,
+    'IDLE_TTL': None,
+    'FINISHED_TTL': None,
+    'WAL_DIR': None,
+    'WAL_FSYNC': 'always',
+    'SNAPSHOT_INTERVAL': None,
+    'PROFILER_TOKEN': None,
+    'PROFILER_MAX_SECONDS': 20.0,
+    'WARM_UP': True,
+    'GAME_MANAGER': None,
+    'GAME_STORE': None,
+}
+
+_ROUTES: List[Tuple[str, List[str], Callable]] = []
+_default_lock = threading.Lock()
+
+
+def config_from_env(environ=os.environ) -> dict:
+    """create_app settings, from the defaults and any TICTACTOE_* variables that are set"""
+    config = dict(DEFAULTS)
+    for key, (name, parse) in ENVIRONMENT.items():
+        value = environ.get(name)
+        if value:
+            config[key] = parse(value)
+    return config
+
+
+def warm_up():
+    """
+    Build the process-wide lookup tables now rather than on first use
+    
+    Builds the 3x3 outcome table and fills the perfect strategy's
+    transposition table from the empty board. Calling it in a pre-fork
+    master (see gunicorn.conf.py) lets every worker share the tables
+    copy-on-write instead of each building its own.
+    """
+    outcome_table.get_table()
+    get_strategy('perfect').choose_move(TicTacToeGame('warm_up', 'perfect'))
+
+
+def _configure_logging(config: dict):
+    log_file = None
+    if config['LOG_DIR']:
+        os.makedirs(config['LOG_DIR'], exist_ok=True)
+        log_file = os.path.join(config['LOG_DIR'], f'tictactoe_{datetime.now().strftime("%Y%m%d")}.log')
+    configure_logging(log_file, fmt=config['LOG_FORMAT'], move_sample_rate=float(config['LOG_MOVE_SAMPLE']))
+
+
+def _game_store(config: dict) -> GameStore:
+    if config['DB_PATH']:
+        return SQLiteGameStore(config['DB_PATH'])
+    wal = None
+    if config['WAL_DIR']:
+        wal = MoveLog(config['WAL_DIR'], fsync=config['WAL_FSYNC'], snapshot_interval=config['SNAPSHOT_INTERVAL'])
+        atexit.register(wal.close)
+    return MemoryGameStore(
+        max_games=config['MAX_GAMES'],
+        idle_ttl=config['IDLE_TTL'],
+        finished_ttl=config['FINISHED_TTL'],
+        archive=SQLiteGameStore(config['ARCHIVE_DB']) if config['ARCHIVE_DB'] else None,
+        wal=wal
+    )
+
+
+def create_app(config: Optional[dict] = None) -> Flask:
+    """
+    Build a Flask app serving the Tic-Tac-Toe API
+    
+    Args:
+        config: Settings overriding config_from_env(): any key of DEFAULTS.
+            GAME_MANAGER injects the GameManager to serve and GAME_STORE a
+            store for a new one; otherwise the store is built from the
+            DB_PATH, ARCHIVE_DB, retention and WAL settings. LOGGING=False
+            leaves logging configuration to the caller, and LOG_DIR=None
+            logs to the console only.
+            
+    Returns:
+        The app, with its GameManager at ``app.extensions['tictactoe']``
+    """
+    settings = {**config_from_env(), **(config or {})}
+    if settings['LOGGING']:
+        _configure_logging(settings)
+    if settings['WARM_UP']:
+        warm_up()
+        
+    flask_app = Flask(__name__)
+    flask_app.config.update(settings)
+    flask_app.json = json_provider.PROVIDER(flask_app)
+    CORS(flask_app)
+    flask_app.before_request(_start_timer)
+    flask_app.after_request(_record_request)
+    for rule, methods, view in _ROUTES:
+        flask_app.add_url_rule(rule, view_func=view, methods=methods)
+        
+    manager = settings['GAME_MANAGER']
+    if manager is None:
+        manager = GameManager(settings['GAME_STORE'] or _game_store(settings))
+    flask_app.extensions['tictactoe'] = manager
+    return flask_app
+
+
+def __getattr__(name: str):
+    """Build the default ``app`` and ``game_manager`` from the environment on first access"""
+    if name not in ('app', 'game_manager'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _default_lock:
+        if 'app' not in globals():
+            default = create_app()
+            globals().setdefault('game_manager', default.extensions['tictactoe'])
+            globals()['app'] = default
+    return globals()[name]
+
+
+def _route(rule: str, methods: List[str]):
+    """Register a view for every app create_app builds"""
+    def register(view: Callable) -> Callable:
+        _ROUTES.append((rule, methods, view))
+        return view
+    return register
+
+
+def _games() -> GameManager:
+    """The GameManager of the app handling the current request"""
+    return current_app.extensions['tictactoe']
+
+
+def _start_timer():
+    g.started = time.perf_counter()
+
+
+def _record_request(response):
+    # Requests that never reached a route (404, 405) share one label
+    metrics.observe_request(request.endpoint or 'unmatched', response.status_code,
+                            time.perf_counter() - g.started)
+    return response
 
-logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app)
+def _compact(body) -> str:
+    return current_app.json.dumps(body, separators=(',', ':'))
 
-# Initialize game manager
-game_manager = GameManager()
 
+def _reply(body, status_code):
+    """Respond with a dict as JSON, or with a CachedJSON honouring If-None-Match"""
+    if not isinstance(body, service.CachedJSON):
+        return jsonify(body), status_code
+    if request.if_none_match.contains_weak(body.etag):
+        response = Response(status=304)
+    else:
+        response = Response(body.render(_compact), status=status_code, mimetype='application/json')
+    response.set_etag(body.etag)
+    return response
 
-@app.route('/game', methods=['POST'])
+
+@_route('/game', ['POST'])
 def create_game():
     """Create a new game"""
     try:
-        game = game_manager.create_game()
-        logger.info(f"Created new game: {game.game_id}")
-        
-        response = {
-            'game_id': game.game_id,
-            'board': game.board,
-            'status': game.status,
-            'message': 'Game created successfully. You are X, server is O. Make your move!'
-        }
-        return jsonify(response), 201
+        body, status_code = service.create_game(_games(), request.get_json(silent=True))
+        return jsonify(body), status_code
         
     except Exception as e:
-        logger.error(f"Error creating game: {str(e)}", exc_info=True)
+        logger.error("Error creating game: %s", e, exc_info=True)
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 
-@app.route('/games', methods=['GET'])
+@_route('/games', ['GET'])
 def get_all_games():
-    """Get all games in chronological order"""
+    """Get one page of games in chronological order"""
     try:
-        games = game_manager.get_all_games()
-        logger.info(f"Retrieved {len(games)} games")
-        
-        games_summary = []
-        for game in games:
-            games_summary.append({
-                'game_id': game.game_id,
-                'status': game.status,
-                'winner': game.winner,
-                'board': game.board,
-                'created_at': game.created_at.isoformat() + 'Z'
-            })
-            
-        return jsonify({'games': games_summary}), 200
+        body, status_code = service.list_games(_games(), request.args, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        return _reply(body, status_code)
         
     except Exception as e:
-        logger.error(f"Error retrieving games: {str(e)}", exc_info=True)
+        logger.error("Error retrieving games: %s", e, exc_info=True)
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 
-@app.route('/game/<game_id>/move', methods=['POST'])
+@_route('/games/export', ['GET'])
+def export_games():
+    """Stream every game with its moves as newline-delimited JSON"""
+    after, status, winner, error = service.parse_list_args(request.args)
+    if error:
+        body, status_code = error
+        return jsonify(body), status_code
+    lines = service.export_lines(_games(), after, status, winner, EXPORT_PAGE_SIZE, current_app.json.dumps)
+    return Response(lines, mimetype='application/x-ndjson')
+
+
+@_route('/game/<game_id>/move', ['POST'])
 def make_move(game_id):
     """Player makes a move"""
     try:
-        # Get game
-        game = game_manager.get_game(game_id)
-        if not game:
-            logger.warning(f"Game not found: {game_id}")
-            return jsonify({'error': 'Game not found'}), 404
-            
-        # Check if game is already finished
-        if game.status != 'in_progress':
-            logger.info(f"Attempted move on finished game: {game_id}")
-            return jsonify({
-                'error': 'Game is already finished',
-                'game_id': game.game_id,
-                'board': game.board,
-                'status': game.status,
-                'winner': game.winner,
-                'message': f'Game is {game.status}'
-            }), 400
-            
-        # Parse request
-        data = request.get_json()
-        if not data or 'row' not in data or 'col' not in data:
-            logger.warning(f"Invalid move request for game {game_id}: missing row or col")
-            return jsonify({'error': 'Invalid request', 'details': 'row and col are required'}), 400
-            
-        row = data['row']
-        col = data['col']
-        
-        # Validate input
-        if not isinstance(row, int) or not isinstance(col, int):
-            return jsonify({'error': 'Invalid request', 'details': 'row and col must be integers'}), 400
-            
-        if not (0 <= row <= 2 and 0 <= col <= 2):
-            return jsonify({'error': 'Invalid move', 'details': 'row and col must be between 0 and 2'}), 400
-            
-        # Make player move
-        if not game.make_move(row, col, TicTacToeGame.PLAYER):
-            logger.warning(f"Invalid move for game {game_id}: ({row}, {col})")
-            return jsonify({'error': 'Invalid move', 'details': 'Position is already occupied or invalid'}), 400
-            
-        logger.info(f"Player move in game {game_id}: ({row}, {col})")
-        
-        # Check if player won
-        game.update_status()
-        if game.status != 'in_progress':
-            logger.info(f"Game {game_id} finished after player move: {game.status}")
-            return jsonify({
-                'game_id': game.game_id,
-                'board': game.board,
-                'status': game.status,
-                'winner': game.winner,
-                'message': f'Game over! Result: {game.status}'
-            }), 200
-            
-        # Server makes move
-        server_move = game.make_random_move()
-        if server_move:
-            logger.info(f"Server move in game {game_id}: {server_move}")
-        
-        # Check game status after server move
-        game.update_status()
-        
-        message = 'Your turn!' if game.status == 'in_progress' else f'Game over! Result: {game.status}'
-        logger.info(f"Game {game_id} status after server move: {game.status}")
+        body, status_code = service.play_move(_games(), game_id, request.get_json(silent=True))
+        return jsonify(body), status_code
         
-        return jsonify({
-            'game_id': game.game_id,
-            'board': game.board,
-            'status': game.status,
-            'winner': game.winner,
-            'message': message
-        }), 200
+    except Exception as e:
+        logger.error("Error making move in game %s: %s", game_id, e, exc_info=True)
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+
+@_route('/games/moves', ['POST'])
+def make_moves():
+    """Apply a batch of player moves across any number of games"""
+    try:
+        data = request.get_json(silent=True)
+        moves = data.get('moves') if isinstance(data, dict) else None
+        body, status_code = service.play_moves(_games(), moves, MAX_BATCH_SIZE)
+        return jsonify(body), status_code
         
     except Exception as e:
-        logger.error(f"Error making move in game {game_id}: {str(e)}", exc_info=True)
+        logger.error("Error applying batch moves: %s", e, exc_info=True)
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 
-@app.route('/game/<game_id>/moves', methods=['GET'])
+@_route('/game/<game_id>/moves', ['GET'])
 def get_game_moves(game_id):
     """Get all moves for a game"""
     try:
-        game = game_manager.get_game(game_id)
-        if not game:
-            logger.warning(f"Game not found: {game_id}")
-            return jsonify({'error': 'Game not found'}), 404
-            
-        moves = game.get_moves()
-        logger.info(f"Retrieved {len(moves)} moves for game {game_id}")
-        
-        return jsonify({
-            'game_id': game_id,
-            'moves': moves
-        }), 200
+        body, status_code = service.game_moves(_games(), game_id)
+        return _reply(body, status_code)
         
     except Exception as e:
-        logger.error(f"Error retrieving moves for game {game_id}: {str(e)}", exc_info=True)
+        logger.error("Error retrieving moves for game %s: %s", game_id, e, exc_info=True)
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 
-@app.route('/health', methods=['GET'])
+@_route('/metrics', ['GET'])
+def get_metrics():
+    """Prometheus metrics"""
+    return Response(metrics.render(_games()), content_type=metrics.CONTENT_TYPE)
+
+
+@_route('/health', ['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy'}), 200
+    body, status_code = service.health(_games())
+    return jsonify(body), status_code
+
+
+@_route('/admin/profile', ['POST'])
+def profile():
+    """Sample the stacks of request threads for a while (admin only, see app.profiler)"""
+    token = current_app.config['PROFILER_TOKEN']
+    if not token:
+        abort(404)
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return jsonify({'error': 'Admin token required'}), 401, {'WWW-Authenticate': 'Bearer'}
+        
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval', profiler.DEFAULT_INTERVAL))
+    except ValueError:
+        return jsonify({'error': 'seconds and interval must be numbers'}), 400
+    if not (math.isfinite(seconds) and math.isfinite(interval)):
+        return jsonify({'error': 'seconds and interval must be finite'}), 400
+    output = request.args.get('format', 'json')
+    limit = min(float(current_app.config['PROFILER_MAX_SECONDS']), profiler.MAX_SECONDS)
+    if not 0 < seconds <= limit:
+        return jsonify({'error': f'seconds must be between 0 and {limit:g}'}), 400
+    interval = min(max(interval, profiler.MIN_INTERVAL), seconds)
+    if output not in ('json', 'collapsed'):
+        return jsonify({'error': "format must be 'json' or 'collapsed'"}), 400
+        
+    logger.info("Profiling request threads for %.1f s", seconds)
+    try:
+        stacks, ticks = profiler.sample(seconds, interval, current_app.view_functions)
+    except profiler.ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    if output == 'collapsed':
+        return Response(profiler.collapsed(stacks), mimetype='text/plain',
+                        headers={'Content-Disposition': 'attachment; filename=profile.collapsed'})
+    body = profiler.summary(stacks, ticks, interval)
+    body['collapsed'] = profiler.collapsed(stacks)
+    return jsonify(body), 200
 
 
 def run_server(host='0.0.0.0', port=5000, debug=False):
     """Run the Flask server"""
-    logger.info(f"Starting Tic-Tac-Toe server on {host}:{port}")
-    app.run(host=host, port=port, debug=debug)
+    flask_app = create_app()
+    logger.info("Starting Tic-Tac-Toe server on %s:%s", host, port)
+    flask_app.run(host=host, port=port, debug=debug)
 
 
 if __name__ == '__main__':
     run_server(debug=True)
-
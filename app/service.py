@@ -0,0 +1,365 @@
+"""
+Request handling shared by the HTTP routes
+
+Each function takes the GameManager plus already-decoded request data and
+returns ``(body, status_code)``, so the same logic backs single requests,
+batched requests and any other transport. Bodies are dicts, except for the
+read routes that pollers hit, which return a CachedJSON.
+"""
+import hashlib
+import logging
+from typing import Any, Callable, Iterator, Mapping, Optional, Tuple, Union
+
+from app.ai import DEFAULT_STRATEGY
+from app.game_logic import DEFAULT_K, DEFAULT_SIZE, STATUSES, GameManager, TicTacToeGame
+from app.storage import game_seq
+
+
+logger = logging.getLogger(__name__)
+# Several records per move; sampled by app.logging_config
+move_logger = logging.getLogger(__name__ + '.moves')
+
+
+class CachedJSON:
+    """
+    Response body assembled from cached JSON fragments
+    
+    ``etag`` identifies the content without serializing anything, so a
+    conditional request that matches can be answered with 304 before
+    ``render`` is called.
+    """
+    
+    __slots__ = ('etag', '_render')
+    
+    def __init__(self, etag: str, render: Callable[[Callable[[Any], str]], str]):
+        self.etag = etag
+        self._render = render
+        
+    def render(self, dumps: Callable[[Any], str]) -> str:
+        """The JSON text, with any fragment not cached yet built by ``dumps``"""
+        return self._render(dumps)
+
+
+def _etag(game: TicTacToeGame, version: int) -> str:
+    """
+    Identity of one version of a game
+    
+    Game IDs and versions restart in every process with its own in-memory
+    store, so the game's creation time in microseconds tells apart two games
+    that share an ID and version.
+    """
+    return f'{game.game_id}.{game.created_us:x}.{version}'
+
+
+def create_game(game_manager: GameManager, data: Any) -> Tuple[dict, int]:
+    """
+    Create a new game from an optional {'strategy', 'size', 'k'} request body
+    
+    Returns:
+        Tuple of (response body, HTTP status code)
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        return {'error': 'Invalid request', 'details': 'body must be a JSON object'}, 400
+    strategy = data.get('strategy', DEFAULT_STRATEGY)
+    if not isinstance(strategy, str):
+        return {'error': 'Invalid request', 'details': 'strategy must be a string'}, 400
+    try:
+        game = game_manager.create_game(
+            strategy,
+            data.get('size', DEFAULT_SIZE),
+            data.get('k', DEFAULT_K)
+        )
+    except ValueError as e:
+        logger.warning("Invalid create game request: %s", e)
+        return {'error': 'Invalid request', 'details': str(e)}, 400
+    logger.info("Created new game: %s (%sx%s, k=%s, strategy: %s)", game.game_id, game.size, game.size, game.k, game.strategy)
+    
+    return {
+        'game_id': game.game_id,
+        'board': game.board,
+        'size': game.size,
+        'k': game.k,
+        'status': game.status,
+        'strategy': game.strategy,
+        'message': 'Game created successfully. You are X, server is O. Make your move!'
+    }, 201
+
+
+def game_summary(game: TicTacToeGame) -> dict:
+    """Summary of a game as listed by GET /games"""
+    return {
+        'game_id': game.game_id,
+        'status': game.status,
+        'winner': game.winner,
+        'board': game.board,
+        'size': game.size,
+        'k': game.k,
+        'strategy': game.strategy,
+        'created_at': game.created_at
+    }
+
+
+def _summary_json(game_manager: GameManager, game: TicTacToeGame, version: int,
+                  dumps: Callable[[Any], str]) -> str:
+    return game_manager.fragments.get('summary', game.game_id, version, lambda: dumps(game_summary(game)))
+
+
+def parse_list_args(args: Mapping[str, str]) -> Tuple[Optional[int], Optional[str], Optional[str], Optional[Tuple[dict, int]]]:
+    """
+    Parse the cursor and filter query parameters shared by the listing routes
+    
+    Returns:
+        Tuple of (after, status, winner, error response or None)
+    """
+    after = args.get('after')
+    status = args.get('status')
+    winner = args.get('winner')
+    try:
+        after = int(after) if after is not None else None
+    except ValueError:
+        return None, None, None, ({'error': 'Invalid request', 'details': 'after must be an integer'}, 400)
+    if status is not None and status not in STATUSES:
+        return None, None, None, ({'error': 'Invalid request', 'details': f"status must be one of: {', '.join(STATUSES)}"}, 400)
+    if winner is not None and winner not in ('player', 'server'):
+        return None, None, None, ({'error': 'Invalid request', 'details': 'winner must be player or server'}, 400)
+    return after, status, winner, None
+
+
+def list_games(game_manager: GameManager, args: Mapping[str, str], default_limit: int, max_limit: int) -> Tuple[Union[dict, CachedJSON], int]:
+    """
+    Get one page of games in chronological order
+    
+    The page is a CachedJSON whose ETag covers the ID and version of every
+    game on it, and whose game summaries come from the fragment cache.
+    
+    Args:
+        game_manager: Manager holding the games
+        args: Query parameters (limit, after, status, winner)
+        default_limit: Page size when no limit is given
+        max_limit: Largest accepted limit
+        
+    Returns:
+        Tuple of (response body, HTTP status code)
+    """
+    after, status, winner, error = parse_list_args(args)
+    if error:
+        return error
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        return {'error': 'Invalid request', 'details': 'limit must be an integer'}, 400
+    if not 1 <= limit <= max_limit:
+        return {'error': 'Invalid request', 'details': f'limit must be between 1 and {max_limit}'}, 400
+        
+    games, next_cursor = game_manager.list_games(after, limit, status, winner)
+    logger.info("Retrieved %s games", len(games))
+    
+    page = [(game, game.version) for game in games]
+    cursor = str(next_cursor) if next_cursor is not None else None
+    identity = ','.join(_etag(game, version) for game, version in page) + f';{cursor}'
+    etag = hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+    
+    def render(dumps):
+        summaries = ','.join(_summary_json(game_manager, game, version, dumps) for game, version in page)
+        return f'{{"games":[{summaries}],"next_cursor":{dumps(cursor)}}}'
+        
+    return CachedJSON(etag, render), 200
+
+
+def export_lines(game_manager: GameManager, after: Optional[int], status: Optional[str],
+                 winner: Optional[str], page_size: int, dumps: Callable[[Any], str]) -> Iterator[str]:
+    """
+    Yield every matching game with its moves as one JSON line
+    
+    Games are read one page at a time, so memory use does not depend on how
+    many games are stored. Each line carries a ``cursor``; pass the last one
+    received as ``after`` to resume an interrupted export.
+    """
+    exported = 0
+    cursor = after
+    try:
+        while True:
+            games, cursor = game_manager.list_games(cursor, page_size, status, winner)
+            for game in games:
+                line = game_summary(game)
+                line['moves'] = game.get_moves()
+                line['cursor'] = str(game_seq(game.game_id))
+                yield dumps(line) + '\n'
+            exported += len(games)
+            if cursor is None:
+                break
+    except Exception as e:
+        logger.error("Error exporting games: %s", e, exc_info=True)
+        raise
+    logger.info("Exported %s games", exported)
+
+
+def play_move(game_manager: GameManager, game_id: str, data: Any) -> Tuple[dict, int]:
+    """
+    Apply a player move and the server's reply
+    
+    Args:
+        game_manager: Manager holding the game
+        game_id: ID of the game to play in
+        data: Decoded request body, expected to hold integer 'row' and 'col'
+        
+    Returns:
+        Tuple of (response body, HTTP status code)
+    """
+    with game_manager.locked_game(game_id) as game:
+        if not game:
+            logger.warning("Game not found: %s", game_id)
+            return {'error': 'Game not found'}, 404
+            
+        # Check if game is already finished
+        if game.status != 'in_progress':
+            logger.info("Attempted move on finished game: %s", game_id)
+            return {
+                'error': 'Game is already finished',
+                'game_id': game.game_id,
+                'board': game.board,
+                'status': game.status,
+                'winner': game.winner,
+                'message': f'Game is {game.status}'
+            }, 400
+            
+        # Parse request
+        if not isinstance(data, dict) or 'row' not in data or 'col' not in data:
+            logger.warning("Invalid move request for game %s: missing row or col", game_id)
+            return {'error': 'Invalid request', 'details': 'row and col are required'}, 400
+            
+        row = data['row']
+        col = data['col']
+        
+        # Validate input
+        if not isinstance(row, int) or not isinstance(col, int):
+            return {'error': 'Invalid request', 'details': 'row and col must be integers'}, 400
+            
+        if not (0 <= row < game.size and 0 <= col < game.size):
+            return {'error': 'Invalid move', 'details': f'row and col must be between 0 and {game.size - 1}'}, 400
+            
+        # Make player move
+        if not game.make_move(row, col, TicTacToeGame.PLAYER):
+            logger.warning("Invalid move for game %s: (%s, %s)", game_id, row, col)
+            return {'error': 'Invalid move', 'details': 'Position is already occupied or invalid'}, 400
+            
+        move_logger.info("Player move in game %s: (%s, %s)", game_id, row, col)
+        
+        # Check if player won
+        game.update_status()
+        if game.status != 'in_progress':
+            move_logger.info("Game %s finished after player move: %s", game_id, game.status)
+            return {
+                'game_id': game.game_id,
+                'board': game.board,
+                'status': game.status,
+                'winner': game.winner,
+                'message': f'Game over! Result: {game.status}'
+            }, 200
+            
+        # Server makes move
+        server_move = game.make_server_move()
+        if server_move:
+            move_logger.info("Server move in game %s: %s", game_id, server_move)
+            
+        # Check game status after server move
+        game.update_status()
+        
+        message = 'Your turn!' if game.status == 'in_progress' else f'Game over! Result: {game.status}'
+        move_logger.info("Game %s status after server move: %s", game_id, game.status)
+        
+        return {
+            'game_id': game.game_id,
+            'board': game.board,
+            'status': game.status,
+            'winner': game.winner,
+            'message': message
+        }, 200
+
+
+def play_moves(game_manager: GameManager, moves: Any, max_moves: int) -> Tuple[dict, int]:
+    """
+    Apply a batch of player moves, possibly across many games
+    
+    Every item is handled exactly like a single move request and gets its own
+    result; one failing item does not affect the others.
+    
+    Args:
+        game_manager: Manager holding the games
+        moves: Decoded list of {'game_id', 'row', 'col'} objects
+        max_moves: Largest accepted batch
+        
+    Returns:
+        Tuple of (response body with one result per item, HTTP status code)
+    """
+    if not isinstance(moves, list) or not moves:
+        return {'error': 'Invalid request', 'details': 'moves must be a non-empty list'}, 400
+    if len(moves) > max_moves:
+        return {'error': 'Invalid request', 'details': f'at most {max_moves} moves per batch'}, 400
+        
+    results = []
+    for item in moves:
+        game_id = item.get('game_id') if isinstance(item, dict) else None
+        if not isinstance(game_id, str):
+            body, code = {'error': 'Invalid request', 'details': 'game_id is required'}, 400
+        else:
+            try:
+                body, code = play_move(game_manager, game_id, item)
+            except Exception as e:
+                logger.error("Error making move in game %s: %s", game_id, e, exc_info=True)
+                body, code = {'error': 'Internal server error', 'details': str(e)}, 500
+        results.append({'code': code, 'body': body})
+        
+    logger.info("Applied batch of %s moves", len(moves))
+    return {'results': results}, 200
+
+
+def game_state(game_manager: GameManager, game_id: str) -> Tuple[dict, int]:
+    """
+    Get the current state of a game
+    
+    Returns:
+        Tuple of (response body, HTTP status code)
+    """
+    game = game_manager.get_game(game_id)
+    if not game:
+        logger.warning("Game not found: %s", game_id)
+        return {'error': 'Game not found'}, 404
+        
+    return {
+        'game_id': game.game_id,
+        'board': game.board,
+        'size': game.size,
+        'k': game.k,
+        'status': game.status,
+        'winner': game.winner,
+        'strategy': game.strategy
+    }, 200
+
+
+def game_moves(game_manager: GameManager, game_id: str) -> Tuple[Union[dict, CachedJSON], int]:
+    """
+    Get all moves for a game, as a CachedJSON tagged with the game's version
+    
+    Returns:
+        Tuple of (response body, HTTP status code)
+    """
+    game = game_manager.get_game(game_id)
+    if not game:
+        logger.warning("Game not found: %s", game_id)
+        return {'error': 'Game not found'}, 404
+        
+    version = game.version
+    logger.info("Retrieved %s moves for game %s", len(game.moves), game_id)
+    
+    def render(dumps):
+        return game_manager.fragments.get('moves', game_id, version,
+                                          lambda: dumps({'game_id': game_id, 'moves': game.get_moves()}))
+                                          
+    return CachedJSON(_etag(game, version), render), 200
+
+
+def health(game_manager: GameManager) -> Tuple[dict, int]:
+    """Health check body"""
+    return {'status': 'healthy', 'games': game_manager.stats()}, 200
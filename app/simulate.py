@@ -0,0 +1,232 @@
+"""
+Headless self-play on the classic 3x3 board
+
+Plays large numbers of games between two move policies without creating
+TicTacToeGame objects. Positions are the packed bitboard keys of
+app.bitboard, and every result comes from the outcome table that
+TicTacToeGame.check_winner also uses, itself built from the same WIN_LINES,
+so simulated games follow exactly the server's rules.
+
+Each policy is turned into a list, indexed by position key, of the cells it
+may play there; a move is one random pick from that list. Batches can be
+spread over a process pool, and games are written to a compact file of
+variable-length records:
+
+- one byte with the result code (1 player wins, 2 server wins, 3 draw) in
+  the low two bits and the move count in the next four
+- the cells of the moves, two per byte, first move in the low nibble
+
+The player ('X') always moves first, as in the server.
+
+Usage:
+    python -m app.simulate 1000000 --player random --server perfect --workers 4 --output games.bin
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app import outcome_table
+from app.bitboard import FULL_BOARD, encode
+from app.game_logic import STATUS_CODES
+from app.outcome_table import STATUS_BY_RESULT
+
+MAGIC = b'TTTSIM1\0'
+RESULTS = {result: STATUS_CODES[status] for result, (status, _) in STATUS_BY_RESULT.items()}
+DEFAULT_BATCH = 10000
+
+# A policy picks, for a position with the player ('X') to move when
+# ``player_to_move``, the cells it would play as a tuple to choose from
+Policy = Callable[[int, int, bool], Tuple[int, ...]]
+
+
+def _free_cells(player_bits: int, server_bits: int) -> Tuple[int, ...]:
+    occupied = player_bits | server_bits
+    return tuple(cell for cell in range(9) if not occupied & (1 << cell))
+
+
+def random_policy(player_bits: int, server_bits: int, player_to_move: bool) -> Tuple[int, ...]:
+    """Any empty cell, like TicTacToeGame.make_random_move"""
+    return _free_cells(player_bits, server_bits)
+
+
+def perfect_policy(player_bits: int, server_bits: int, player_to_move: bool) -> Tuple[int, ...]:
+    """Every empty cell that keeps the best-play value of the position"""
+    table = outcome_table.get_table()
+    values = {}
+    for cell in _free_cells(player_bits, server_bits):
+        bit = 1 << cell
+        child = encode(player_bits | bit, server_bits) if player_to_move else encode(player_bits, server_bits | bit)
+        values[cell] = table[child].value
+    best = max(values.values()) if player_to_move else min(values.values())
+    return tuple(cell for cell, value in values.items() if value == best)
+
+
+POLICIES: Dict[str, Policy] = {
+    'random': random_policy,
+    'perfect': perfect_policy,
+}
+
+_choices: Dict[str, List[Optional[Tuple[int, ...]]]] = {}
+_results: List[int] = []
+
+
+def _results_by_key() -> List[int]:
+    """Result code of every reachable position, indexed by position key"""
+    if not _results:
+        results = [0] * (1 << 18)
+        for key, position in outcome_table.get_table().items():
+            results[key] = RESULTS[position.result]
+        _results[:] = results
+    return _results
+
+
+def _choices_by_key(policy: str) -> List[Optional[Tuple[int, ...]]]:
+    """Cells the policy may play in every reachable unfinished position, indexed by position key"""
+    choices = _choices.get(policy)
+    if choices is None:
+        choose = POLICIES[policy]
+        choices = [None] * (1 << 18)
+        for key, position in outcome_table.get_table().items():
+            if position.result is None:
+                player_bits = key & FULL_BOARD
+                server_bits = key >> 9
+                player_to_move = bin(player_bits).count('1') == bin(server_bits).count('1')
+                choices[key] = choose(player_bits, server_bits, player_to_move)
+        _choices[policy] = choices
+    return choices
+
+
+def play_batch(player: str, server: str, games: int, seed: Optional[int] = None) -> Tuple[List[int], bytes]:
+    """
+    Play ``games`` games of ``player`` against ``server``
+    
+    Returns:
+        Counts of games by result code, by length at index 4 + moves, and
+        the games as file records
+    """
+    results = _results_by_key()
+    sides = ((_choices_by_key(player), 0), (_choices_by_key(server), 9))
+    rand = random.Random(seed).random
+    counts = [0] * 14
+    records = bytearray()
+    
+    for _ in range(games):
+        key = 0
+        cells = []
+        code = 0
+        turn = 0
+        while not code:
+            choices, shift = sides[turn]
+            options = choices[key]
+            cell = options[int(rand() * len(options))]
+            cells.append(cell)
+            key |= 1 << (cell + shift)
+            code = results[key]
+            turn ^= 1
+            
+        moves = len(cells)
+        counts[code] += 1
+        counts[4 + moves] += 1
+        records.append(code | moves << 2)
+        if moves % 2:
+            cells.append(0)
+        records.extend(cells[i] | cells[i + 1] << 4 for i in range(0, moves, 2))
+        
+    return counts, bytes(records)
+
+
+def read_games(path: str) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    """Yield ``(result code, move cells)`` for every game in a simulation file"""
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a simulation file")
+    position = len(MAGIC)
+    while position < len(data):
+        header = data[position]
+        moves = header >> 2
+        packed = data[position + 1:position + 1 + (moves + 1) // 2]
+        cells = tuple(byte >> shift & 0xF for byte in packed for shift in (0, 4))[:moves]
+        yield header & 3, cells
+        position += 1 + len(packed)
+
+
+def _warm(player: str, server: str):
+    """Build the lookup lists once per worker process"""
+    _choices_by_key(player)
+    _choices_by_key(server)
+
+
+def simulate(games: int, player: str = 'random', server: str = 'random', workers: int = 1,
+             output: Optional[str] = None, batch: int = DEFAULT_BATCH, seed: Optional[int] = None) -> dict:
+    """
+    Play ``games`` games and return outcome statistics, writing them to ``output`` if given
+    
+    With ``workers`` above 1 batches of ``batch`` games are played in a process
+    pool. A ``seed`` makes the games reproducible for a given batch size,
+    whatever the number of workers.
+    """
+    for policy in (player, server):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Choose one of: {', '.join(sorted(POLICIES))}")
+    started = time.perf_counter()
+    sizes = [min(batch, games - done) for done in range(0, games, batch)]
+    seeds = [None if seed is None else seed * 1000003 + index for index in range(len(sizes))]
+    counts = [0] * 14
+    
+    handle = open(output, 'wb') if output else None
+    try:
+        if handle:
+            handle.write(MAGIC)
+        if workers > 1:
+            pool = ProcessPoolExecutor(workers, initializer=_warm, initargs=(player, server))
+            batches = pool.map(play_batch, [player] * len(sizes), [server] * len(sizes), sizes, seeds)
+        else:
+            pool = None
+            batches = map(play_batch, [player] * len(sizes), [server] * len(sizes), sizes, seeds)
+        try:
+            for batch_counts, records in batches:
+                counts = [total + count for total, count in zip(counts, batch_counts)]
+                if handle:
+                    handle.write(records)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    finally:
+        if handle:
+            handle.close()
+            
+    elapsed = time.perf_counter() - started
+    return {
+        'games': games,
+        'player': player,
+        'server': server,
+        'results': {status: counts[code] for status, code in STATUS_CODES.items() if code},
+        'lengths': {moves: counts[4 + moves] for moves in range(5, 10) if counts[4 + moves]},
+        'seconds': round(elapsed, 3),
+        'games_per_minute': round(games / elapsed * 60) if elapsed else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='python -m app.simulate', description="Headless tic-tac-toe self-play")
+    parser.add_argument('games', type=int, help="number of games to play")
+    parser.add_argument('--player', default='random', choices=sorted(POLICIES), help="policy moving first (X)")
+    parser.add_argument('--server', default='random', choices=sorted(POLICIES), help="policy moving second (O)")
+    parser.add_argument('--workers', type=int, default=1, help="processes to play in")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="games per batch")
+    parser.add_argument('--seed', type=int, help="seed for reproducible games")
+    parser.add_argument('--output', help="file to write the games to")
+    args = parser.parse_args(argv)
+    
+    stats = simulate(args.games, args.player, args.server, args.workers, args.output, args.batch, args.seed)
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
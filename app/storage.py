@@ -0,0 +1,534 @@
+"""
+Storage backends for GameManager
+
+``MemoryGameStore`` keeps games in a process-local dict and is the default.
+``SQLiteGameStore`` keeps them in a SQLite database in WAL mode, so several
+worker processes on one host (for example gunicorn workers) share the same
+games.
+"""
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.game_logic import TicTacToeGame
+
+
+class GameStore(ABC):
+    """
+    Interface implemented by every storage backend
+    
+    ``get`` returns the current state of a game for reading. Changes to a
+    game must be made inside ``transaction``, which serializes writers and
+    persists the game when the block exits.
+    """
+    
+    games: Mapping
+    
+    @property
+    @abstractmethod
+    def game_counter(self) -> int:
+        """Number of game IDs handed out so far"""
+        
+    @abstractmethod
+    def create(self, factory: Callable[[str], 'TicTacToeGame']) -> 'TicTacToeGame':
+        """Allocate a new game ID, build the game with ``factory(game_id)`` and store it"""
+        
+    @abstractmethod
+    def get(self, game_id: str) -> Optional['TicTacToeGame']:
+        """The game with ``game_id``, or None if it is unknown"""
+        
+    @abstractmethod
+    def transaction(self, game_id: str) -> ContextManager[Optional['TicTacToeGame']]:
+        """Context manager yielding the game (None if unknown) to change, and persisting it on exit"""
+        
+    @abstractmethod
+    def all_games(self) -> List['TicTacToeGame']:
+        """All games in creation order"""
+        
+    @abstractmethod
+    def page(self, after: Optional[int] = None, limit: int = 100,
+             status: Optional[str] = None, winner: Optional[str] = None
+             ) -> Tuple[List['TicTacToeGame'], Optional[int]]:
+        """
+        One page of games in creation order
+        
+        Args:
+            after: Cursor returned with the previous page; None starts at the beginning
+            limit: Most games to return
+            status: Only games with this status
+            winner: Only games won by this side
+            
+        Returns:
+            The games, and the cursor for the next page (None on the last page)
+        """
+        
+    def stats(self) -> dict:
+        """Counters describing the store, such as the resident game count"""
+        return {'resident': len(self.games)}
+
+
+def game_seq(game_id: str) -> int:
+    """Creation sequence number of a game, which doubles as its pagination cursor"""
+    return int(game_id.rsplit('_', 1)[1])
+
+
+class _SeqIndex:
+    """
+    Sorted list of game sequence numbers
+    
+    Entries are removed as soon as a game leaves the index, so readers never
+    step over dead entries. Games mostly leave oldest first, so removing the
+    first entry only advances ``head``; the dead prefix is cut off once it is
+    half the list, which keeps those removals amortized O(1). Any other
+    entry is deleted in place.
+    """
+    
+    def __init__(self):
+        self.seqs: List[int] = []
+        self.head = 0
+        
+    def __len__(self) -> int:
+        return len(self.seqs) - self.head
+        
+    def live(self) -> List[int]:
+        """The sequence numbers in the index, in order"""
+        return self.seqs[self.head:]
+        
+    def start(self, after: Optional[int]) -> int:
+        """Position of the first entry after the cursor ``after`` (None for the beginning)"""
+        if after is None:
+            return self.head
+        return bisect.bisect_right(self.seqs, after, self.head)
+        
+    def add(self, seq: int):
+        if not len(self):
+            self.seqs = [seq]
+            self.head = 0
+        elif seq > self.seqs[-1]:
+            self.seqs.append(seq)
+        else:
+            position = bisect.bisect_left(self.seqs, seq, self.head)
+            if self.seqs[position] != seq:
+                self.seqs.insert(position, seq)
+                
+    def discard(self, seq: int):
+        position = bisect.bisect_left(self.seqs, seq, self.head)
+        if position == len(self.seqs) or self.seqs[position] != seq:
+            return
+        if position == self.head:
+            self.head += 1
+            if self.head * 2 > len(self.seqs):
+                del self.seqs[:self.head]
+                self.head = 0
+        else:
+            del self.seqs[position]
+
+
+class MemoryGameStore(GameStore):
+    """
+    In-process storage
+    
+    Game IDs come from a counter, and games are guarded by striped locks so
+    writers on different games almost never contend, without a lock object
+    per game. Games are indexed by creation order, status and winner, so
+    pages of games are read without sorting or scanning the whole store.
+    
+    Retention is optional and amortized O(1): in-progress games are kept in
+    least-recently-used order and finished games in the order they finished,
+    so every request only inspects the oldest entry of each queue.
+    
+    Args:
+        lock_stripes: Number of locks games are spread over
+        max_games: Most games kept resident; finished games are evicted first
+        idle_ttl: Seconds an in-progress game may go untouched
+        finished_ttl: Seconds a finished game is kept after it ends
+        archive: Optional cold store with ``put(game)`` and ``get(game_id)``
+            (for example a SQLiteGameStore) that evicted games are spilled to
+            instead of being dropped
+        clock: Time source, in seconds
+        wal: Optional app.wal.MoveLog; the store is recovered from it on
+            construction and every change is logged to it afterwards
+    """
+    
+    def __init__(self, lock_stripes: int = 256, max_games: Optional[int] = None,
+                 idle_ttl: Optional[float] = None, finished_ttl: Optional[float] = None,
+                 archive=None, clock: Callable[[], float] = time.monotonic, wal=None):
+        self.games: Dict[str, 'TicTacToeGame'] = {}
+        self._counter = 0
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.finished_ttl = finished_ttl
+        self.archive = archive
+        self._clock = clock
+        # Guards the counter, the indexes and the retention queues; held only briefly
+        self._lock = threading.Lock()
+        # Creation-order index plus secondary indexes by status and winner
+        self._order = _SeqIndex()
+        self._by_status: Dict[str, _SeqIndex] = defaultdict(_SeqIndex)
+        self._by_winner: Dict[str, _SeqIndex] = defaultdict(_SeqIndex)
+        # game_id -> last access (in progress) or finish time (finished), oldest first
+        self._active: 'OrderedDict[str, float]' = OrderedDict()
+        self._finished: 'OrderedDict[str, float]' = OrderedDict()
+        self.evictions = Counter()
+        self.wal = None
+        if wal is not None:
+            wal.open(self)
+            self.wal = wal
+            self._evict()
+            
+    @property
+    def game_counter(self) -> int:
+        return self._counter
+        
+    def create(self, factory):
+        with self._lock:
+            self._counter += 1
+            seq = self._counter
+        game = factory(f"game_{seq}")
+        with self._lock:
+            self.games[game.game_id] = game
+            self._index(game, seq)
+            self._active[game.game_id] = self._clock()
+            if self.wal is not None:
+                logged = self.wal.log_create(game)
+        self._evict()
+        if self.wal is not None:
+            self.wal.wait(logged)
+        return game
+        
+    def get(self, game_id):
+        game = self.games.get(game_id)
+        if game is None:
+            return self.archive.get(game_id) if self.archive is not None else None
+        self._touch(game_id)
+        self._evict()
+        return game
+        
+    def lock_for(self, game_id: str) -> threading.Lock:
+        """Get the stripe lock guarding a game"""
+        return self._stripes[hash(game_id) % len(self._stripes)]
+        
+    @contextmanager
+    def transaction(self, game_id):
+        logged = 0
+        with self.lock_for(game_id):
+            game = self.games.get(game_id)
+            if game is None and self.archive is not None:
+                # Bring an evicted game back into memory to change it
+                game = self.archive.get(game_id)
+            if game is not None:
+                self._admit(game)
+            start = len(game.moves) if game is not None else 0
+            try:
+                yield game
+            finally:
+                if game is not None and self.wal is not None and len(game.moves) > start:
+                    logged = self.wal.log_moves(game, start)
+            if game is not None:
+                self._admit(game)
+        self._evict()
+        if logged:
+            self.wal.wait(logged)
+            
+    def all_games(self):
+        with self._lock:
+            seqs = self._order.live()
+        games = (self.games.get(f"game_{seq}") for seq in seqs)
+        return [game for game in games if game is not None]
+        
+    def page(self, after=None, limit=100, status=None, winner=None):
+        if status is not None:
+            index = self._by_status.get(status)
+        elif winner is not None:
+            index = self._by_winner.get(winner)
+        else:
+            index = self._order
+        if index is None:
+            return [], None
+            
+        games = []
+        with self._lock:
+            seqs = index.seqs
+            position = index.start(after)
+            while position < len(seqs) and len(games) < limit:
+                game = self.games.get(f"game_{seqs[position]}")
+                position += 1
+                if game is None:
+                    continue
+                if status is not None and game.status != status:
+                    continue
+                if winner is not None and game.winner != winner:
+                    continue
+                games.append(game)
+            more = position < len(seqs)
+        next_cursor = game_seq(games[-1].game_id) if games and more else None
+        return games, next_cursor
+        
+    def stats(self) -> dict:
+        """Resident game count and eviction counters"""
+        return {
+            'resident': len(self.games),
+            'resident_finished': len(self._finished),
+            'evicted': sum(self.evictions.values()),
+            'evicted_by_reason': dict(self.evictions),
+        }
+        
+    def restore(self, game: 'TicTacToeGame'):
+        """Make a recovered game resident without logging it"""
+        self._admit(game)
+        
+    def restore_counter(self, counter: int):
+        """Make sure new game IDs come after ``counter``"""
+        with self._lock:
+            self._counter = max(self._counter, counter)
+            
+    def forget(self, game_id: str):
+        """Drop a game from memory without archiving or logging it"""
+        with self._lock:
+            self._active.pop(game_id, None)
+            self._finished.pop(game_id, None)
+            self._unindex(game_id)
+            
+    def _index(self, game: 'TicTacToeGame', seq: int):
+        """Add a newly resident game to the indexes; caller holds the lock"""
+        self._order.add(seq)
+        self._by_status[game.status].add(seq)
+        if game.winner is not None:
+            self._by_winner[game.winner].add(seq)
+            
+    def _touch(self, game_id: str):
+        with self._lock:
+            if game_id in self._active:
+                self._active[game_id] = self._clock()
+                self._active.move_to_end(game_id)
+                
+    def _admit(self, game: 'TicTacToeGame'):
+        """Make sure a game is resident, indexed and queued according to its status"""
+        game_id = game.game_id
+        seq = game_seq(game_id)
+        now = self._clock()
+        with self._lock:
+            if game_id not in self.games:
+                self.games[game_id] = game
+                self._index(game, seq)
+            if game.status == 'in_progress':
+                self._active[game_id] = now
+                self._active.move_to_end(game_id)
+            elif game_id not in self._finished:
+                # The game just finished: move it from the in-progress index
+                if self._active.pop(game_id, None) is not None:
+                    self._by_status['in_progress'].discard(seq)
+                    self._by_status[game.status].add(seq)
+                    if game.winner is not None:
+                        self._by_winner[game.winner].add(seq)
+                self._finished[game_id] = now
+                
+    def _unindex(self, game_id: str) -> Optional['TicTacToeGame']:
+        """Remove a game from memory and the indexes; caller holds the lock"""
+        game = self.games.pop(game_id, None)
+        if game is not None:
+            seq = game_seq(game_id)
+            self._order.discard(seq)
+            self._by_status[game.status].discard(seq)
+            # A game evicted while a move finishes it is still indexed as in progress
+            self._by_status['in_progress'].discard(seq)
+            if game.winner is not None:
+                self._by_winner[game.winner].discard(seq)
+        return game
+        
+    def _evict(self):
+        """Drop expired games and enforce the cap, looking only at the oldest entries"""
+        if self.max_games is None and self.idle_ttl is None and self.finished_ttl is None:
+            return
+        now = self._clock()
+        evicted = []
+        with self._lock:
+            if self.finished_ttl is not None:
+                while self._finished and now - next(iter(self._finished.values())) >= self.finished_ttl:
+                    evicted.append(self._finished.popitem(last=False)[0])
+                    self.evictions['finished_ttl'] += 1
+            if self.idle_ttl is not None:
+                while self._active and now - next(iter(self._active.values())) >= self.idle_ttl:
+                    evicted.append(self._active.popitem(last=False)[0])
+                    self.evictions['idle_ttl'] += 1
+            if self.max_games is not None:
+                excess = len(self._finished) + len(self._active) - self.max_games
+                while excess > 0:
+                    queue = self._finished if self._finished else self._active
+                    evicted.append(queue.popitem(last=False)[0])
+                    self.evictions['capacity'] += 1
+                    excess -= 1
+                    
+            spilled = []
+            for game_id in evicted:
+                game = self._unindex(game_id)
+                if game is None:
+                    continue
+                spilled.append(game)
+                if self.wal is not None:
+                    self.wal.log_drop(game_id)
+                    
+        if self.archive is not None:
+            for game in spilled:
+                self.archive.put(game)
+
+
+def _load(record: str) -> 'TicTacToeGame':
+    from app.game_logic import TicTacToeGame
+    return TicTacToeGame.from_record(json.loads(record))
+
+
+def _dump(game: 'TicTacToeGame') -> str:
+    return json.dumps(game.to_record(), separators=(',', ':'))
+
+
+class _SQLiteGames(Mapping):
+    """Read-only mapping view of the games table, mirroring MemoryGameStore.games"""
+    
+    def __init__(self, store: 'SQLiteGameStore'):
+        self._store = store
+        
+    def __getitem__(self, game_id):
+        game = self._store.get(game_id)
+        if game is None:
+            raise KeyError(game_id)
+        return game
+        
+    def __iter__(self):
+        rows = self._store._conn().execute("SELECT game_id FROM games ORDER BY seq")
+        return (game_id for (game_id,) in rows)
+        
+    def __len__(self):
+        return self._store._conn().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+
+class SQLiteGameStore(GameStore):
+    """
+    SQLite storage shared by every process that opens the same file
+    
+    WAL mode lets readers proceed while one writer commits. Each transaction
+    takes SQLite's write lock with ``BEGIN IMMEDIATE``, which serializes
+    read-modify-write sequences across threads and processes alike. Each thread
+    (and each forked worker) gets its own connection.
+    """
+    
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self.games = _SQLiteGames(self)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                game_id TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL,
+                winner TEXT,
+                record TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS games_by_status ON games (status, seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS games_by_winner ON games (winner, seq)")
+        
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for the current thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+        
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        
+    @property
+    def game_counter(self) -> int:
+        row = self._conn().execute("SELECT seq FROM sqlite_sequence WHERE name = 'games'").fetchone()
+        return row[0] if row else 0
+        
+    def create(self, factory):
+        with self._write() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'games'").fetchone()
+            seq = (row[0] if row else 0) + 1
+            game = factory(f"game_{seq}")
+            conn.execute(
+                "INSERT INTO games (seq, game_id, status, winner, record) VALUES (?, ?, ?, ?, ?)",
+                (seq, game.game_id, game.status, game.winner, _dump(game))
+            )
+        return game
+        
+    def get(self, game_id):
+        row = self._conn().execute("SELECT record FROM games WHERE game_id = ?", (game_id,)).fetchone()
+        return _load(row[0]) if row else None
+        
+    def put(self, game: 'TicTacToeGame'):
+        """Insert or replace a game, so this store can act as a cold archive"""
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO games (game_id, status, winner, record) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (game_id) DO UPDATE SET "
+                "status = excluded.status, winner = excluded.winner, record = excluded.record",
+                (game.game_id, game.status, game.winner, _dump(game))
+            )
+            
+    @contextmanager
+    def transaction(self, game_id):
+        with self._write() as conn:
+            row = conn.execute("SELECT record FROM games WHERE game_id = ?", (game_id,)).fetchone()
+            game = _load(row[0]) if row else None
+            before = (len(game.moves), game.status) if game else None
+            yield game
+            if game is not None and (len(game.moves), game.status) != before:
+                conn.execute(
+                    "UPDATE games SET status = ?, winner = ?, record = ? WHERE game_id = ?",
+                    (game.status, game.winner, _dump(game), game_id)
+                )
+                
+    def stats(self) -> dict:
+        """Stored game count and how many of those games are finished"""
+        total, finished = self._conn().execute(
+            "SELECT COUNT(*), SUM(status != 'in_progress') FROM games"
+        ).fetchone()
+        return {'resident': total, 'resident_finished': finished or 0}
+        
+    def all_games(self):
+        rows = self._conn().execute("SELECT record FROM games ORDER BY seq")
+        return [_load(record) for (record,) in rows]
+        
+    def page(self, after=None, limit=100, status=None, winner=None):
+        clauses = ["seq > ?"]
+        params: list = [after or 0]
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if winner is not None:
+            clauses.append("winner = ?")
+            params.append(winner)
+        params.append(limit + 1)
+        rows = self._conn().execute(
+            f"SELECT seq, record FROM games WHERE {' AND '.join(clauses)} ORDER BY seq LIMIT ?",
+            params
+        ).fetchall()
+        games = [_load(record) for _, record in rows[:limit]]
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return games, next_cursor
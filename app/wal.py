@@ -0,0 +1,455 @@
+"""
+Append-only move log with snapshots for MemoryGameStore
+
+Every game creation, move and eviction is appended to a binary log as a
+small framed record (length, CRC32, payload). A game's state is never
+rewritten on each move; a snapshot of all resident games is written
+periodically instead, after which older log segments are deleted. On
+startup the newest snapshot is loaded and the log written after it is
+replayed.
+
+When a change becomes durable depends on the fsync policy:
+
+``always``
+    A request returns only after its records are written and fsynced.
+    Concurrent requests share one write and one fsync (group commit).
+``interval``
+    Records are written and fsynced by a background thread every
+    ``interval`` seconds; a crash loses at most that much.
+``never``
+    Records are written before the request returns but never fsynced;
+    they survive a process crash but not a power loss.
+
+Replay is idempotent (creations of known games and moves already applied
+are skipped), so a snapshot may include changes that are also in the log
+after it.
+
+A log directory belongs to one process. ``open`` takes an exclusive lock on
+its LOCK file and raises MoveLogLocked if another process holds it.
+"""
+import logging
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from app.game_logic import _EPOCH, SERVER_MOVE, STATUSES, TicTacToeGame
+from app.storage import game_seq
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+if TYPE_CHECKING:
+    from app.storage import MemoryGameStore
+
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+SNAPSHOT_MAGIC = b'TTTSNAP1'
+SNAPSHOT_NAME = 'snapshot.bin'
+LOCK_NAME = 'LOCK'
+
+_FRAME = struct.Struct('<II')          # payload length, CRC32 of payload
+_CREATE = struct.Struct('<BIBBq')      # type, seq, size, k, created_at (us)
+_MOVE = struct.Struct('<BIHBHq')       # type, seq, move index, player, cell, timestamp (us)
+_DROP = struct.Struct('<BI')           # type, seq
+_SNAP_HEADER = struct.Struct('<8sIQ')  # magic, first segment to replay, game counter
+_SNAP_GAME = struct.Struct('<IBBBBBqH')  # seq, size, k, status, winner, result, created_at (us), moves
+_SNAP_MOVE = struct.Struct('<BHq')     # player, cell, timestamp (us)
+
+CREATE, MOVE, DROP = 1, 2, 3
+RESULTS = (None, 'player', 'server', 'draw')
+WINNERS = (None, 'player', 'server')
+
+
+class MoveLogLocked(RuntimeError):
+    """Raised when another process already logs to the same directory"""
+
+
+def _micros(moment: datetime) -> int:
+    """Microseconds since the epoch for a naive UTC datetime"""
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _frame(payload: bytes) -> bytes:
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _frames(data: bytes) -> Iterator[bytes]:
+    """Payloads of the intact frames in ``data``, stopping at a torn or corrupt one"""
+    position = 0
+    while position + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, position)
+        start = position + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            logger.warning("Ignoring torn or corrupt log record at offset %s", position)
+            return
+        yield payload
+        position = start + length
+
+
+def _bits(value: int) -> bytes:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+    return struct.pack('<H', len(raw)) + raw
+
+
+def encode_game(record: dict) -> bytes:
+    """Compact binary form of a to_record() dictionary"""
+    strategy = record['strategy'].encode()
+    created = _micros(datetime.fromisoformat(record['created_at']))
+    parts = [
+        _SNAP_GAME.pack(
+            game_seq(record['game_id']), record['size'], record['k'],
+            STATUSES.index(record['status']), WINNERS.index(record['winner']),
+            RESULTS.index(record['result']), created, len(record['cells'])
+        ),
+        struct.pack('<B', len(strategy)), strategy,
+        _bits(record['player_bits']), _bits(record['server_bits'])
+    ]
+    for cell, offset in zip(record['cells'], record['offsets']):
+        parts.append(_SNAP_MOVE.pack(
+            1 if cell & SERVER_MOVE else 0, cell & ~SERVER_MOVE, created + offset * 1000
+        ))
+    return b''.join(parts)
+
+
+def decode_game(payload: bytes) -> dict:
+    """Inverse of encode_game"""
+    seq, size, k, status, winner, result, created, count = _SNAP_GAME.unpack_from(payload)
+    position = _SNAP_GAME.size
+    length = payload[position]
+    strategy = payload[position + 1:position + 1 + length].decode()
+    position += 1 + length
+    bits = []
+    for _ in range(2):
+        length, = struct.unpack_from('<H', payload, position)
+        bits.append(int.from_bytes(payload[position + 2:position + 2 + length], 'little'))
+        position += 2 + length
+    cells = []
+    offsets = []
+    for player, cell, timestamp in _SNAP_MOVE.iter_unpack(payload[position:position + count * _SNAP_MOVE.size]):
+        cells.append(cell | SERVER_MOVE if player else cell)
+        offsets.append((timestamp - created) // 1000)
+    return {
+        'game_id': f"game_{seq}",
+        'strategy': strategy,
+        'size': size,
+        'k': k,
+        'player_bits': bits[0],
+        'server_bits': bits[1],
+        'cells': cells,
+        'offsets': offsets,
+        'status': STATUSES[status],
+        'winner': WINNERS[winner],
+        'result': RESULTS[result],
+        'created_at': _from_micros(created).isoformat()
+    }
+
+
+class MoveLog:
+    """
+    Write-ahead log and snapshots of one MemoryGameStore, kept in ``directory``
+    
+    Args:
+        directory: Directory holding the snapshot and the log segments
+        fsync: One of FSYNC_POLICIES
+        interval: Seconds between background fsyncs with the 'interval' policy
+        snapshot_interval: Seconds between automatic snapshots; None disables them
+    """
+    
+    def __init__(self, directory: str, fsync: str = 'always', interval: float = 0.01,
+                 snapshot_interval: Optional[float] = None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of: {', '.join(FSYNC_POLICIES)}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.interval = interval
+        self.snapshot_interval = snapshot_interval
+        self.store: Optional['MemoryGameStore'] = None
+        self._cond = threading.Condition()
+        self._buffer = bytearray()
+        self._appended = 0
+        self._durable = 0
+        self._flushing = False
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._segment = 0
+        self._snapshot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        
+    # Appending
+    
+    def log_create(self, game: TicTacToeGame) -> int:
+        """Append a game creation; returns the position to pass to ``wait``"""
+        strategy = game.strategy.encode()
+        payload = _CREATE.pack(CREATE, game_seq(game.game_id), game.size, game.k,
+                               game.created_us) + struct.pack('<B', len(strategy)) + strategy
+        return self._append(_frame(payload))
+        
+    def log_moves(self, game: TicTacToeGame, start: int) -> int:
+        """Append the moves of ``game`` from index ``start`` on"""
+        seq = game_seq(game.game_id)
+        created = game.created_us
+        frames = []
+        for index, (cell, offset) in enumerate(game.encoded_moves(start), start):
+            frames.append(_frame(_MOVE.pack(
+                MOVE, seq, index, 1 if cell & SERVER_MOVE else 0, cell & ~SERVER_MOVE,
+                created + offset * 1000
+            )))
+        return self._append(b''.join(frames))
+        
+    def log_drop(self, game_id: str) -> int:
+        """Append the eviction of a game from memory"""
+        return self._append(_frame(_DROP.pack(DROP, game_seq(game_id))))
+        
+    def _append(self, data: bytes) -> int:
+        with self._cond:
+            self._buffer += data
+            self._appended += len(data)
+            return self._appended
+            
+    def wait(self, position: int):
+        """
+        Return once everything up to ``position`` is as durable as the policy promises
+        
+        The first waiting thread writes (and with 'always' fsyncs) everything
+        buffered so far on behalf of all the others.
+        """
+        if self.fsync == 'interval':
+            return
+        with self._cond:
+            while self._durable < position:
+                if self._flushing:
+                    self._cond.wait()
+                else:
+                    self._flush_locked(self.fsync == 'always')
+                    
+    def _flush_locked(self, sync: bool):
+        """Write the buffer outside the lock; caller holds ``_cond``"""
+        data, target, fd = self._buffer, self._appended, self._fd
+        self._buffer = bytearray()
+        self._flushing = True
+        self._cond.release()
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if sync:
+                os.fsync(fd)
+        except BaseException:
+            self._cond.acquire()
+            self._flushing = False
+            self._cond.notify_all()
+            raise
+        self._cond.acquire()
+        self._flushing = False
+        self._durable = max(self._durable, target)
+        self._cond.notify_all()
+        
+    def flush(self):
+        """Write and fsync everything appended so far"""
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flush_locked(True)
+            
+    # Segments and snapshots
+    
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f'wal-{segment:08d}.log')
+        
+    def _segments(self) -> List[int]:
+        return sorted(int(name[4:12]) for name in os.listdir(self.directory)
+                      if name.startswith('wal-') and name.endswith('.log'))
+                      
+    def _open_segment(self, segment: int):
+        self._segment = segment
+        self._fd = os.open(self._segment_path(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        
+    def _rotate(self) -> int:
+        """Flush, then continue in a new segment; returns its number"""
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flush_locked(True)
+            os.close(self._fd)
+            self._open_segment(self._segment + 1)
+            return self._segment
+            
+    def snapshot(self) -> str:
+        """
+        Write a snapshot of every resident game and delete the log it covers
+        
+        Returns:
+            Path of the snapshot file
+        """
+        store = self.store
+        with self._snapshot_lock:
+            first = self._rotate()
+            counter = store.game_counter
+            path = os.path.join(self.directory, SNAPSHOT_NAME)
+            tmp = path + '.tmp'
+            games = 0
+            with open(tmp, 'wb') as out:
+                out.write(_SNAP_HEADER.pack(SNAPSHOT_MAGIC, first, counter))
+                for game_id in list(store.games):
+                    with store.lock_for(game_id):
+                        game = store.games.get(game_id)
+                        record = game.to_record() if game is not None else None
+                    if record is not None:
+                        out.write(_frame(encode_game(record)))
+                        games += 1
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, path)
+            self._sync_directory()
+            for segment in self._segments():
+                if segment < first:
+                    os.remove(self._segment_path(segment))
+        logger.info("Wrote snapshot of %s games; replay starts at segment %s", games, first)
+        return path
+        
+    def _sync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+                
+    # Recovery
+    
+    def open(self, store: 'MemoryGameStore') -> Tuple[int, int]:
+        """
+        Recover ``store`` from disk, then start logging its changes
+        
+        Returns:
+            Tuple of (games loaded from the snapshot, log records replayed)
+            
+        Raises:
+            MoveLogLocked: If another process has the directory open
+        """
+        self._lock_directory()
+        self.store = store
+        loaded, replayed, last = self._recover(store)
+        self._open_segment(last + 1)
+        if self.fsync == 'interval':
+            self._start(self._sync_loop, 'wal-sync')
+        if self.snapshot_interval:
+            self._start(self._snapshot_loop, 'wal-snapshot')
+        logger.info("Recovered %s games from snapshot and %s log records", loaded, replayed)
+        return loaded, replayed
+        
+    def _lock_directory(self):
+        """Hold an exclusive lock on the directory until ``close``"""
+        if fcntl is None:
+            return
+        fd = os.open(os.path.join(self.directory, LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise MoveLogLocked(f"{self.directory} is in use by another process; each process "
+                                "needs its own move log directory") from None
+        self._lock_fd = fd
+        
+    def _recover(self, store: 'MemoryGameStore') -> Tuple[int, int, int]:
+        loaded = replayed = 0
+        first = 0
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        if os.path.exists(path):
+            with open(path, 'rb') as snapshot:
+                data = snapshot.read()
+            magic, first, counter = _SNAP_HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a game snapshot")
+            store.restore_counter(counter)
+            for payload in _frames(memoryview(data)[_SNAP_HEADER.size:]):
+                store.restore(TicTacToeGame.from_record(decode_game(bytes(payload))))
+                loaded += 1
+                
+        segments = [segment for segment in self._segments() if segment >= first]
+        for segment in segments:
+            with open(self._segment_path(segment), 'rb') as log:
+                data = log.read()
+            for payload in _frames(data):
+                self._apply(store, bytes(payload))
+                replayed += 1
+        return loaded, replayed, max(segments, default=first - 1)
+        
+    @staticmethod
+    def _apply(store: 'MemoryGameStore', payload: bytes):
+        kind = payload[0]
+        if kind == CREATE:
+            _, seq, size, k, created = _CREATE.unpack_from(payload)
+            game_id = f"game_{seq}"
+            store.restore_counter(seq)
+            if game_id in store.games:
+                return
+            length = payload[_CREATE.size]
+            strategy = payload[_CREATE.size + 1:_CREATE.size + 1 + length].decode()
+            game = TicTacToeGame(game_id, strategy, size, k)
+            game.created_us = created
+            store.restore(game)
+        elif kind == MOVE:
+            _, seq, index, player, cell, timestamp = _MOVE.unpack(payload)
+            game_id = f"game_{seq}"
+            game = store.games.get(game_id)
+            if game is None and store.archive is not None:
+                game = store.archive.get(game_id)
+            if game is None or len(game.moves) != index:
+                return
+            row, col = divmod(cell, game.size)
+            game.make_move(row, col, TicTacToeGame.PLAYER if player == 0 else TicTacToeGame.SERVER,
+                           (timestamp - game.created_us) // 1000)
+            game.update_status()
+            store.restore(game)
+        elif kind == DROP:
+            _, seq = _DROP.unpack(payload)
+            store.forget(f"game_{seq}")
+            
+    # Background work
+    
+    def _start(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        
+    def _sync_loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+            
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.error("Snapshot failed: %s", e, exc_info=True)
+                
+    def close(self):
+        """Stop background threads and make everything appended durable"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
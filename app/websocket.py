@@ -0,0 +1,209 @@
+"""
+Minimal RFC 6455 WebSocket support on asyncio streams
+
+Covers what the game push channel needs: the opening handshake, text
+messages (fragmented or not), ping/pong and the closing handshake. The same
+WebSocket class serves both ends, so tests and clients can use ``connect``.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from typing import Optional, Tuple
+
+
+GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_UNSUPPORTED = 1003
+CLOSE_TOO_BIG = 1009
+
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+class ProtocolError(ValueError):
+    """A peer broke the WebSocket protocol; ``code`` is the close code to send"""
+    
+    def __init__(self, message: str, code: int = CLOSE_PROTOCOL_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def handshake_response(key: str) -> bytes:
+    """101 response completing the opening handshake"""
+    return (
+        'HTTP/1.1 101 Switching Protocols\r\n'
+        'Upgrade: websocket\r\n'
+        'Connection: Upgrade\r\n'
+        f'Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n'
+    ).encode()
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool = False) -> bytes:
+    """
+    Encode one final frame
+    
+    Args:
+        opcode: Frame opcode
+        payload: Frame payload
+        mask: Whether to mask the payload, as clients must
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, (0x80 if mask else 0) | length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, (0x80 if mask else 0) | 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, (0x80 if mask else 0) | 127, length)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _apply_mask(payload, key)
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    # XOR the whole payload at once as one big integer
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    masked = int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')
+    return masked.to_bytes(len(payload), 'big')
+
+
+async def read_frame(reader: asyncio.StreamReader, masked: bool) -> Tuple[bool, int, bytes]:
+    """
+    Read one frame
+    
+    Args:
+        reader: Stream to read from
+        masked: Whether frames must be masked (true for frames sent by clients)
+        
+    Returns:
+        Tuple of (final fragment flag, opcode, unmasked payload)
+        
+    Raises:
+        ProtocolError: If the frame is invalid or too large
+        asyncio.IncompleteReadError: If the stream ends mid-frame
+    """
+    first, second = await reader.readexactly(2)
+    if first & 0x70:
+        raise ProtocolError('reserved bits set')
+    if bool(second & 0x80) != masked:
+        raise ProtocolError('frame masking is wrong for this direction')
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    if length > MAX_MESSAGE_BYTES:
+        raise ProtocolError('frame too large', CLOSE_TOO_BIG)
+    key = await reader.readexactly(4) if masked else None
+    payload = await reader.readexactly(length)
+    return bool(first & 0x80), first & 0x0F, _apply_mask(payload, key) if key else payload
+
+
+class WebSocket:
+    """One end of an open WebSocket connection"""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client: bool = False):
+        self.reader = reader
+        self.writer = writer
+        self.client = client
+        self.closed = False
+        
+    def send(self, text: str):
+        """Queue a text message without waiting for the peer to read it"""
+        if not self.closed:
+            self.writer.write(encode_frame(OP_TEXT, text.encode(), mask=self.client))
+            
+    def buffered(self) -> int:
+        """Bytes written but not yet accepted by the peer"""
+        return self.writer.transport.get_write_buffer_size()
+        
+    async def receive(self) -> Optional[str]:
+        """
+        Next text message, answering pings and close frames along the way
+        
+        Returns:
+            The message, or None once the connection is closed
+        """
+        parts = []
+        size = 0
+        try:
+            while True:
+                fin, opcode, payload = await read_frame(self.reader, masked=not self.client)
+                if opcode == OP_PING:
+                    self.writer.write(encode_frame(OP_PONG, payload, mask=self.client))
+                    continue
+                if opcode == OP_PONG:
+                    continue
+                if opcode == OP_CLOSE:
+                    await self.close(CLOSE_NORMAL)
+                    return None
+                if opcode == OP_BINARY:
+                    raise ProtocolError('binary messages are not supported', CLOSE_UNSUPPORTED)
+                if (opcode == OP_CONTINUATION) != bool(parts):
+                    raise ProtocolError('unexpected continuation frame')
+                size += len(payload)
+                if size > MAX_MESSAGE_BYTES:
+                    raise ProtocolError('message too large', CLOSE_TOO_BIG)
+                parts.append(payload)
+                if fin:
+                    return b''.join(parts).decode()
+        except ProtocolError as e:
+            await self.close(e.code)
+        except UnicodeDecodeError:
+            await self.close(CLOSE_PROTOCOL_ERROR)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.closed = True
+            self.writer.close()
+        return None
+        
+    async def close(self, code: int = CLOSE_NORMAL):
+        """Send a close frame (once) and close the connection"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(OP_CLOSE, struct.pack('!H', code), mask=self.client))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+
+async def connect(host: str, port: int, path: str) -> WebSocket:
+    """
+    Open a client connection to a WebSocket endpoint
+    
+    Raises:
+        ConnectionError: If the server refuses the upgrade
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {host}:{port}\r\n'
+        'Upgrade: websocket\r\n'
+        'Connection: Upgrade\r\n'
+        f'Sec-WebSocket-Key: {key}\r\n'
+        'Sec-WebSocket-Version: 13\r\n\r\n'
+    ).encode())
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    if not head.startswith('HTTP/1.1 101') or accept_key(key) not in head:
+        writer.close()
+        raise ConnectionError(f'WebSocket upgrade refused: {head.splitlines()[0]}')
+    return WebSocket(reader, writer, client=True)
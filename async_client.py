@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+asyncio client for Tic-Tac-Toe game
+
+AsyncTicTacToeClient offers the create_game / make_move / get_moves /
+list_games calls of client.TicTacToeClient for programs that play many
+games at once, such as integration bots. Any number of coroutines can share
+one client: requests are sent over a pool of at most ``max_connections``
+keep-alive HTTP/1.1 connections, opened on demand and reused.
+
+Unlike the interactive client, methods return the decoded response and
+raise ClientError for error responses, and take the game ID explicitly.
+Only the standard library is needed.
+
+Usage:
+    python async_client.py [base_url] [games]
+"""
+import asyncio
+import json
+import sys
+import time
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+class ClientError(Exception):
+    """An error response from the server"""
+    
+    def __init__(self, status: int, body: Any):
+        error = body.get('error') if isinstance(body, dict) else None
+        super().__init__(f"HTTP {status}: {error or body}")
+        self.status = status
+        self.body = body
+
+
+class _Stale(Exception):
+    """A reused connection turned out to be closed before the request was read"""
+
+
+class _Connection:
+    """One keep-alive connection; the pool hands it to one request at a time"""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        
+    def close(self):
+        self.writer.close()
+
+
+class AsyncTicTacToeClient:
+    """
+    Pooled asyncio client for the Tic-Tac-Toe API
+    
+    Use it as an async context manager, or call close() when done.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:5000", max_connections: int = 100,
+                 timeout: float = 30.0):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise ValueError("Only http:// URLs are supported")
+        self.base_url = base_url
+        self.host = url.hostname or 'localhost'
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: List[_Connection] = []
+        
+    async def __aenter__(self) -> 'AsyncTicTacToeClient':
+        return self
+        
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        
+    async def close(self):
+        """Close the idle pooled connections"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+        for connection in idle:
+            try:
+                await connection.writer.wait_closed()
+            except OSError:
+                pass
+                
+    async def create_game(self, size: Optional[int] = None, k: Optional[int] = None,
+                          strategy: Optional[str] = None) -> dict:
+        """Create a game and return it as POST /game does"""
+        options = {}
+        if size is not None:
+            options['size'] = size
+            options['k'] = k if k is not None else min(size, 5)
+        if strategy is not None:
+            options['strategy'] = strategy
+        return await self.request('POST', '/game', options)
+        
+    async def make_move(self, game_id: str, row: int, col: int) -> dict:
+        """Play at (row, col) and return the game after the server's reply"""
+        return await self.request('POST', f'/game/{game_id}/move', {'row': row, 'col': col})
+        
+    async def get_moves(self, game_id: str) -> List[dict]:
+        """All moves of a game, in order"""
+        return (await self.request('GET', f'/game/{game_id}/moves'))['moves']
+        
+    async def list_games(self, page_size: int = 1000) -> List[dict]:
+        """Summaries of all games, following the server's pages"""
+        games = []
+        params = {'limit': page_size}
+        while True:
+            data = await self.request('GET', '/games', params=params)
+            games.extend(data['games'])
+            if not data.get('next_cursor'):
+                return games
+            params['after'] = data['next_cursor']
+            
+    async def request(self, method: str, path: str, body: Any = None, params: Optional[dict] = None) -> Any:
+        """
+        Send one request and return its decoded JSON body
+        
+        Raises:
+            ClientError: for 4xx and 5xx responses
+            OSError, asyncio.TimeoutError: if the server cannot be reached
+        """
+        target = self.prefix + path + ('?' + urlencode(params) if params else '')
+        payload = json.dumps(body).encode() if body is not None else b''
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+        
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        async with self._slots:
+            status, data = await asyncio.wait_for(self._exchange(message), self.timeout)
+            
+        decoded = json.loads(data) if data else None
+        if status >= 400:
+            raise ClientError(status, decoded)
+        return decoded
+        
+    async def _exchange(self, message: bytes) -> Tuple[int, bytes]:
+        while self._idle:
+            try:
+                return await self._send(self._idle.pop(), message, reused=True)
+            except _Stale:
+                # The server closed the idle connection before it read the
+                # request, so it is safe to send it again on another one
+                pass
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return await self._send(_Connection(reader, writer), message, reused=False)
+        
+    async def _send(self, connection: _Connection, message: bytes, reused: bool) -> Tuple[int, bytes]:
+        reader = connection.reader
+        try:
+            try:
+                connection.writer.write(message)
+                await connection.writer.drain()
+                status_line = await reader.readuntil(b'\r\n')
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError) as e:
+                if reused and not getattr(e, 'partial', b''):
+                    raise _Stale() from e
+                raise
+            status = int(status_line.split(None, 2)[1])
+            headers = {}
+            while True:
+                line = await reader.readuntil(b'\r\n')
+                if line == b'\r\n':
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+                
+            if headers.get('transfer-encoding', '').lower() == 'chunked':
+                body = await self._read_chunked(reader)
+            elif 'content-length' in headers:
+                body = await reader.readexactly(int(headers['content-length']))
+            else:
+                body = await reader.read()
+                headers['connection'] = 'close'
+        except BaseException:
+            connection.close()
+            raise
+            
+        if headers.get('connection', '').lower() == 'close':
+            connection.close()
+        else:
+            self._idle.append(connection)
+        return status, body
+        
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                while await reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+async def play(client: AsyncTicTacToeClient) -> str:
+    """Play one game with the first free cell each turn and return its final status"""
+    game = await client.create_game()
+    while game['status'] == 'in_progress':
+        row, col = next((r, c) for r, cells in enumerate(game['board'])
+                        for c, cell in enumerate(cells) if cell is None)
+        game = await client.make_move(game['game_id'], row, col)
+    return game['status']
+
+
+async def _main(base_url: str, games: int):
+    async with AsyncTicTacToeClient(base_url) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(play(client) for _ in range(games)))
+        elapsed = time.perf_counter() - started
+    print(f"played {games} games in {elapsed:.2f} s")
+    for status in sorted(set(results)):
+        print(f"  {status}: {results.count(status)}")
+
+
+if __name__ == '__main__':
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:5000",
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 100))
@@ -0,0 +1,102 @@
+"""
+Moves/sec through POST /game/<id>/move versus POST /games/moves
+
+A threaded werkzeug server runs in-process on a free port and one client
+plays whole games over a keep-alive session: one move per request, or one
+move for every live game per batch request.
+
+Usage:
+    python -m benchmarks.bench_batch [games]
+"""
+import logging
+import random
+import sys
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from app import outcome_table, server
+from app.game_logic import GameManager
+
+
+def _start_server(flask_app):
+    http = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    return http, f'http://127.0.0.1:{http.server_port}'
+
+
+def _new_games(session: requests.Session, base_url: str, count: int) -> dict:
+    """Return {game_id: free cells} for ``count`` new games"""
+    games = {}
+    for _ in range(count):
+        game_id = session.post(f'{base_url}/game').json()['game_id']
+        games[game_id] = [(r, c) for r in range(3) for c in range(3)]
+    return games
+
+
+def _pick(free: list, board: list) -> tuple:
+    cells = [(r, c) for r, c in free if board[r][c] is None]
+    free[:] = cells
+    return random.choice(cells)
+
+
+def run_single(session: requests.Session, base_url: str, games: int) -> tuple:
+    """Return (moves, elapsed) playing ``games`` games one request per move"""
+    live = _new_games(session, base_url, games)
+    boards = {game_id: [[None] * 3 for _ in range(3)] for game_id in live}
+    moves = 0
+    started = time.perf_counter()
+    while live:
+        for game_id in list(live):
+            row, col = _pick(live[game_id], boards[game_id])
+            body = session.post(f'{base_url}/game/{game_id}/move', json={'row': row, 'col': col}).json()
+            moves += 1
+            boards[game_id] = body['board']
+            if body['status'] != 'in_progress':
+                del live[game_id]
+    return moves, time.perf_counter() - started
+
+
+def run_batch(session: requests.Session, base_url: str, games: int) -> tuple:
+    """Return (moves, elapsed) playing ``games`` games one batch per round"""
+    live = _new_games(session, base_url, games)
+    boards = {game_id: [[None] * 3 for _ in range(3)] for game_id in live}
+    moves = 0
+    started = time.perf_counter()
+    while live:
+        ids = list(live)
+        for start in range(0, len(ids), server.MAX_BATCH_SIZE):
+            chunk = ids[start:start + server.MAX_BATCH_SIZE]
+            batch = []
+            for game_id in chunk:
+                row, col = _pick(live[game_id], boards[game_id])
+                batch.append({'game_id': game_id, 'row': row, 'col': col})
+            results = session.post(f'{base_url}/games/moves', json={'moves': batch}).json()['results']
+            moves += len(results)
+            for game_id, result in zip(chunk, results):
+                boards[game_id] = result['body']['board']
+                if result['body']['status'] != 'in_progress':
+                    del live[game_id]
+    return moves, time.perf_counter() - started
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    http, base_url = _start_server(server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False}))
+    
+    print(f"{'path':<8} {'moves':>7} {'seconds':>8} {'moves/s':>10}")
+    try:
+        with requests.Session() as session:
+            for name, run in (('single', run_single), ('batch', run_batch)):
+                moves, elapsed = run(session, base_url, games)
+                print(f"{name:<8} {moves:>7} {elapsed:>8.2f} {moves / elapsed:>10.0f}")
+    finally:
+        http.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Show that per-move cost does not grow with the board area
+
+Each measurement places a stone with make_move and then runs update_status,
+which on a generalized board only inspects the four lines through that stone.
+
+Usage:
+    python -m benchmarks.bench_board_size [moves_per_size]
+"""
+import random
+import sys
+import time
+
+from app import outcome_table
+from app.game_logic import MAX_SIZE, TicTacToeGame
+
+
+def bench(size: int, k: int, moves: int, rng: random.Random) -> float:
+    """Average seconds per make_move + update_status over ``moves`` moves"""
+    total = 0.0
+    done = 0
+    while done < moves:
+        game = TicTacToeGame("bench", size=size, k=k)
+        # Play at most half the board so every size is measured mid-game
+        cells = rng.sample(range(size * size), size * size // 2)
+        for i, cell in enumerate(cells):
+            row, col = divmod(cell, size)
+            player = TicTacToeGame.PLAYER if i % 2 == 0 else TicTacToeGame.SERVER
+            started = time.perf_counter()
+            game.make_move(row, col, player)
+            game.update_status()
+            total += time.perf_counter() - started
+            done += 1
+            if game.status != 'in_progress' or done >= moves:
+                break
+    return total / done
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(42)
+    outcome_table.get_table()
+    
+    print(f"{'board':<10} {'k':>3} {'area':>6} {'us/move':>10}")
+    for size, k in ((3, 3), (5, 4), (9, 5), (15, 5), (19, 5), (MAX_SIZE, 5)):
+        per_move = bench(size, k, moves, rng)
+        board = f"{size}x{size}"
+        print(f"{board:<10} {k:>3} {size * size:>6} {per_move * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+GameManager throughput with 1-32 threads
+
+Each thread repeatedly creates a game and plays it to the end through
+``locked_game``, the same read-modify-write path the move route uses.
+
+Usage:
+    python -m benchmarks.bench_concurrency [seconds_per_run]
+"""
+import sys
+import threading
+import time
+
+from app import outcome_table
+from app.game_logic import GameManager, TicTacToeGame
+
+
+def run(threads: int, seconds: float) -> tuple:
+    """Return (games, moves, elapsed) for ``threads`` threads running about ``seconds``"""
+    manager = GameManager()
+    stop = threading.Event()
+    counts = [[0, 0] for _ in range(threads)]
+    
+    def worker(index):
+        while not stop.is_set():
+            game_id = manager.create_game().game_id
+            while True:
+                with manager.locked_game(game_id) as game:
+                    if game.status != 'in_progress':
+                        break
+                    player = TicTacToeGame.PLAYER if len(game.moves) % 2 == 0 else TicTacToeGame.SERVER
+                    row, col = game.random_position()
+                    game.make_move(row, col, player)
+                    game.update_status()
+                counts[index][1] += 1
+            counts[index][0] += 1
+            
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return sum(c[0] for c in counts), sum(c[1] for c in counts), elapsed
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    outcome_table.get_table()
+    
+    print(f"{'threads':>7} {'games/s':>10} {'moves/s':>10}")
+    for threads in (1, 2, 4, 8, 16, 32):
+        games, moves, elapsed = run(threads, seconds)
+        print(f"{threads:>7} {games / elapsed:>10.0f} {moves / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
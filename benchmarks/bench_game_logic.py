@@ -0,0 +1,196 @@
+"""
+Microbenchmarks for the game logic hot paths, with saved baselines
+
+For each scale (number of stored games) fills a GameManager through
+``create_game`` and times, per call:
+
+- ``TicTacToeGame.make_move`` and ``make_random_move`` on fresh games
+- ``check_winner``, ``update_status``, ``get_available_positions`` and
+  ``to_dict`` on up to SAMPLE games taken from the manager
+- ``GameManager.create_game`` while filling it, and ``get_all_games`` once full
+
+Every figure is the best of ``--repeat`` runs, in nanoseconds per call.
+``--save`` writes the results as a JSON baseline; ``--compare`` reads one
+and exits with status 1 if any benchmark got slower by more than
+``--threshold`` (a fraction), so it can gate a change in CI. Baselines only
+compare meaningfully on the same machine and Python version.
+
+Usage:
+    python -m benchmarks.bench_game_logic [--scales 1000,10000,100000,1000000]
+        [--repeat 5] [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app import outcome_table
+from app.game_logic import GameManager, TicTacToeGame
+
+SAMPLE = 10000
+DEFAULT_SCALES = '1000,10000,100000'
+
+
+def best_per_call(run: Callable[[], int], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """
+    Best time per call in ns over ``repeat`` runs, after one warm-up run
+    
+    ``run`` returns how many calls it made; ``setup``, if given, runs
+    untimed before each run. As with timeit, the garbage collector is off
+    while timing.
+    """
+    best = float('inf')
+    for attempt in range(repeat + 1):
+        if setup is not None:
+            setup()
+        if not attempt:
+            run()
+            continue
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter_ns()
+            calls = run()
+            best = min(best, (time.perf_counter_ns() - started) / calls)
+        finally:
+            gc.enable()
+    return best
+
+
+def fresh_games(count: int) -> List[TicTacToeGame]:
+    return [TicTacToeGame(f'game_{n}') for n in range(count)]
+
+
+def game_benchmarks(repeat: int) -> Dict[str, float]:
+    """Benchmarks that change games, each run on a new batch of fresh games"""
+    batches = []
+    
+    def prepare(moved: bool) -> Callable[[], None]:
+        def setup():
+            games = fresh_games(SAMPLE)
+            if moved:
+                for game in games:
+                    game.make_move(1, 1, TicTacToeGame.PLAYER)
+            batches.append(games)
+        return setup
+        
+    def make_move():
+        for game in batches.pop():
+            game.make_move(1, 1, TicTacToeGame.PLAYER)
+        return SAMPLE
+        
+    def make_random_move():
+        for game in batches.pop():
+            game.make_random_move()
+        return SAMPLE
+        
+    return {
+        'make_move': best_per_call(make_move, repeat, prepare(False)),
+        'make_random_move': best_per_call(make_random_move, repeat, prepare(True)),
+    }
+
+
+def scale_benchmarks(scale: int, repeat: int) -> Dict[str, float]:
+    """Benchmarks that depend on the number of stored games"""
+    manager = GameManager()
+    gc.collect()
+    started = time.perf_counter_ns()
+    for _ in range(scale):
+        manager.create_game()
+    results = {'GameManager.create_game': (time.perf_counter_ns() - started) / scale}
+    
+    games = manager.get_all_games()
+    sample = games[::max(1, len(games) // SAMPLE)][:SAMPLE]
+    for number, game in enumerate(sample):
+        with manager.locked_game(game.game_id) as locked:
+            locked.make_move(number % 3, 1, TicTacToeGame.PLAYER)
+            locked.make_server_move()
+            locked.update_status()
+            
+    def each(method: Callable[[TicTacToeGame], object]) -> Callable[[], int]:
+        def run():
+            for game in sample:
+                method(game)
+            return len(sample)
+        return run
+        
+    results['check_winner'] = best_per_call(each(TicTacToeGame.check_winner), repeat)
+    results['update_status'] = best_per_call(each(TicTacToeGame.update_status), repeat)
+    results['get_available_positions'] = best_per_call(each(TicTacToeGame.get_available_positions), repeat)
+    results['to_dict'] = best_per_call(each(TicTacToeGame.to_dict), repeat)
+    
+    def get_all_games():
+        manager.get_all_games()
+        return 1
+        
+    results['GameManager.get_all_games'] = best_per_call(get_all_games, repeat)
+    return results
+
+
+def run(scales: List[int], repeat: int) -> Dict[str, float]:
+    """All benchmarks, keyed ``name`` or ``name[scale]``"""
+    results = game_benchmarks(repeat)
+    for scale in scales:
+        for name, value in scale_benchmarks(scale, repeat).items():
+            results[f'{name}[{scale}]'] = value
+    return results
+
+
+def compare(baseline: Dict[str, float], results: Dict[str, float], threshold: float) -> List[str]:
+    """Print each benchmark against the baseline and return those slower by more than ``threshold``"""
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<40} {'-':>12} {value:>12.0f} {'new':>8}")
+            continue
+        change = value / before - 1
+        flag = '  REGRESSION' if change > threshold else ''
+        print(f"{name:<40} {before:>12.0f} {value:>12.0f} {change:>+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_game_logic')
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help="comma-separated numbers of stored games")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark; the best is kept")
+    parser.add_argument('--save', metavar='FILE', help="write the results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare with a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    
+    results = run([int(scale) for scale in args.scales.split(',')], args.repeat)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'created_at': datetime.utcnow().isoformat() + 'Z',
+                'unit': 'ns per call',
+                'results': results,
+            }, output, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline:
+            regressions = compare(json.load(baseline)['results'], results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+        
+    print(f"{'benchmark':<40} {'ns/call':>12}")
+    for name, value in results.items():
+        print(f"{name:<40} {value:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Encode throughput for /games pages
+
+Builds ``games`` games with a few moves each on a 3x3 and a 15x15 board,
+takes their /games summaries and times encoding them as one page, as GET
+/games does when the fragment cache misses, with:
+
+- Flask's default provider, with ``created_at`` formatted by hand first as
+  the service used to
+- the standard library encoder of app.json_provider
+- orjson through app.json_provider, when it is installed, otherwise the
+  row is left out
+
+Reports the time per page, summaries per second and output MB/s.
+
+Usage:
+    python -m benchmarks.bench_json [games] [runs]
+"""
+import logging
+import random
+import sys
+import timeit
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app import json_provider, outcome_table
+from app.game_logic import TicTacToeGame
+from app.service import game_summary
+
+BOARDS = [(3, 3, 4), (15, 5, 30)]
+
+
+def games(count: int, size: int, k: int, moves: int) -> list:
+    rng = random.Random(1)
+    made = []
+    for number in range(count):
+        game = TicTacToeGame(f'game_{number + 1}', 'random', size, k)
+        cells = rng.sample(range(size * size), moves)
+        for turn, cell in enumerate(cells):
+            game.make_move(*divmod(cell, size), TicTacToeGame.SERVER if turn % 2 else TicTacToeGame.PLAYER)
+        made.append(game)
+    return made
+
+
+def encoders() -> list:
+    flask_default = DefaultJSONProvider(Flask(__name__))
+    
+    def formatted_by_hand(summaries):
+        formatted = [dict(summary, created_at=summary['created_at'].isoformat() + 'Z') for summary in summaries]
+        return flask_default.dumps({'games': formatted, 'next_cursor': None}, separators=(',', ':')).encode()
+        
+    chosen = [
+        ('flask default', formatted_by_hand),
+        ('stdlib', lambda summaries: json_provider.stdlib_dumps({'games': summaries, 'next_cursor': None}).encode()),
+    ]
+    if json_provider.orjson is not None:
+        chosen.append(('orjson', lambda summaries: json_provider.dumps_bytes({'games': summaries, 'next_cursor': None})))
+    return chosen
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    
+    print(f"{'board':<7} {'encoder':<14} {'ms/page':>8} {'games/s':>10} {'MB/s':>7}")
+    for size, k, moves in BOARDS:
+        board = f'{size}x{size}'
+        summaries = [game_summary(game) for game in games(count, size, k, moves)]
+        for name, encode in encoders():
+            size_bytes = len(encode(summaries))
+            elapsed = min(timeit.repeat(lambda: encode(summaries), number=runs, repeat=3)) / runs
+            print(f"{board:<7} {name:<14} {elapsed * 1e3:>8.2f} {count / elapsed:>10.0f} "
+                  f"{size_bytes / elapsed / 1e6:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
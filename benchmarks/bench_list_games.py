@@ -0,0 +1,57 @@
+"""
+GET /games latency as the number of stored games grows
+
+Each size is populated through GameManager, with every third game finished,
+and then the first page, a page from the middle (via ``after``) and a
+status-filtered page are timed through the Flask test client.
+
+Usage:
+    python -m benchmarks.bench_list_games [max_games]
+"""
+import logging
+import sys
+import time
+
+from app import server
+from app.game_logic import GameManager, TicTacToeGame
+
+
+def populate(manager: GameManager, count: int):
+    for n in range(count):
+        game = manager.create_game()
+        if n % 3 == 0:
+            with manager.locked_game(game.game_id) as locked:
+                for col in range(3):
+                    locked.make_move(0, col, TicTacToeGame.PLAYER)
+                locked.update_status()
+
+
+def timed(client, url: str, repeat: int = 50) -> float:
+    """Best-of-``repeat`` latency of one GET, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        best = min(best, time.perf_counter() - started)
+        assert response.status_code == 200
+    return best * 1000
+
+
+def main():
+    max_games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    logging.disable(logging.INFO)
+    print(f"{'games':>9} {'first ms':>9} {'middle ms':>10} {'status ms':>10}")
+    count = 1000
+    while count <= max_games:
+        manager = GameManager()
+        populate(manager, count)
+        client = server.create_app({'GAME_MANAGER': manager, 'LOGGING': False}).test_client()
+        first = timed(client, '/games?limit=100')
+        middle = timed(client, f'/games?limit=100&after={count // 2}')
+        status = timed(client, f'/games?limit=100&status=player_wins&after={count // 2}')
+        print(f"{count:>9} {first:>9.2f} {middle:>10.2f} {status:>10.2f}")
+        count *= 10
+
+
+if __name__ == '__main__':
+    main()
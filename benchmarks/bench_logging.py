@@ -0,0 +1,105 @@
+"""
+Move request latency with synchronous versus queued logging
+
+Plays games through the Flask test client from several threads while the
+server logs to a file and to the console (redirected to a second file) with
+different logging setups, and reports p50/p99 latency of the move requests.
+
+On a local SSD a synchronous write costs a few microseconds and the setups
+perform alike. The "slow console" runs add a blocking delay to every
+console flush, as a terminal or a full pipe does, which the synchronous
+setup pays on the request thread.
+
+Usage:
+    python -m benchmarks.bench_logging [requests_per_thread] [threads] [console_flush_us]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from app import outcome_table, server
+from app.game_logic import GameManager
+from app.logging_config import configure_logging, shutdown_logging
+
+SETUPS = [
+    ('sync text', dict(queued=False)),
+    ('queued text', dict()),
+    ('queued json', dict(fmt='json')),
+    ('queued 1% moves', dict(move_sample_rate=0.01)),
+]
+
+
+class SlowStream:
+    """File stream whose flush blocks for a fixed time"""
+    
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+        
+    def write(self, text):
+        return self.stream.write(text)
+        
+    def flush(self):
+        self.stream.flush()
+        time.sleep(self.delay)
+
+
+def run(client, requests: int, threads: int) -> list:
+    """Return the sorted latencies of ``requests`` move requests on each of ``threads`` threads"""
+    latencies = [[] for _ in range(threads)]
+    
+    def worker(index):
+        done = 0
+        while done < requests:
+            game_id = client.post('/game').get_json()['game_id']
+            free = [(r, c) for r in range(3) for c in range(3)]
+            status = 'in_progress'
+            while status == 'in_progress' and done < requests:
+                row, col = free.pop()
+                started = time.perf_counter()
+                body = client.post(f'/game/{game_id}/move', json={'row': row, 'col': col}).get_json()
+                latencies[index].append(time.perf_counter() - started)
+                done += 1
+                status = body.get('status', 'in_progress')
+                board = body.get('board')
+                if board:
+                    free = [(r, c) for r in range(3) for c in range(3) if board[r][c] is None]
+                    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sorted(latency for per_thread in latencies for latency in per_thread)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    flush_delay = (float(sys.argv[3]) if len(sys.argv) > 3 else 200) / 1e6
+    outcome_table.get_table()
+    stderr = sys.stderr
+    
+    print(f"{'console':<13} {'setup':<16} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for console_name, delay in (('file', 0), ('slow console', flush_delay)):
+            for name, options in SETUPS:
+                client = server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False}).test_client()
+                with open(os.path.join(tmp, 'console.log'), 'w') as console:
+                    sys.stderr = SlowStream(console, delay) if delay else console
+                    try:
+                        configure_logging(os.path.join(tmp, 'server.log'), **options)
+                        latencies = run(client, requests, threads)
+                        shutdown_logging()
+                    finally:
+                        sys.stderr = stderr
+                p50 = latencies[len(latencies) // 2] * 1e6
+                p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+                mean = sum(latencies) / len(latencies) * 1e6
+                print(f"{console_name:<13} {name:<16} {p50:>8.0f} {p99:>8.0f} {mean:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
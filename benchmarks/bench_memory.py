@@ -0,0 +1,61 @@
+"""
+Memory used per stored game
+
+Fills a MemoryGameStore with ``games`` finished 3x3 games of five moves
+each and reports the growth of the process's resident memory per game,
+plus the deep size of a sample of games as the /metrics gauge computes it.
+Then times building the move list of one game, which GET
+/game/<id>/moves does on every request.
+
+Resident memory is read from /proc, so the first figure needs Linux.
+
+Usage:
+    python -m benchmarks.bench_memory [games]
+"""
+import gc
+import logging
+import os
+import sys
+import timeit
+
+from app import metrics, outcome_table
+from app.game_logic import GameManager, TicTacToeGame
+
+# Player takes the top row while the server answers in the middle row
+MOVES = [(0, 0, TicTacToeGame.PLAYER), (1, 0, TicTacToeGame.SERVER), (0, 1, TicTacToeGame.PLAYER),
+         (1, 1, TicTacToeGame.SERVER), (0, 2, TicTacToeGame.PLAYER)]
+
+
+def resident_bytes() -> int:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    manager = GameManager()
+    
+    gc.collect()
+    before = resident_bytes()
+    for _ in range(games):
+        game = manager.create_game()
+        with manager.locked_game(game.game_id) as locked:
+            for row, col, player in MOVES:
+                locked.make_move(row, col, player)
+            locked.update_status()
+    gc.collect()
+    grown = resident_bytes() - before
+    
+    print(f"games stored          {games}")
+    print(f"resident growth       {grown / 1e6:.0f} MB ({grown / games:.0f} bytes per game)")
+    print(f"deep size (sample)    {metrics._game_memory(manager):.0f} bytes per game")
+    game = manager.get_game('game_1')
+    runs = 100000
+    print(f"get_moves()           {timeit.timeit(game.get_moves, number=runs) / runs * 1e6:.2f} us")
+    print(f"to_record()           {timeit.timeit(game.to_record, number=runs) / runs * 1e6:.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Cost of the metrics instrumentation
+
+Times the per-thread sharded counter and histogram against a lock-protected
+counter from 1 and 8 threads, then the mean latency of a move request
+through the Flask test client with and without the request hooks. The
+hooks cost a couple of microseconds, so the request-level difference is
+usually smaller than run-to-run noise.
+
+Usage:
+    python -m benchmarks.bench_metrics [operations] [requests]
+"""
+import logging
+import sys
+import threading
+import time
+
+from app import metrics, outcome_table, server
+from app.game_logic import GameManager
+
+
+class LockedCounter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+        
+    def inc(self):
+        with self._lock:
+            self.value += 1
+
+
+def ns_per_op(op, operations: int, threads: int) -> float:
+    def work():
+        for _ in range(operations):
+            op()
+            
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - started) / (operations * threads) * 1e9
+
+
+def move_latency(requests: int, hooks: bool = True) -> float:
+    """Mean seconds per move request, playing fresh games as they end"""
+    flask_app = server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False})
+    if not hooks:
+        flask_app.before_request_funcs[None].remove(server._start_timer)
+        flask_app.after_request_funcs[None].remove(server._record_request)
+    client = flask_app.test_client()
+    total = 0.0
+    done = 0
+    while done < requests:
+        game_id = client.post('/game').get_json()['game_id']
+        status = 'in_progress'
+        board = [[None] * 3 for _ in range(3)]
+        while status == 'in_progress' and done < requests:
+            row, col = next((r, c) for r in range(3) for c in range(3) if board[r][c] is None)
+            started = time.perf_counter()
+            body = client.post(f'/game/{game_id}/move', json={'row': row, 'col': col}).get_json()
+            total += time.perf_counter() - started
+            done += 1
+            status, board = body['status'], body['board']
+    return total / requests
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    
+    histogram = metrics.Histogram(metrics.LATENCY_BUCKETS)
+    ops = [
+        ('locked counter inc', LockedCounter().inc),
+        ('sharded counter inc', metrics.Counter().inc),
+        ('histogram observe', lambda: histogram.observe(0.003)),
+        ('observe_request', lambda: metrics.observe_request('bench', 200, 0.003)),
+    ]
+    print(f"{'operation':<22} {'1 thread ns':>12} {'8 threads ns':>13}")
+    for name, op in ops:
+        print(f"{name:<22} {ns_per_op(op, operations, 1):>12.0f} {ns_per_op(op, operations // 8, 8):>13.0f}")
+        
+    # Alternate runs and keep the best of each, so warm-up and noise do not
+    # land on one side
+    with_hooks = without_hooks = float('inf')
+    for _ in range(3):
+        with_hooks = min(with_hooks, move_latency(requests))
+        without_hooks = min(without_hooks, move_latency(requests, hooks=False))
+    overhead = with_hooks - without_hooks
+    print()
+    print(f"move request without metrics {without_hooks * 1e6:8.1f} us")
+    print(f"move request with metrics    {with_hooks * 1e6:8.1f} us "
+          f"({overhead * 1e6:+.1f} us, {overhead / without_hooks:+.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Create/move throughput of the shared SQLite store across worker processes
+
+Each process opens the same database and repeatedly creates a game, then
+plays it to the end through ``locked_game``. The in-memory store is
+measured once in a single process for reference.
+
+Usage:
+    python -m benchmarks.bench_multiprocess [seconds_per_run]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore, SQLiteGameStore
+
+
+def play(manager: GameManager, seconds: float) -> tuple:
+    """Return (creates, moves) completed in ``seconds``"""
+    creates = moves = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        game_id = manager.create_game().game_id
+        creates += 1
+        while True:
+            with manager.locked_game(game_id) as game:
+                if game.status != 'in_progress':
+                    break
+                row, col = game.random_position()
+                game.make_move(row, col, TicTacToeGame.PLAYER)
+                game.update_status()
+                if game.status == 'in_progress':
+                    game.make_server_move()
+                    game.update_status()
+            moves += 1
+    return creates, moves
+
+
+def worker(path: str, seconds: float, start, results):
+    manager = GameManager(SQLiteGameStore(path))
+    start.wait()
+    results.put(play(manager, seconds))
+
+
+def run_sqlite(processes: int, seconds: float) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'games.db')
+        SQLiteGameStore(path)
+        context = multiprocessing.get_context('spawn')
+        start = context.Event()
+        results = context.Queue()
+        workers = [context.Process(target=worker, args=(path, seconds, start, results))
+                   for _ in range(processes)]
+        for process in workers:
+            process.start()
+        time.sleep(0.5)
+        start.set()
+        totals = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+    return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    
+    print(f"{'backend':<10} {'procs':>5} {'creates/s':>10} {'moves/s':>10}")
+    creates, moves = play(GameManager(MemoryGameStore()), seconds)
+    print(f"{'memory':<10} {1:>5} {creates / seconds:>10.0f} {moves / seconds:>10.0f}")
+    for processes in (1, 2, 4, 8):
+        creates, moves = run_sqlite(processes, seconds)
+        print(f"{'sqlite':<10} {processes:>5} {creates / seconds:>10.0f} {moves / seconds:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Polling workload with and without the fragment cache and ETags
+
+Each of ``clients`` clients watches one game: every round it fetches its
+game's moves and the first page of /games, while ``writes`` random games
+get a move per round. Runs through the Flask test client with the fragment
+cache disabled, with it enabled, and with it enabled plus If-None-Match,
+and reports the mean time per poll, the fragment hit rate and how many
+polls were answered with 304.
+
+Usage:
+    python -m benchmarks.bench_polling [rounds] [clients] [writes]
+"""
+import logging
+import random
+import sys
+import time
+
+from app import metrics, outcome_table, server, service
+from app.game_logic import GameManager
+
+MODES = [
+    ('no cache', 0, False),
+    ('cache', 64 * 1024 * 1024, False),
+    ('cache + etag', 64 * 1024 * 1024, True),
+]
+
+
+def lookups() -> tuple:
+    hits = sum(metrics.FRAGMENT_LOOKUPS.labels(kind, 'hit').value for kind in ('summary', 'moves'))
+    misses = sum(metrics.FRAGMENT_LOOKUPS.labels(kind, 'miss').value for kind in ('summary', 'moves'))
+    return hits, misses
+
+
+def run(rounds: int, clients: int, writes: int, max_bytes: int, conditional: bool):
+    manager = GameManager()
+    manager.fragments.max_bytes = max_bytes
+    client = server.create_app({'GAME_MANAGER': manager, 'LOGGING': False}).test_client()
+    rng = random.Random(1)
+    game_ids = [manager.create_game().game_id for _ in range(clients)]
+    etags = {}
+    not_modified = polls = 0
+    elapsed = 0.0
+    hits, misses = lookups()
+    
+    for _ in range(rounds):
+        for game_id in rng.sample(game_ids, writes):
+            game = manager.get_game(game_id)
+            if game.status == 'in_progress':
+                row, col = rng.choice(game.get_available_positions())
+                service.play_move(manager, game_id, {'row': row, 'col': col})
+        for game_id in game_ids:
+            for url in (f'/game/{game_id}/moves', f'/games?limit={clients}'):
+                headers = {'If-None-Match': etags[game_id, url]} if conditional and (game_id, url) in etags else {}
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                elapsed += time.perf_counter() - started
+                polls += 1
+                if response.status_code == 304:
+                    not_modified += 1
+                else:
+                    etags[game_id, url] = response.headers['ETag']
+                    
+    new_hits, new_misses = lookups()
+    lookups_made = (new_hits - hits) + (new_misses - misses)
+    hit_rate = (new_hits - hits) / lookups_made if lookups_made else 0.0
+    return elapsed / polls, hit_rate, not_modified / polls
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    writes = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    
+    print(f"{'mode':<14} {'us/poll':>8} {'hit rate':>9} {'304s':>6}")
+    for name, max_bytes, conditional in MODES:
+        per_poll, hit_rate, not_modified = run(rounds, clients, writes, max_bytes, conditional)
+        print(f"{name:<14} {per_poll * 1e6:>8.0f} {hit_rate:>9.1%} {not_modified:>6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Latency and throughput of the Flask and asyncio server modes
+
+Each mode runs in its own process. An asyncio load client opens a number of
+connections that each play games back to back (create, then move until the
+game ends), optionally while holding extra idle keep-alive connections open,
+and reports requests/sec with p50/p99 latency per concurrency level.
+
+The Flask mode is run as ``app.run`` serves it: one thread per connection,
+closing the connection after every response, so its numbers include the
+reconnects a client of that server pays.
+
+Usage:
+    python -m benchmarks.bench_server_modes [seconds_per_run] [idle_connections]
+"""
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    'flask': ("import logging, sys; logging.disable(logging.INFO); from app import server; "
+              "server.create_app().run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"),
+    'async': ("import logging, sys; logging.disable(logging.INFO); from app import async_server; "
+              "async_server.run_server('127.0.0.1', int(sys.argv[1]))"),
+}
+CONCURRENCY = (1, 8, 64, 256)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start(mode: str) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, '-c', SERVERS[mode], str(port)])
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client that reconnects when the server closes"""
+    
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = self.writer = None
+        
+    async def request(self, method: str, path: str, body=None) -> dict:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.writer.write(
+            f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n\r\n'.encode() + payload
+        )
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').lower()
+        length = int(head.split('content-length:')[1].split('\r\n')[0])
+        data = await self.reader.readexactly(length)
+        if 'connection: close' in head or head.startswith('http/1.0'):
+            self.close()
+        return json.loads(data)
+        
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def _player(port: int, deadline: float, latencies: list):
+    connection = Connection(port)
+    
+    async def timed(method, path, body=None):
+        started = time.perf_counter()
+        response = await connection.request(method, path, body)
+        latencies.append(time.perf_counter() - started)
+        return response
+        
+    try:
+        while time.perf_counter() < deadline:
+            game = await timed('POST', '/game')
+            board = game['board']
+            while time.perf_counter() < deadline:
+                row, col = random.choice([(r, c) for r in range(3) for c in range(3) if board[r][c] is None])
+                state = await timed('POST', f"/game/{game['game_id']}/move", {'row': row, 'col': col})
+                if state['status'] != 'in_progress':
+                    break
+                board = state['board']
+    finally:
+        connection.close()
+
+
+async def _run(port: int, concurrency: int, seconds: float, idle: int) -> tuple:
+    """Return (requests/sec, p50 ms, p99 ms)"""
+    idle_connections = []
+    for _ in range(idle):
+        idle_connections.append(await asyncio.open_connection('127.0.0.1', port))
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(_player(port, started + seconds, latencies) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    for _, writer in idle_connections:
+        writer.close()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return len(latencies) / elapsed, p50, p99
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    idle = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    
+    print(f"{'mode':<6} {'conns':>5} {'idle':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in SERVERS:
+        process, port = _start(mode)
+        try:
+            for concurrency in CONCURRENCY:
+                rate, p50, p99 = asyncio.run(_run(port, concurrency, seconds, idle))
+                print(f"{mode:<6} {concurrency:>5} {idle:>6} {rate:>8.0f} {p50:>8.2f} {p99:>8.2f}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare per-move latency of the server strategies
+
+Usage:
+    python -m benchmarks.bench_strategies [games_per_strategy]
+"""
+import random
+import sys
+import time
+
+from app import ai
+from app.game_logic import TicTacToeGame
+
+
+def bench(strategy: str, games: int, rng: random.Random) -> list:
+    """Play ``games`` games against a random player and time every server move"""
+    timings = []
+    for i in range(games):
+        game = TicTacToeGame(f"game_{i}", strategy)
+        while game.status == 'in_progress':
+            row, col = rng.choice(game.get_available_positions())
+            game.make_move(row, col, TicTacToeGame.PLAYER)
+            game.update_status()
+            if game.status != 'in_progress':
+                break
+            started = time.perf_counter()
+            game.make_server_move()
+            timings.append(time.perf_counter() - started)
+            game.update_status()
+    return timings
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<16} {len(timings):>8} {mean * 1e6:>10.1f} {p50 * 1e6:>10.1f} {p99 * 1e6:>10.1f}")
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(42)
+    
+    print(f"{'strategy':<16} {'moves':>8} {'mean us':>10} {'p50 us':>10} {'p99 us':>10}")
+    for name in ai.STRATEGIES:
+        if name != 'random':
+            ai.transposition_table.clear()
+            report(f"{name} (cold)", bench(name, 1, rng))
+        report(name, bench(name, games, rng))
+    print(f"\ntransposition table entries: {len(ai.transposition_table)}")
+
+
+if __name__ == '__main__':
+    main()
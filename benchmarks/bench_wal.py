@@ -0,0 +1,127 @@
+"""
+Cost of the move log
+
+First plays moves through the service from several threads against an
+in-memory store without a log and with each fsync policy, and reports move
+latency and throughput. With 'always', concurrent requests share fsyncs, so
+throughput degrades far less than single-request latency suggests.
+
+Then fills a store with ``games`` games of two moves each, and times
+recovery from the log alone, writing a snapshot, and recovery from the
+snapshot, with the size of each on disk. A million games need a few GB of
+memory.
+
+Usage:
+    python -m benchmarks.bench_wal [moves_per_thread] [threads] [games]
+"""
+import gc
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from app import outcome_table, service
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore
+from app.wal import FSYNC_POLICIES, MoveLog
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def move_latencies(manager: GameManager, moves: int, threads: int) -> list:
+    """Sorted latencies of ``moves`` move requests on each of ``threads`` threads"""
+    latencies = [[] for _ in range(threads)]
+    
+    def worker(index):
+        done = 0
+        while done < moves:
+            game_id = manager.create_game().game_id
+            free = [(r, c) for r in range(3) for c in range(3)]
+            status = 'in_progress'
+            while status == 'in_progress' and done < moves:
+                row, col = free.pop()
+                started = time.perf_counter()
+                body, _ = service.play_move(manager, game_id, {'row': row, 'col': col})
+                latencies[index].append(time.perf_counter() - started)
+                done += 1
+                status = body.get('status', 'in_progress')
+                board = body.get('board')
+                if board:
+                    free = [(r, c) for r in range(3) for c in range(3) if board[r][c] is None]
+                    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return sorted(latency for per_thread in latencies for latency in per_thread), elapsed
+
+
+def fill(manager: GameManager, games: int):
+    for _ in range(games):
+        game = manager.create_game()
+        with manager.locked_game(game.game_id) as locked:
+            locked.make_move(1, 1, TicTacToeGame.PLAYER)
+            locked.make_server_move()
+            locked.update_status()
+
+
+def timed_open(directory: str):
+    gc.collect()
+    started = time.perf_counter()
+    store = MemoryGameStore(wal=MoveLog(directory, fsync='never'))
+    return store, time.perf_counter() - started
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    games = int(sys.argv[3]) if len(sys.argv) > 3 else 1000000
+    logging.disable(logging.INFO)
+    outcome_table.get_table()
+    
+    print(f"{'policy':<10} {'p50 us':>8} {'p99 us':>8} {'mean us':>8} {'moves/s':>9}")
+    for policy in (None,) + FSYNC_POLICIES:
+        with tempfile.TemporaryDirectory() as tmp:
+            wal = MoveLog(tmp, fsync=policy) if policy else None
+            manager = GameManager(MemoryGameStore(wal=wal))
+            latencies, elapsed = move_latencies(manager, moves, threads)
+            if wal is not None:
+                wal.close()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        mean = sum(latencies) / len(latencies) * 1e6
+        print(f"{policy or 'no log':<10} {p50:>8.0f} {p99:>8.0f} {mean:>8.0f} {len(latencies) / elapsed:>9.0f}")
+        
+    print()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryGameStore(wal=MoveLog(tmp, fsync='never'))
+        started = time.perf_counter()
+        fill(GameManager(store), games)
+        store.wal.close()
+        print(f"logged {games} games in {time.perf_counter() - started:.1f} s, "
+              f"log {directory_size(tmp) / 1e6:.0f} MB")
+        del store
+        
+        store, elapsed = timed_open(tmp)
+        print(f"recovered {len(store.games)} games from the log in {elapsed:.1f} s")
+        started = time.perf_counter()
+        store.wal.snapshot()
+        print(f"wrote snapshot in {time.perf_counter() - started:.1f} s, "
+              f"{directory_size(tmp) / 1e6:.0f} MB")
+        store.wal.close()
+        del store
+        
+        store, elapsed = timed_open(tmp)
+        print(f"recovered {len(store.games)} games from the snapshot in {elapsed:.1f} s")
+        store.wal.close()
+
+
+if __name__ == '__main__':
+    main()
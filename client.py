@@ -9,16 +9,39 @@ from typing import Optional
 
 
 class TicTacToeClient:
-    """Client for interacting with Tic-Tac-Toe server"""
+    """
+    Client for interacting with Tic-Tac-Toe server
     
-    def __init__(self, base_url: str = "http://localhost:5000"):
+    Requests go through one requests.Session, so consecutive calls reuse a
+    pooled keep-alive connection instead of opening a new one each time.
+    Pass ``session`` to share a pool or configure it; call close() (or use
+    the client as a context manager) to release the connections.
+    For many concurrent games see async_client.AsyncTicTacToeClient.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:5000", session: Optional[requests.Session] = None):
         self.base_url = base_url
+        self.session = session if session is not None else requests.Session()
         self.current_game_id: Optional[str] = None
         
-    def create_game(self) -> bool:
-        """Create a new game"""
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+        
+    def __enter__(self) -> 'TicTacToeClient':
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.close()
+        
+    def create_game(self, size: Optional[int] = None, k: Optional[int] = None) -> bool:
+        """Create a new game, optionally on a larger board"""
+        options = {}
+        if size is not None:
+            options['size'] = size
+            options['k'] = k if k is not None else min(size, 5)
         try:
-            response = requests.post(f"{self.base_url}/game")
+            response = self.session.post(f"{self.base_url}/game", json=options)
             if response.status_code == 201:
                 data = response.json()
                 self.current_game_id = data['game_id']
@@ -27,7 +50,10 @@ class TicTacToeClient:
                 self._display_board(data['board'])
                 return True
             else:
-                print(f"✗ Error creating game: {response.json().get('error', 'Unknown error')}")
+                error_data = response.json()
+                print(f"✗ Error creating game: {error_data.get('error', 'Unknown error')}")
+                if 'details' in error_data:
+                    print(f"  Details: {error_data['details']}")
                 return False
         except requests.RequestException as e:
             print(f"✗ Connection error: {e}")
@@ -41,7 +67,7 @@ class TicTacToeClient:
             return False
             
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/game/{self.current_game_id}/move",
                 json={'row': row, 'col': col}
             )
@@ -84,7 +110,7 @@ class TicTacToeClient:
             return False
             
         try:
-            response = requests.get(f"{self.base_url}/game/{game_id}/moves")
+            response = self.session.get(f"{self.base_url}/game/{game_id}/moves")
             
             if response.status_code == 200:
                 data = response.json()
@@ -110,14 +136,21 @@ class TicTacToeClient:
             return False
             
     def list_games(self) -> bool:
-        """List all games"""
+        """List all games, following the server's pages"""
         try:
-            response = requests.get(f"{self.base_url}/games")
-            
-            if response.status_code == 200:
+            games = []
+            params = {'limit': 1000}
+            while True:
+                response = self.session.get(f"{self.base_url}/games", params=params)
+                if response.status_code != 200:
+                    break
                 data = response.json()
-                games = data['games']
+                games.extend(data['games'])
+                if not data.get('next_cursor'):
+                    break
+                params['after'] = data['next_cursor']
                 
+            if response.status_code == 200:
                 print(f"\n=== All Games ({len(games)} total) ===")
                 if not games:
                     print("No games yet.")
@@ -144,15 +177,51 @@ class TicTacToeClient:
             print(f"✗ Connection error: {e}")
             return False
             
+    def export(self, path: str, after: Optional[str] = None) -> bool:
+        """
+        Stream every game with its moves to an NDJSON file
+        
+        When ``after`` is given the export resumes from that cursor and the
+        lines are appended to the file.
+        """
+        params = {'after': after} if after else {}
+        exported = 0
+        cursor = after
+        try:
+            with self.session.get(f"{self.base_url}/games/export", params=params, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"✗ Error: {response.json().get('error', 'Unknown error')}")
+                    return False
+                    
+                with open(path, 'a' if after else 'w', encoding='utf-8') as output:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        output.write(line.decode('utf-8') + '\n')
+                        cursor = json.loads(line)['cursor']
+                        exported += 1
+                        
+            print(f"\n✓ Exported {exported} games to {path}")
+            return True
+            
+        except (requests.RequestException, ValueError) as e:
+            print(f"✗ Export interrupted: {e}")
+            if cursor:
+                print(f"  Resume with: export {path} {cursor}")
+            return False
+            
     def _display_board(self, board, indent=0):
         """Display the game board"""
         indent_str = ' ' * indent
-        print(f"{indent_str}     0   1   2")
-        print(f"{indent_str}   +---+---+---+")
+        width = len(str(len(board) - 1)) + 1
+        separator = ' ' * (width + 1) + '+---' * len(board) + '+'
+        header = ''.join(f"  {col:<2}" for col in range(len(board))).rstrip()
+        print(f"{indent_str}{' ' * (width + 1)}{header}")
+        print(f"{indent_str}{separator}")
         for i, row in enumerate(board):
             cells = [cell if cell else ' ' for cell in row]
-            print(f"{indent_str} {i} | {cells[0]} | {cells[1]} | {cells[2]} |")
-            print(f"{indent_str}   +---+---+---+")
+            print(f"{indent_str}{i:>{width}} | " + ' | '.join(cells) + ' |')
+            print(f"{indent_str}{separator}")
             
     def print_help(self):
         """Print help message"""
@@ -160,10 +229,11 @@ class TicTacToeClient:
 === Tic-Tac-Toe CLI Client ===
 
 Commands:
-  new                     - Create a new game
+  new [size] [k]          - Create a new game (default 3x3, 3 in a row)
   move <row> <col>        - Make a move at position (row, col). Row and col are 0-2.
   moves [game_id]         - Show all moves for current or specified game
   list                    - List all games
+  export <file> [cursor]  - Stream all games and their moves to an NDJSON file
   help                    - Show this help message
   quit / exit             - Exit the client
 
@@ -173,12 +243,13 @@ Examples:
   > move 1 1              # Place your mark at center
   > moves                 # Show all moves in current game
   > list                  # List all games
+  > export games.ndjson   # Save every game with its moves
   > quit                  # Exit
 
 Notes:
   - You are 'X' and the server is 'O'
   - The server will automatically make its move after yours
-  - Board positions are (row, col) with indices 0-2
+  - Board positions are (row, col) with indices 0-2 (0 to size-1 on larger boards)
 """
         print(help_text)
         
@@ -190,13 +261,13 @@ Notes:
         
         while True:
             try:
-                command = input("> ").strip().lower()
+                command = input("> ").strip()
                 
                 if not command:
                     continue
                     
                 parts = command.split()
-                cmd = parts[0]
+                cmd = parts[0].lower()
                 
                 if cmd in ['quit', 'exit']:
                     print("Goodbye!")
@@ -206,7 +277,12 @@ Notes:
                     self.print_help()
                     
                 elif cmd == 'new':
-                    self.create_game()
+                    try:
+                        options = [int(part) for part in parts[1:3]]
+                    except ValueError:
+                        print("✗ Size and k must be integers")
+                        continue
+                    self.create_game(*options)
                     
                 elif cmd == 'move':
                     if len(parts) != 3:
@@ -226,6 +302,12 @@ Notes:
                 elif cmd == 'list':
                     self.list_games()
                     
+                elif cmd == 'export':
+                    if len(parts) not in (2, 3):
+                        print("✗ Usage: export <file> [cursor]")
+                        continue
+                    self.export(parts[1], parts[2] if len(parts) == 3 else None)
+                    
                 else:
                     print(f"✗ Unknown command: {cmd}")
                     print("Type 'help' for available commands")
@@ -244,8 +326,8 @@ def main():
     if len(sys.argv) > 1:
         base_url = sys.argv[1]
         
-    client = TicTacToeClient(base_url)
-    client.run()
+    with TicTacToeClient(base_url) as client:
+        client.run()
 
 
 if __name__ == '__main__':
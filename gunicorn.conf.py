@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the Tic-Tac-Toe server
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+
+The master builds the shared lookup tables once before forking; each worker
+then calls ``create_app()`` for its own app, store and log handlers, so
+nothing that holds a file or database connection crosses the fork.
+
+Workers run requests on a pool of threads (gthread), so a request such as
+POST /admin/profile can block without stalling the whole worker, and the
+profiler has other request threads to sample. Profiles are capped a few
+seconds below the worker timeout unless TICTACTOE_PROFILER_MAX_SECONDS is set.
+
+GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS and GUNICORN_TIMEOUT
+override the address, worker count, threads per worker and worker timeout.
+"""
+import os
+
+wsgi_app = 'app.server:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+
+# Read by create_app() in each worker; a timeout of 0 disables it
+if timeout:
+    os.environ.setdefault('TICTACTOE_PROFILER_MAX_SECONDS', str(max(timeout - 5, 1)))
+
+
+def on_starting(server):
+    from app.server import warm_up
+    warm_up()
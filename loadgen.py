@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Tic-Tac-Toe server
+
+Simulates ``players`` concurrent players against a running server, each
+repeating the cycle create a game -> move until it is finished -> fetch its
+move history, over one pooled AsyncTicTacToeClient. Players start evenly
+spread over ``--ramp-up`` seconds, new games can be capped at ``--rate`` per
+second, and each game's strategy and board size is drawn from ``--mix``.
+
+At the end it prints, per route, the request count and throughput, latency
+percentiles and error rate, and optionally writes the same report as JSON.
+
+Usage:
+    ./run_server.sh async          # or ./run_server.sh, in another terminal
+    python loadgen.py --players 50 --duration 30 --ramp-up 5 --mix random=7,perfect=2,random:15=1
+    python loadgen.py --games 1000 --rate 100 --json report.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from async_client import AsyncTicTacToeClient, ClientError
+
+ROUTES = ('POST /game', 'POST /game/{id}/move', 'GET /game/{id}/moves')
+PERCENTILES = (50, 90, 99)
+
+# (strategy, board size or None for the default 3x3, weight)
+Mix = List[Tuple[str, Optional[int], float]]
+
+
+def parse_mix(spec: str) -> Mix:
+    """
+    Parse a game mix such as ``random=7,perfect=2,random:15=1``
+    
+    Each entry is ``STRATEGY[:SIZE]=WEIGHT``; boards larger than 3x3 are
+    played with 5 in a row (or ``SIZE`` in a row if smaller).
+    """
+    mix = []
+    for entry in spec.split(','):
+        game, _, weight = entry.strip().partition('=')
+        strategy, _, size = game.partition(':')
+        try:
+            mix.append((strategy, int(size) if size else None, float(weight or 1)))
+        except ValueError:
+            raise ValueError(f"Invalid mix entry '{entry}', expected STRATEGY[:SIZE]=WEIGHT") from None
+        if not strategy or mix[-1][2] < 0:
+            raise ValueError(f"Invalid mix entry '{entry}', expected STRATEGY[:SIZE]=WEIGHT")
+    if not any(weight for _, _, weight in mix):
+        raise ValueError("The game mix needs a positive weight")
+    return mix
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class _Pacer:
+    """Spaces game starts ``1 / rate`` seconds apart, without bursting to catch up"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_start = 0.0
+        
+    async def wait(self):
+        now = time.perf_counter()
+        start = max(self.next_start, now)
+        self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class LoadGenerator:
+    """
+    Drives the create / play / history cycle from many concurrent players
+    
+    Stops starting new games once ``duration`` seconds have passed or
+    ``games`` games have been started, whichever comes first; games in
+    progress are played to the end.
+    """
+    
+    def __init__(self, base_url: str, players: int = 10, duration: Optional[float] = None,
+                 games: Optional[int] = None, rate: Optional[float] = None, ramp_up: float = 0.0,
+                 mix: Optional[Mix] = None, timeout: float = 30.0, seed: Optional[int] = None):
+        if duration is None and games is None:
+            raise ValueError("Give a duration, a number of games, or both")
+        self.base_url = base_url
+        self.players = players
+        self.duration = duration
+        self.games = games
+        self.ramp_up = ramp_up
+        self.mix = mix or [('random', None, 1.0)]
+        self.timeout = timeout
+        self._pacer = _Pacer(rate) if rate else None
+        self._rng = random.Random(seed)
+        self._latencies: Dict[str, List[float]] = {route: [] for route in ROUTES}
+        self._errors: Dict[str, Dict[str, int]] = {route: {} for route in ROUTES}
+        self._started = 0
+        self._finished = 0
+        self._deadline = 0.0
+        
+    async def run(self) -> dict:
+        """Run the load and return the report"""
+        began = time.perf_counter()
+        self._deadline = began + self.duration if self.duration is not None else float('inf')
+        async with AsyncTicTacToeClient(self.base_url, max_connections=self.players,
+                                        timeout=self.timeout) as client:
+            await asyncio.gather(*(self._player(client, index) for index in range(self.players)))
+        return self.report(time.perf_counter() - began)
+        
+    def _next_game(self) -> bool:
+        if time.perf_counter() >= self._deadline:
+            return False
+        if self.games is not None and self._started >= self.games:
+            return False
+        self._started += 1
+        return True
+        
+    async def _player(self, client: AsyncTicTacToeClient, index: int):
+        if self.ramp_up:
+            await asyncio.sleep(self.ramp_up * index / self.players)
+        while True:
+            if self._pacer is not None:
+                await self._pacer.wait()
+            if not self._next_game():
+                return
+            await self._cycle(client)
+            
+    async def _call(self, route: str, call):
+        """Await one request, recording its latency or error; None if it failed"""
+        started = time.perf_counter()
+        try:
+            result = await call
+        except ClientError as e:
+            kind = str(e.status)
+        except asyncio.TimeoutError:
+            kind = 'timeout'
+        except (OSError, ValueError):
+            kind = 'connection'
+        else:
+            self._latencies[route].append(time.perf_counter() - started)
+            return result
+        errors = self._errors[route]
+        errors[kind] = errors.get(kind, 0) + 1
+        return None
+        
+    async def _cycle(self, client: AsyncTicTacToeClient):
+        strategy, size, _ = self._rng.choices(self.mix, [weight for _, _, weight in self.mix])[0]
+        game = await self._call('POST /game', client.create_game(size, None, strategy))
+        if game is None:
+            return
+        game_id = game['game_id']
+        while game['status'] == 'in_progress':
+            free = [(row, col) for row, cells in enumerate(game['board'])
+                    for col, cell in enumerate(cells) if cell is None]
+            game = await self._call('POST /game/{id}/move', client.make_move(game_id, *self._rng.choice(free)))
+            if game is None:
+                return
+        if await self._call('GET /game/{id}/moves', client.get_moves(game_id)) is not None:
+            self._finished += 1
+            
+    def report(self, elapsed: float) -> dict:
+        """Throughput, latency percentiles (ms) and errors per route"""
+        routes = {}
+        for route in ROUTES:
+            ordered = sorted(self._latencies[route])
+            errors = self._errors[route]
+            requests = len(ordered) + sum(errors.values())
+            routes[route] = {
+                'requests': requests,
+                'per_second': round(requests / elapsed, 1) if elapsed else 0.0,
+                'errors': dict(errors),
+                'error_rate': round(sum(errors.values()) / requests, 4) if requests else 0.0,
+                'latency_ms': {
+                    **{f'p{p}': round(percentile(ordered, p) * 1e3, 2) for p in PERCENTILES},
+                    'max': round(ordered[-1] * 1e3, 2) if ordered else 0.0,
+                    'mean': round(sum(ordered) / len(ordered) * 1e3, 2) if ordered else 0.0,
+                },
+            }
+        return {
+            'base_url': self.base_url,
+            'players': self.players,
+            'seconds': round(elapsed, 3),
+            'games_started': self._started,
+            'games_finished': self._finished,
+            'games_per_second': round(self._finished / elapsed, 1) if elapsed else 0.0,
+            'routes': routes,
+        }
+
+
+def format_report(report: dict) -> str:
+    """The report as a fixed-width table"""
+    lines = [
+        f"{report['games_finished']} of {report['games_started']} games finished in {report['seconds']:.1f} s "
+        f"({report['games_per_second']:.1f} games/s, {report['players']} players)",
+        "",
+        f"{'route':<22} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'errors':>7}",
+    ]
+    for route, stats in report['routes'].items():
+        latency = stats['latency_ms']
+        lines.append(
+            f"{route:<22} {stats['requests']:>9} {stats['per_second']:>8.1f} {latency['p50']:>8.2f} "
+            f"{latency['p90']:>8.2f} {latency['p99']:>8.2f} {latency['max']:>8.2f} {stats['error_rate']:>7.2%}"
+        )
+        for kind, count in sorted(stats['errors'].items()):
+            lines.append(f"{'':<22}   {count} x {kind}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='loadgen.py', description="Load generator for the Tic-Tac-Toe server")
+    parser.add_argument('base_url', nargs='?', default="http://localhost:5000", help="server URL")
+    parser.add_argument('--players', type=int, default=10, help="concurrent players")
+    parser.add_argument('--duration', type=float, help="seconds to keep starting games (default 30)")
+    parser.add_argument('--games', type=int, help="stop after starting this many games")
+    parser.add_argument('--rate', type=float, help="cap on new games per second across all players")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="seconds over which players join")
+    parser.add_argument('--mix', default='random=1', help="game mix, e.g. random=7,perfect=2,random:15=1")
+    parser.add_argument('--timeout', type=float, default=30.0, help="seconds before a request fails")
+    parser.add_argument('--seed', type=int, help="seed for the game mix and moves")
+    parser.add_argument('--json', metavar='FILE',
+                        help="also write the report as JSON ('-' for stdout, moving the table to stderr)")
+    args = parser.parse_args(argv)
+    
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    duration = args.duration if args.duration is not None or args.games is not None else 30.0
+    generator = LoadGenerator(args.base_url, args.players, duration, args.games, args.rate, args.ramp_up,
+                              mix, args.timeout, args.seed)
+    report = asyncio.run(generator.run())
+    
+    # With the JSON report on stdout, the table goes to stderr so stdout stays parseable
+    print(format_report(report), file=sys.stderr if args.json == '-' else sys.stdout)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
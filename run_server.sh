@@ -1,6 +1,20 @@
 #!/bin/bash
 
 # Tic-Tac-Toe Server Launcher Script
+#
+# Usage: ./run_server.sh [flask|async]
+#   flask - Flask development server (default)
+#   async - asyncio server, for many concurrent idle connections
+
+MODE=${1:-flask}
+case "$MODE" in
+    flask) MODULE=app.server ;;
+    async) MODULE=app.async_server ;;
+    *)
+        echo "Unknown server mode: $MODE (expected flask or async)"
+        exit 1
+        ;;
+esac
 
 echo "=== Tic-Tac-Toe Server Launcher ==="
 echo ""
@@ -26,8 +40,8 @@ mkdir -p logs
 
 # Start the server
 echo ""
-echo "Starting Tic-Tac-Toe server..."
+echo "Starting Tic-Tac-Toe server ($MODE mode)..."
 echo "Press Ctrl+C to stop the server"
 echo ""
-python -m app.server
+python -m $MODULE
 
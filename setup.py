@@ -17,7 +17,10 @@ setup(
     extras_require={
         "dev": [
             "pytest>=7.4.3",
-        ]
+        ],
+        "fast": [
+            "orjson>=3.8",
+        ],
     },
 )
 
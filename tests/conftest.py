@@ -0,0 +1,52 @@
+"""
+Fixtures shared by the test modules
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app import async_server
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore, SQLiteGameStore
+
+
+def finish(manager: GameManager, game_id: str, player: str = TicTacToeGame.PLAYER):
+    """Win a game for ``player`` along the top row"""
+    with manager.locked_game(game_id) as game:
+        for col in range(3):
+            game.make_move(0, col, player)
+        game.update_status()
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, tmp_path):
+    """A GameManager over each storage backend"""
+    if request.param == 'memory':
+        return GameManager(MemoryGameStore())
+    return GameManager(SQLiteGameStore(str(tmp_path / 'games.db')))
+
+
+@pytest.fixture
+def games():
+    """The GameManager served by the ``port`` fixture"""
+    return GameManager()
+
+
+@pytest.fixture
+def port(games):
+    """Port of an asyncio server running on its own event loop thread"""
+    loop = asyncio.new_event_loop()
+    http_server = loop.run_until_complete(async_server.serve('127.0.0.1', 0, games))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield http_server.sockets[0].getsockname()[1]
+    
+    async def stop():
+        http_server.close()
+        await http_server.wait_closed()
+        
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
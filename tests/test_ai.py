@@ -0,0 +1,95 @@
+"""
+Unit tests for the server move-selection strategies
+"""
+import random
+
+import pytest
+
+from app import ai
+from app.game_logic import GameManager, TicTacToeGame
+
+
+def play_out(game: TicTacToeGame, rng: random.Random):
+    """Alternate random player moves with the server's strategy until the game ends"""
+    while game.status == 'in_progress':
+        row, col = rng.choice(game.get_available_positions())
+        game.make_move(row, col, TicTacToeGame.PLAYER)
+        game.update_status()
+        if game.status != 'in_progress':
+            break
+        game.make_server_move()
+        game.update_status()
+
+
+class TestStrategies:
+    """Test the strategy registry and the minimax engine"""
+    
+    def test_unknown_strategy(self):
+        """Test unknown strategies are rejected"""
+        with pytest.raises(ValueError):
+            ai.get_strategy('grandmaster')
+        with pytest.raises(ValueError):
+            GameManager().create_game('grandmaster')
+            
+    def test_incomplete_strategy_cannot_be_created(self):
+        """Test a strategy without choose_move fails when instantiated"""
+        class Incomplete(ai.Strategy):
+            name = 'incomplete'
+            
+        with pytest.raises(TypeError):
+            Incomplete()
+            
+    def test_canonical_key_is_symmetry_invariant(self):
+        """Test all 8 symmetric positions share one transposition-table key"""
+        # X in a corner, O on the adjacent edge
+        corners = [0, 2, 6, 8]
+        edges = {0: [1, 3], 2: [1, 5], 6: [3, 7], 8: [5, 7]}
+        keys = {
+            ai.canonical_key(1 << corner, 1 << edge)
+            for corner in corners
+            for edge in edges[corner]
+        }
+        assert len(keys) == 1
+        
+    @pytest.mark.parametrize('strategy', ['easy', 'medium', 'perfect'])
+    def test_takes_immediate_win(self, strategy):
+        """Test minimax strategies complete their own line"""
+        game = TicTacToeGame("test_game_1", strategy)
+        game.make_move(0, 0, TicTacToeGame.PLAYER)
+        game.make_move(1, 0, TicTacToeGame.SERVER)
+        game.make_move(0, 1, TicTacToeGame.PLAYER)
+        game.make_move(1, 1, TicTacToeGame.SERVER)
+        game.make_move(2, 2, TicTacToeGame.PLAYER)
+        
+        assert game.make_server_move() == (1, 2)
+        
+    @pytest.mark.parametrize('strategy', ['medium', 'perfect'])
+    def test_blocks_opponent(self, strategy):
+        """Test deeper strategies block the player's open line"""
+        game = TicTacToeGame("test_game_1", strategy)
+        game.make_move(0, 0, TicTacToeGame.PLAYER)
+        game.make_move(1, 1, TicTacToeGame.SERVER)
+        game.make_move(0, 1, TicTacToeGame.PLAYER)
+        
+        assert game.make_server_move() == (0, 2)
+        
+    def test_perfect_never_loses(self):
+        """Test perfect play never loses against a random player"""
+        rng = random.Random(1234)
+        for i in range(200):
+            game = TicTacToeGame(f"game_{i}", 'perfect')
+            play_out(game, rng)
+            assert game.status in ('server_wins', 'draw')
+            
+    def test_transposition_table_stays_small(self):
+        """Test the shared table is bounded by canonical positions"""
+        game = TicTacToeGame("test_game_1", 'perfect')
+        game.make_server_move()
+        # 765 essentially different positions exist; entries are per position
+        assert len(ai.transposition_table) <= 765
+        
+    def test_game_records_strategy(self):
+        """Test the strategy chosen at creation is kept on the game"""
+        game = GameManager().create_game('perfect')
+        assert game.strategy == 'perfect'
+        assert game.to_dict()['strategy'] == 'perfect'
@@ -0,0 +1,208 @@
+"""
+Tests for the asyncio server mode
+"""
+import asyncio
+import http.client
+import json
+import resource
+
+import pytest
+
+from app import async_server, server, websocket
+from app.storage import MemoryGameStore, SQLiteGameStore
+from app.wal import MoveLog
+
+
+def request(connection, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+class TestAsyncServer:
+    """Test the asyncio server serves the same API as the Flask app"""
+    
+    def test_play_game_over_one_connection(self, port):
+        """Test a game can be created and played on a single keep-alive connection"""
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        status, body = request(connection, 'POST', '/game', {'strategy': 'perfect'})
+        assert status == 201
+        game_id = json.loads(body)['game_id']
+        
+        status, body = request(connection, 'POST', f'/game/{game_id}/move', {'row': 1, 'col': 1})
+        assert status == 200
+        assert json.loads(body)['message'] == 'Your turn!'
+        status, body = request(connection, 'POST', f'/game/{game_id}/move', {'row': 1, 'col': 1})
+        assert status == 400
+        
+        status, body = request(connection, 'GET', f'/game/{game_id}/moves')
+        assert len(json.loads(body)['moves']) == 2
+        status, body = request(connection, 'GET', '/games?limit=1')
+        assert json.loads(body)['games'][0]['game_id'] == game_id
+        connection.close()
+        
+    def test_responses_match_flask(self, port, games):
+        """Test each route returns the same status and body as the Flask app"""
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        for _ in range(2):
+            request(connection, 'POST', '/game')
+        flask_client = server.create_app({'GAME_MANAGER': games, 'LOGGING': False}).test_client()
+        checks = [
+            ('POST', '/game', {'size': 2}),
+            ('POST', '/game/missing/move', {'row': 0, 'col': 0}),
+            ('POST', '/game/game_1/move', {'row': 'a', 'col': 0}),
+            ('POST', '/games/moves', {'moves': []}),
+            ('GET', '/games?limit=0', None),
+            ('GET', '/games?status=bogus', None),
+            ('GET', '/game/missing/moves', None),
+            ('GET', '/game/game_1/moves', None),
+            ('GET', '/games', None),
+        ]
+        for method, path, body in checks:
+            status, raw = request(connection, method, path, body)
+            expected = flask_client.open(path, method=method, json=body)
+            assert (status, json.loads(raw)) == (expected.status_code, expected.get_json())
+        connection.close()
+        
+    def test_export_is_chunked_ndjson(self, port):
+        """Test the export streams one line per game"""
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        for _ in range(3):
+            request(connection, 'POST', '/game')
+        connection.request('GET', '/games/export?after=1')
+        response = connection.getresponse()
+        assert response.getheader('Transfer-Encoding') == 'chunked'
+        lines = [json.loads(line) for line in response.read().splitlines()]
+        assert [line['game_id'] for line in lines] == ['game_2', 'game_3']
+        connection.close()
+        
+    def test_conditional_get(self, port):
+        """Test a matching If-None-Match gets 304 on a keep-alive connection"""
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        request(connection, 'POST', '/game')
+        connection.request('GET', '/game/game_1/moves')
+        response = connection.getresponse()
+        response.read()
+        etag = response.getheader('ETag')
+        
+        for path in ('/game/game_1/moves', '/games'):
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            connection.request('GET', path, headers={'If-None-Match': f'W/{response.getheader("ETag")}, "other"'})
+            response = connection.getresponse()
+            assert (response.status, response.read()) == (304, b'')
+            
+        request(connection, 'POST', '/game/game_1/move', {'row': 0, 'col': 0})
+        connection.request('GET', '/game/game_1/moves', headers={'If-None-Match': etag})
+        response = connection.getresponse()
+        assert response.status == 200
+        assert len(json.loads(response.read())['moves']) == 2
+        connection.close()
+        
+    def test_unknown_route_and_method(self, port):
+        """Test unmatched paths get 404 and wrong methods 405"""
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        assert request(connection, 'GET', '/nope')[0] == 404
+        assert request(connection, 'GET', '/game')[0] == 405
+        connection.close()
+        
+    def test_disk_backed_stores_run_in_threads(self, tmp_path):
+        """Test game operations leave the event loop whenever the store touches disk"""
+        assert not async_server._offload(MemoryGameStore())
+        assert async_server._offload(SQLiteGameStore(str(tmp_path / 'games.db')))
+        assert async_server._offload(MemoryGameStore(archive=SQLiteGameStore(str(tmp_path / 'archive.db'))))
+        wal = MoveLog(str(tmp_path / 'wal'))
+        assert async_server._offload(MemoryGameStore(wal=wal))
+        wal.close()
+
+
+def ws_connect(port, game_id):
+    return websocket.connect('127.0.0.1', port, f'/game/{game_id}/ws')
+
+
+async def next_event(ws):
+    return json.loads(await asyncio.wait_for(ws.receive(), 10))
+
+
+class TestWebSocket:
+    """Test the per-game WebSocket push channel"""
+    
+    def test_play_over_websocket(self, port, games):
+        """Test moves sent over the socket are applied and answered with events"""
+        game_id = games.create_game('perfect').game_id
+        
+        async def play():
+            ws = await ws_connect(port, game_id)
+            assert (await next_event(ws))['type'] == 'state'
+            ws.send(json.dumps({'row': 1, 'col': 1}))
+            state = await next_event(ws)
+            assert state['type'] == 'state'
+            assert state['board'][1][1] == 'X'
+            ws.send(json.dumps({'row': 1, 'col': 1}))
+            error = await next_event(ws)
+            assert (error['type'], error['code']) == ('error', 400)
+            ws.send('not json')
+            assert (await next_event(ws))['code'] == 400
+            await ws.close()
+            
+        asyncio.run(play())
+        
+    def test_http_moves_are_pushed_until_game_over(self, port, games):
+        """Test watchers get every move, including those made over HTTP, and the final event"""
+        game_id = games.create_game().game_id
+        
+        async def watch():
+            ws = await ws_connect(port, game_id)
+            await next_event(ws)
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            events = []
+            while not events or events[-1]['type'] == 'state':
+                free = games.get_game(game_id).get_available_positions()
+                row, col = free[0]
+                await asyncio.to_thread(request, connection, 'POST', f'/game/{game_id}/move', {'row': row, 'col': col})
+                events.append(await next_event(ws))
+            connection.close()
+            await ws.close()
+            return events
+            
+        events = asyncio.run(watch())
+        assert events[-1]['type'] == 'game_over'
+        assert events[-1]['status'] == games.get_game(game_id).status
+        
+    def test_unknown_game_is_refused(self, port):
+        """Test the upgrade is refused for a game that does not exist"""
+        with pytest.raises(ConnectionError):
+            asyncio.run(ws_connect(port, 'missing'))
+            
+    def test_thousands_of_watchers(self, port, games):
+        """Test one process holds thousands of sockets and pushes a move to all of them"""
+        connections = 2000
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard != resource.RLIM_INFINITY and hard < 2 * connections + 100:
+            pytest.skip('open file limit too low')
+        resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, 2 * connections + 100), hard))
+        game_id = games.create_game().game_id
+        
+        async def fan_out():
+            opening = asyncio.Semaphore(200)
+            
+            async def open_one():
+                async with opening:
+                    ws = await ws_connect(port, game_id)
+                    await next_event(ws)
+                    return ws
+                    
+            sockets = await asyncio.gather(*(open_one() for _ in range(connections)))
+            assert async_server.hub.connections() == connections
+            sockets[0].send(json.dumps({'row': 0, 'col': 0}))
+            events = await asyncio.gather(*(next_event(ws) for ws in sockets))
+            await asyncio.gather(*(ws.close() for ws in sockets))
+            return events
+            
+        try:
+            events = asyncio.run(fan_out())
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        assert all(event['board'][0][0] == 'X' for event in events)
@@ -0,0 +1,33 @@
+"""
+Unit tests for the JSON fragment cache
+"""
+from app.cache import FragmentCache
+
+
+def test_hit_only_for_the_same_version():
+    """Test a fragment is reused for its version and rebuilt for a newer one"""
+    cache = FragmentCache()
+    assert cache.get('summary', 'game_1', 1, lambda: 'v1') == 'v1'
+    assert cache.get('summary', 'game_1', 1, lambda: 'rebuilt') == 'v1'
+    assert cache.get('summary', 'game_1', 2, lambda: 'v2') == 'v2'
+    assert cache.get('summary', 'game_1', 1, lambda: 'old') == 'old'
+    assert cache.get('summary', 'game_1', 2, lambda: 'rebuilt') == 'v2'
+    assert len(cache) == 1
+
+
+def test_bounded_by_size():
+    """Test least recently used fragments are dropped past the size budget"""
+    cache = FragmentCache(max_bytes=10)
+    cache.get('moves', 'game_1', 1, lambda: 'a' * 4)
+    cache.get('moves', 'game_2', 1, lambda: 'b' * 4)
+    cache.get('moves', 'game_1', 1, lambda: 'unused')
+    cache.get('moves', 'game_3', 1, lambda: 'c' * 4)
+    assert cache.get('moves', 'game_1', 1, lambda: 'miss') == 'aaaa'
+    assert cache.get('moves', 'game_2', 1, lambda: 'miss') == 'miss'
+
+
+def test_disabled():
+    """Test a zero budget caches nothing"""
+    cache = FragmentCache(max_bytes=0)
+    cache.get('moves', 'game_1', 1, lambda: 'a')
+    assert len(cache) == 0
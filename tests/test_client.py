@@ -0,0 +1,66 @@
+"""
+Tests for the pooled and asyncio clients, against the asyncio server
+"""
+import asyncio
+
+import pytest
+
+from async_client import AsyncTicTacToeClient, ClientError, play
+from client import TicTacToeClient
+
+
+def test_client_reuses_one_connection(port):
+    """Test consecutive calls share a keep-alive connection"""
+    with TicTacToeClient(f'http://127.0.0.1:{port}') as client:
+        assert client.create_game()
+        game_id = client.current_game_id
+        assert client.make_move(1, 1)
+        assert client.get_moves(game_id)
+        assert client.list_games()
+        
+        pool = client.session.get_adapter('http://').poolmanager.connection_from_url(client.base_url)
+        assert pool.num_connections == 1
+
+
+def test_async_client_plays_concurrent_games(port):
+    """Test many games share a small connection pool"""
+    async def run():
+        async with AsyncTicTacToeClient(f'http://127.0.0.1:{port}', max_connections=4) as client:
+            results = await asyncio.gather(*(play(client) for _ in range(40)))
+            games = await client.list_games(page_size=7)
+            moves = await client.get_moves(games[0]['game_id'])
+            assert len(client._idle) <= 4
+            with pytest.raises(ClientError) as error:
+                await client.make_move(games[0]['game_id'], 9, 9)
+            return results, games, moves, error.value
+            
+    results, games, moves, error = asyncio.run(run())
+    assert len(results) == len(games) == 40
+    assert all(status != 'in_progress' for status in results)
+    assert moves and moves[0]['player'] == 'player'
+    assert error.status == 400
+
+
+def test_async_client_retries_closed_idle_connection():
+    """Test a request is resent when the server has dropped the pooled connection"""
+    body = b'{"game_id":"game_1","moves":[]}'
+    
+    async def handle(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                     b'Content-Length: %d\r\n\r\n%s' % (len(body), body))
+        await writer.drain()
+        writer.close()
+        
+    async def run():
+        fake = await asyncio.start_server(handle, '127.0.0.1', 0)
+        url = f'http://127.0.0.1:{fake.sockets[0].getsockname()[1]}'
+        async with AsyncTicTacToeClient(url) as client:
+            first = await client.get_moves('game_1')
+            await asyncio.sleep(0.05)
+            second = await client.get_moves('game_1')
+        fake.close()
+        await fake.wait_closed()
+        return first, second
+        
+    assert asyncio.run(run()) == ([], [])
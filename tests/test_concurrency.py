@@ -0,0 +1,116 @@
+"""
+Multi-threaded stress tests for GameManager
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+from app.game_logic import GameManager, TicTacToeGame
+
+
+THREADS = 16
+
+
+class YieldingGame(TicTacToeGame):
+    """Game that yields to other threads between validating and applying a move"""
+    
+    def _is_valid_move(self, row: int, col: int) -> bool:
+        valid = super()._is_valid_move(row, col)
+        time.sleep(0)
+        return valid
+
+
+@pytest.fixture(autouse=True)
+def fast_thread_switching():
+    """Switch threads far more often than normal to shake out races"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(target, count=THREADS):
+    barrier = threading.Barrier(count)
+    
+    def worker(index):
+        barrier.wait()
+        target(index)
+        
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestGameManagerConcurrency:
+    """Test GameManager under concurrent access"""
+    
+    def test_concurrent_create_game_ids_are_unique(self):
+        """Test concurrent creates never hand out the same ID"""
+        manager = GameManager()
+        per_thread = 500
+        created = [[] for _ in range(THREADS)]
+        
+        def create(index):
+            for _ in range(per_thread):
+                created[index].append(manager.create_game().game_id)
+                
+        run_threads(create)
+        
+        ids = [game_id for ids in created for game_id in ids]
+        assert len(set(ids)) == THREADS * per_thread
+        assert len(manager.games) == THREADS * per_thread
+        assert manager.game_counter == THREADS * per_thread
+        
+    def test_concurrent_moves_on_one_game_are_not_lost(self):
+        """Test racing moves on the same cells are applied exactly once each"""
+        manager = GameManager()
+        game = YieldingGame("game_1", size=25, k=25)
+        manager.games[game.game_id] = game
+        accepted = [0] * THREADS
+        
+        def play(index):
+            # Every thread tries every cell, so each cell is contested by all threads
+            for cell in range(25 * 25):
+                with manager.locked_game(game.game_id) as locked:
+                    if locked.make_move(*divmod(cell, 25), TicTacToeGame.PLAYER):
+                        accepted[index] += 1
+                        
+        run_threads(play)
+        
+        assert sum(accepted) == 25 * 25
+        assert len(game.moves) == 25 * 25
+        assert bin(game.player_bits).count('1') == 25 * 25
+        
+    def test_concurrent_games_finish_independently(self):
+        """Test full games played in parallel each keep a consistent history"""
+        manager = GameManager()
+        games_per_thread = 50
+        
+        def play(index):
+            for _ in range(games_per_thread):
+                game_id = manager.create_game().game_id
+                while True:
+                    with manager.locked_game(game_id) as game:
+                        if game.status != 'in_progress':
+                            break
+                        game.make_random_move()
+                        game.update_status()
+                        
+        run_threads(play)
+        
+        games = manager.get_all_games()
+        assert len(games) == THREADS * games_per_thread
+        for game in games:
+            assert game.status != 'in_progress'
+            occupied = bin(game.player_bits | game.server_bits).count('1')
+            assert len(game.moves) == occupied
+            
+    def test_locked_game_missing(self):
+        """Test locking an unknown game yields None"""
+        manager = GameManager()
+        with manager.locked_game("nonexistent") as game:
+            assert game is None
@@ -1,7 +1,11 @@
 """
 Unit tests for Tic-Tac-Toe game logic
 """
+import tracemalloc
+from datetime import datetime, timedelta
+
 import pytest
+from app import outcome_table
 from app.game_logic import TicTacToeGame, GameManager
 
 
@@ -221,6 +225,51 @@ class TestTicTacToeGame:
         assert moves[0]['player'] == 'player'
         assert moves[1]['player'] == 'server'
         
+    def test_move_history_view(self):
+        """Test the compact history reads back in the API shape"""
+        game = TicTacToeGame("test_game_1", 'random', 15, 5)
+        game.make_move(14, 13, TicTacToeGame.SERVER, offset_ms=1500)
+        
+        assert len(game.moves) == 1
+        assert game.moves[-1] == {
+            'player': 'server',
+            'position': {'row': 14, 'col': 13},
+            'timestamp': game.created_at + timedelta(milliseconds=1500)
+        }
+        assert game.moves[:] == game.get_moves()
+        
+    def test_from_legacy_record(self):
+        """Test records with move dictionaries still load"""
+        game = TicTacToeGame("test_game_1")
+        game.make_move(0, 0, TicTacToeGame.PLAYER)
+        game.make_move(1, 1, TicTacToeGame.SERVER)
+        record = game.to_record()
+        del record['cells'], record['offsets']
+        record['moves'] = [dict(move, timestamp=move['timestamp'].isoformat() + 'Z') for move in game.get_moves()]
+        
+        loaded = TicTacToeGame.from_record(record)
+        assert loaded.get_moves() == game.get_moves()
+        assert loaded.to_record() == game.to_record()
+        
+    def test_bitboards_track_moves(self):
+        """Test moves are recorded in the per-player bitboards"""
+        game = TicTacToeGame("test_game_1")
+        game.make_move(0, 0, TicTacToeGame.PLAYER)
+        game.make_move(1, 2, TicTacToeGame.SERVER)
+        
+        assert game.player_bits == 0b000000001
+        assert game.server_bits == 0b000100000
+        assert game.board == [['X', None, None], [None, None, 'O'], [None, None, None]]
+        
+    def test_board_view_writes_through(self):
+        """Test assigning into the board view updates the bitboards"""
+        game = TicTacToeGame("test_game_1")
+        game.board[2][1] = TicTacToeGame.SERVER
+        assert game.server_bits == 1 << 7
+        
+        game.board[2][1] = None
+        assert game.server_bits == 0
+        
     def test_to_dict(self):
         """Test converting game to dictionary"""
         game = TicTacToeGame("test_game_1")
@@ -231,6 +280,20 @@ class TestTicTacToeGame:
         assert game_dict['winner'] is None
         assert 'board' in game_dict
         assert 'created_at' in game_dict
+        
+    def test_status_views(self):
+        """Test status, winner and created_at keep their public shapes"""
+        game = TicTacToeGame("test_game_1")
+        for col in range(3):
+            game.make_move(0, col, TicTacToeGame.PLAYER)
+        game.update_status()
+        
+        assert game.status == 'player_wins'
+        assert game.winner == 'player'
+        assert game.created_at.tzinfo is None
+        assert abs(game.created_at - datetime.utcnow()) < timedelta(seconds=5)
+        with pytest.raises(AttributeError):
+            game.extra = 1
 
 
 class TestGameManager:
@@ -290,3 +353,28 @@ class TestGameManager:
         all_games = manager.get_all_games()
         assert len(all_games) == 0
 
+
+class TestMemory:
+    """Memory held per stored game"""
+    
+    # Bytes per finished five-move game, including the store's indexes
+    BUDGET = 750
+    
+    def test_bytes_per_game_within_budget(self):
+        """Test a stored game stays under the memory budget"""
+        outcome_table.get_table()
+        manager = GameManager()
+        count = 2000
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(count):
+                game = manager.create_game()
+                with manager.locked_game(game.game_id) as locked:
+                    for row, col, player in [(0, 0, 'X'), (1, 0, 'O'), (0, 1, 'X'), (1, 1, 'O'), (0, 2, 'X')]:
+                        locked.make_move(row, col, player)
+                    locked.update_status()
+            per_game = (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            tracemalloc.stop()
+        assert per_game < self.BUDGET
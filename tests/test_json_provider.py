@@ -0,0 +1,59 @@
+"""
+Unit tests for the JSON provider
+"""
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from app import json_provider
+from app.game_logic import TicTacToeGame
+from app.service import game_summary
+
+PROVIDERS = [json_provider.StdlibJSONProvider, json_provider.OrjsonProvider]
+
+
+def summary() -> dict:
+    game = TicTacToeGame("game_1", 'random', 15, 5)
+    game.make_move(7, 7, TicTacToeGame.PLAYER)
+    game.make_move(7, 8, TicTacToeGame.SERVER, offset_ms=1500)
+    line = game_summary(game)
+    line['moves'] = game.get_moves()
+    return line
+
+
+@pytest.mark.parametrize('moment', [datetime(2026, 1, 2, 3, 4, 5, 6), datetime(2026, 1, 2, 3, 4, 5)])
+def test_datetime_format(moment):
+    """Test datetimes are written as ISO 8601 with a Z suffix by either encoder"""
+    expected = json.dumps(moment.isoformat() + 'Z')
+    assert json_provider.dumps(moment) == expected
+    assert json_provider.stdlib_dumps(moment) == expected
+
+
+def test_encoders_agree():
+    """Test the fast path writes the same document as the standard library"""
+    line = summary()
+    assert json_provider.dumps(line) == json_provider.stdlib_dumps(line)
+    assert json_provider.loads(json_provider.dumps_bytes(line))['moves'][1]['timestamp'].endswith('Z')
+
+
+def test_big_integers():
+    """Test integers beyond 64 bits survive a round trip"""
+    value = {'bits': 1 << 200}
+    assert json_provider.loads(json_provider.dumps(value)) == value
+
+
+@pytest.mark.parametrize('provider', PROVIDERS)
+def test_flask_provider(provider):
+    """Test both providers give jsonify the same output"""
+    if provider is json_provider.OrjsonProvider and json_provider.orjson is None:
+        pytest.skip('orjson is not installed')
+    app = Flask(__name__)
+    app.json = provider(app)
+    line = summary()
+    with app.app_context():
+        response = app.json.response(line)
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == json.loads(json_provider.stdlib_dumps(line))
+    assert app.json.loads(app.json.dumps(line))['created_at'] == line['created_at'].isoformat() + 'Z'
@@ -0,0 +1,86 @@
+"""
+Unit tests for N x N, k-in-a-row boards
+"""
+import pytest
+
+from app.game_logic import GameManager, TicTacToeGame
+
+
+class TestLargeBoard:
+    """Test generalized board sizes"""
+    
+    def test_board_dimensions(self):
+        """Test the board view matches the requested size"""
+        game = TicTacToeGame("test_game_1", size=15, k=5)
+        assert len(game.board) == 15
+        assert all(len(row) == 15 for row in game.board)
+        assert len(game.get_available_positions()) == 225
+        
+    def test_invalid_options(self):
+        """Test invalid sizes, k values and unsupported strategies are rejected"""
+        manager = GameManager()
+        with pytest.raises(ValueError):
+            manager.create_game(size=2)
+        with pytest.raises(ValueError):
+            manager.create_game(size=5, k=6)
+        with pytest.raises(ValueError):
+            manager.create_game('perfect', size=15, k=5)
+        assert manager.game_counter == 0
+        
+    def test_bounds_follow_size(self):
+        """Test moves are validated against the board size"""
+        game = TicTacToeGame("test_game_1", size=15, k=5)
+        assert game.make_move(14, 14, TicTacToeGame.PLAYER) is True
+        assert game.make_move(15, 0, TicTacToeGame.PLAYER) is False
+        
+    @pytest.mark.parametrize('cells', [
+        [(7, 3), (7, 4), (7, 5), (7, 6), (7, 7)],        # row
+        [(3, 9), (4, 9), (5, 9), (6, 9), (7, 9)],        # column
+        [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)],        # diagonal
+        [(10, 14), (11, 13), (12, 12), (13, 11), (14, 10)],  # anti-diagonal
+    ])
+    def test_k_in_a_row(self, cells):
+        """Test each line direction wins, even when the middle stone is placed last"""
+        game = TicTacToeGame("test_game_1", size=15, k=5)
+        order = cells[:2] + cells[3:] + [cells[2]]
+        for row, col in order[:-1]:
+            game.make_move(row, col, TicTacToeGame.SERVER)
+            assert game.check_winner() is None
+        game.make_move(*order[-1], TicTacToeGame.SERVER)
+        
+        game.update_status()
+        assert game.status == 'server_wins'
+        assert game.winner == 'server'
+        
+    def test_broken_line_does_not_win(self):
+        """Test stones separated by a gap do not count as a line"""
+        game = TicTacToeGame("test_game_1", size=7, k=4)
+        for col in (0, 1, 2, 4):
+            game.make_move(3, col, TicTacToeGame.PLAYER)
+        assert game.check_winner() is None
+        
+    def test_draw_on_full_board(self):
+        """Test a full board without a line is a draw"""
+        game = TicTacToeGame("test_game_1", size=4, k=4)
+        # Rows alternate X X O O / O O X X, so no row, column or diagonal completes
+        for row in range(4):
+            for col in range(4):
+                player = TicTacToeGame.PLAYER if (col < 2) == (row % 2 == 0) else TicTacToeGame.SERVER
+                game.make_move(row, col, player)
+        assert game.check_winner() == 'draw'
+        
+    def test_board_view_write_through(self):
+        """Test direct board edits keep the incremental result in sync"""
+        game = TicTacToeGame("test_game_1", size=5, k=3)
+        for col in range(3):
+            game.board[0][col] = TicTacToeGame.PLAYER
+        assert game.check_winner() == 'player'
+        
+        game.board[0][1] = None
+        assert game.check_winner() is None
+        
+    def test_random_move_on_large_board(self):
+        """Test the server can play on a large board"""
+        game = GameManager().create_game(size=15, k=5)
+        row, col = game.make_server_move()
+        assert game.board[row][col] == TicTacToeGame.SERVER
@@ -0,0 +1,53 @@
+"""
+Tests for the load generator, against the asyncio server
+"""
+import asyncio
+import json
+
+import pytest
+
+from loadgen import ROUTES, LoadGenerator, format_report, main, parse_mix
+
+
+def test_parse_mix():
+    """Test game mix entries with and without a board size"""
+    assert parse_mix('random=7,perfect=2,random:15=1') == [
+        ('random', None, 7.0), ('perfect', None, 2.0), ('random', 15, 1.0)
+    ]
+    for spec in ('random=x', ':5=1', 'random=0'):
+        with pytest.raises(ValueError):
+            parse_mix(spec)
+
+
+def test_full_cycles(port):
+    """Test every started game is played out and its history fetched"""
+    generator = LoadGenerator(f'http://127.0.0.1:{port}', players=4, games=12, ramp_up=0.05,
+                              mix=parse_mix('random=1,perfect=1,random:5=1'), seed=1)
+    report = asyncio.run(generator.run())
+    
+    assert report['games_started'] == report['games_finished'] == 12
+    assert list(report['routes']) == list(ROUTES)
+    assert report['routes']['POST /game']['requests'] == 12
+    assert report['routes']['GET /game/{id}/moves']['requests'] == 12
+    assert report['routes']['POST /game/{id}/move']['requests'] >= 12 * 3
+    assert all(stats['error_rate'] == 0 for stats in report['routes'].values())
+    assert 'POST /game/{id}/move' in format_report(report)
+
+
+def test_errors_are_counted(port):
+    """Test failed requests are reported per route rather than raised"""
+    generator = LoadGenerator(f'http://127.0.0.1:{port}', players=2, games=4,
+                              mix=parse_mix('clairvoyant=1'))
+    report = asyncio.run(generator.run())
+    
+    assert report['games_finished'] == 0
+    assert report['routes']['POST /game']['errors'] == {'400': 4}
+    assert report['routes']['POST /game']['error_rate'] == 1.0
+
+
+def test_json_to_stdout_is_parseable(port, capsys):
+    """Test --json - leaves only the JSON report on stdout"""
+    main([f'http://127.0.0.1:{port}', '--players', '2', '--games', '2', '--json', '-'])
+    out, err = capsys.readouterr()
+    assert json.loads(out)['games_finished'] == 2
+    assert 'POST /game/{id}/move' in err
@@ -0,0 +1,161 @@
+"""
+Tests for the queued, batched logging pipeline
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from app.logging_config import (BatchFileHandler, BatchingQueueListener, JsonLinesFormatter,
+                                MoveSampler, RecordQueueHandler, TEXT_FORMAT, configure_logging,
+                                shutdown_logging)
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """A private logger feeding a batching listener that writes to a file"""
+    path = tmp_path / 'test.log'
+    handler = BatchFileHandler(str(path))
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, [handler])
+    logger = logging.getLogger('test_logging_config')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    queue_handler = RecordQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    listener.start()
+    yield logger, listener, handler, path
+    listener.stop()
+    logger.removeHandler(queue_handler)
+    handler.close()
+
+
+class TestQueuedLogging:
+    """Test records are written by the listener thread in batches"""
+    
+    def test_all_records_written_in_order(self, pipeline):
+        """Test every record reaches the file once the listener stops"""
+        logger, listener, handler, path = pipeline
+        for i in range(2000):
+            logger.info("record %s", i)
+        listener.stop()
+        lines = path.read_text().splitlines()
+        assert [line.rsplit(' ', 1)[1] for line in lines] == [str(i) for i in range(2000)]
+        
+    def test_writes_happen_off_the_calling_thread(self, pipeline):
+        """Test the caller only queues; formatting and I/O run on the listener"""
+        logger, listener, handler, path = pipeline
+        writers = set()
+        original = handler.handle_batch
+        
+        def record_thread(records):
+            writers.add(threading.current_thread().name)
+            original(records)
+            
+        handler.handle_batch = record_thread
+        logger.info("hello")
+        listener.stop()
+        assert writers == {'log-writer'}
+        
+    def test_json_lines(self, pipeline):
+        """Test the JSON formatter emits one parseable object per record"""
+        logger, listener, handler, path = pipeline
+        handler.setFormatter(JsonLinesFormatter())
+        logger.info("move in %s", 'game_1')
+        try:
+            raise RuntimeError('boom')
+        except RuntimeError:
+            logger.error("failed", exc_info=True)
+        listener.stop()
+        entries = [json.loads(line) for line in path.read_text().splitlines()]
+        assert entries[0]['msg'] == 'move in game_1'
+        assert entries[0]['level'] == 'INFO'
+        assert 'RuntimeError: boom' in entries[1]['exc']
+        
+    def test_bad_record_does_not_stop_the_listener(self, pipeline, monkeypatch):
+        """Test a record that fails to format is skipped and later records still arrive"""
+        logger, listener, handler, path = pipeline
+        monkeypatch.setattr(logging, 'raiseExceptions', False)
+        logger.info("before")
+        logger.info("%s %s", 1)
+        logger.info("after")
+        listener.stop()
+        assert [line.rsplit(' ', 1)[1] for line in path.read_text().splitlines()] == ['before', 'after']
+        
+    def test_failing_handler_does_not_stop_the_listener(self, pipeline, monkeypatch):
+        """Test the listener thread survives a handler raising on a batch"""
+        logger, listener, handler, path = pipeline
+        monkeypatch.setattr(logging, 'raiseExceptions', False)
+        original = handler.handle_batch
+        calls = []
+        
+        def fail_once(records):
+            calls.append(len(records))
+            if len(calls) == 1:
+                raise OSError('disk full')
+            original(records)
+            
+        handler.handle_batch = fail_once
+        logger.info("lost")
+        while not calls:
+            time.sleep(0.001)
+        logger.info("kept")
+        listener.stop()
+        assert path.read_text().splitlines()[-1].endswith('kept')
+
+
+class TestListenerShutdown:
+    """Test the listener stops even when records arrive while stopping"""
+    
+    def test_record_behind_the_sentinel(self, tmp_path):
+        """Test a batch with a record after the stop sentinel is written and ends the thread"""
+        path = tmp_path / 'test.log'
+        handler = BatchFileHandler(str(path))
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log_queue = queue.SimpleQueue()
+        listener = BatchingQueueListener(log_queue, [handler])
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, 'late', None, None)
+        log_queue.put(listener._stop)
+        log_queue.put(record)
+        listener.start()
+        listener._thread.join(5)
+        assert not listener._thread.is_alive()
+        handler.close()
+        assert path.read_text() == 'late\n'
+        
+    def test_shutdown_detaches_the_queue_handler(self):
+        """Test shutdown_logging removes the root queue handler before stopping"""
+        root = logging.getLogger()
+        level, handlers = root.level, root.handlers[:]
+        try:
+            configure_logging(None)
+            queue_handlers = [h for h in root.handlers if isinstance(h, RecordQueueHandler)]
+            assert len(queue_handlers) == 1
+            shutdown_logging()
+            assert queue_handlers[0] not in root.handlers
+        finally:
+            shutdown_logging()
+            for handler in root.handlers[:]:
+                if handler not in handlers:
+                    root.removeHandler(handler)
+            root.setLevel(level)
+
+
+class TestMoveSampler:
+    """Test sampling of per-move records"""
+    
+    def test_keeps_one_in_n(self):
+        """Test a rate of 0.1 keeps every tenth record"""
+        sampler = MoveSampler(0.1)
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, 'm', None, None)
+        assert sum(sampler.filter(record) for _ in range(1000)) == 100
+        
+    def test_rejects_invalid_rate(self):
+        """Test rates outside (0, 1] are rejected"""
+        for rate in (0, -1, 1.5):
+            with pytest.raises(ValueError):
+                MoveSampler(rate)
@@ -0,0 +1,83 @@
+"""
+Tests for the metrics registry and the /metrics route
+"""
+import gc
+import threading
+
+import pytest
+
+from app import metrics, server
+from app.game_logic import GameManager
+
+
+@pytest.fixture
+def client():
+    return server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False}).test_client()
+
+
+def sample(text, series):
+    """Value of one series in Prometheus text, 0 if absent"""
+    for line in text.splitlines():
+        if line.startswith(series + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+class TestShardedMetrics:
+    """Test per-thread counters and histograms"""
+    
+    def test_counter_sums_threads_and_keeps_retired_shards(self):
+        """Test counts from finished threads survive their shards"""
+        counter = metrics.Counter()
+        
+        def work():
+            for _ in range(1000):
+                counter.inc()
+                
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        del threads, thread
+        gc.collect()
+        assert counter.value == 8000
+        assert counter._shards == {}
+        
+    def test_histogram_buckets(self):
+        """Test observations land in cumulative buckets with count and sum"""
+        histogram = metrics.Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        cumulative, count, total = histogram.snapshot()
+        assert cumulative == [2, 3, 4]
+        assert count == 4
+        assert total == pytest.approx(2.65)
+
+
+class TestMetricsRoute:
+    """Test the /metrics endpoint"""
+    
+    def test_exposes_requests_games_and_ai_time(self, client):
+        """Test route counters, latency histograms, game gauges and AI timings"""
+        before = client.get('/metrics').get_data(as_text=True)
+        client.post('/game', json={'strategy': 'perfect'})
+        client.post('/game')
+        client.post('/game/game_1/move', json={'row': 1, 'col': 1})
+        client.post('/game/game_1/move', json={'row': 1, 'col': 1})
+        
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        text = response.get_data(as_text=True)
+        
+        def delta(series):
+            return sample(text, series) - sample(before, series)
+            
+        assert delta('tictactoe_requests_total{route="create_game",status="201"}') == 2
+        assert delta('tictactoe_requests_total{route="make_move",status="200"}') == 1
+        assert delta('tictactoe_requests_total{route="make_move",status="400"}') == 1
+        assert delta('tictactoe_request_duration_seconds_count{route="make_move"}') == 2
+        assert delta('tictactoe_ai_move_seconds_count{strategy="perfect"}') == 1
+        assert sample(text, 'tictactoe_games{state="live"}') == 2
+        assert sample(text, 'tictactoe_game_memory_bytes') > 0
@@ -0,0 +1,46 @@
+"""
+Unit tests for the precomputed outcome table
+"""
+from app import outcome_table
+from app.bitboard import encode
+
+
+class TestOutcomeTable:
+    """Test the outcome table"""
+    
+    def test_table_covers_all_reachable_positions(self):
+        """Test the table holds exactly the 5,478 legal positions"""
+        assert len(outcome_table.get_table()) == 5478
+        
+    def test_empty_board_is_a_draw_with_best_play(self):
+        """Test the empty board is solved as a draw"""
+        position = outcome_table.lookup(0, 0)
+        assert position.result is None
+        assert position.status == 'in_progress'
+        assert position.value == 0
+        assert len(position.available) == 9
+        
+    def test_terminal_position(self):
+        """Test a finished position reports its winner"""
+        # X X X
+        # O O .
+        # . . .
+        position = outcome_table.lookup(0b000000111, 0b000011000)
+        assert position.result == 'player'
+        assert position.status == 'player_wins'
+        assert position.winner == 'player'
+        assert position.value == 1
+        
+    def test_unreachable_position_is_evaluated_without_caching(self):
+        """Test positions outside legal play are evaluated but not stored"""
+        position = outcome_table.lookup(0, 0b001001001)
+        assert position.result == 'server'
+        assert position.value is None
+        assert encode(0, 0b001001001) not in outcome_table.get_table()
+        
+    def test_table_stats(self):
+        """Test build time and size are measured and bounded"""
+        stats = outcome_table.table_stats()
+        assert stats['positions'] == 5478
+        assert stats['build_seconds'] < 2.0
+        assert stats['bytes'] < 4 * 1024 * 1024
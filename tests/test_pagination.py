@@ -0,0 +1,121 @@
+"""
+Unit tests for paginated, indexed game listing
+"""
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore, SQLiteGameStore
+from tests.conftest import finish
+
+
+class TestListGames:
+    """Test cursor pagination and status/winner filters"""
+    
+    def test_pages_follow_creation_order(self, manager):
+        """Test walking the cursors returns every game exactly once, in order"""
+        ids = [manager.create_game().game_id for _ in range(25)]
+        
+        seen = []
+        cursor = None
+        while True:
+            games, cursor = manager.list_games(after=cursor, limit=10)
+            seen.extend(game.game_id for game in games)
+            if cursor is None:
+                break
+        assert seen == ids
+        
+    def test_exact_last_page_has_no_cursor(self, manager):
+        """Test a full final page does not point at an empty one"""
+        for _ in range(10):
+            manager.create_game()
+        games, cursor = manager.list_games(limit=10)
+        assert len(games) == 10
+        assert cursor is None
+        
+    def test_filter_by_status_and_winner(self, manager):
+        """Test secondary indexes follow games as they finish"""
+        ids = [manager.create_game().game_id for _ in range(6)]
+        finish(manager, ids[1], TicTacToeGame.PLAYER)
+        finish(manager, ids[4], TicTacToeGame.SERVER)
+        finish(manager, ids[5], TicTacToeGame.PLAYER)
+        
+        player_wins, _ = manager.list_games(status='player_wins')
+        assert [game.game_id for game in player_wins] == [ids[1], ids[5]]
+        
+        in_progress, _ = manager.list_games(status='in_progress')
+        assert [game.game_id for game in in_progress] == [ids[0], ids[2], ids[3]]
+        
+        server_won, _ = manager.list_games(winner='server')
+        assert [game.game_id for game in server_won] == [ids[4]]
+        
+        draws, cursor = manager.list_games(status='draw')
+        assert draws == [] and cursor is None
+        
+    def test_filtered_pages(self, manager):
+        """Test cursors work together with filters"""
+        ids = [manager.create_game().game_id for _ in range(9)]
+        for game_id in ids[::2]:
+            finish(manager, game_id, TicTacToeGame.PLAYER)
+            
+        first, cursor = manager.list_games(limit=3, status='player_wins')
+        second, cursor = manager.list_games(after=cursor, limit=3, status='player_wins')
+        assert [game.game_id for game in first + second] == ids[::2]
+        assert cursor is None
+
+
+class TestMemoryIndexes:
+    """Test index maintenance under eviction"""
+    
+    def test_evicted_games_leave_the_listing(self):
+        """Test evicted games leave the index as they are evicted"""
+        manager = GameManager(MemoryGameStore(max_games=10))
+        for _ in range(500):
+            manager.create_game()
+            
+        games, cursor = manager.list_games(limit=100)
+        assert [game.game_id for game in games] == [f"game_{n}" for n in range(491, 501)]
+        assert cursor is None
+        assert len(manager.store._order) == 10
+        assert [game.game_id for game in manager.get_all_games()][0] == "game_491"
+        
+    def test_archived_game_is_listed_once_when_resident_again(self, tmp_path):
+        """Test a game read back from the archive keeps a single index entry"""
+        archive = SQLiteGameStore(str(tmp_path / 'archive.db'))
+        manager = GameManager(MemoryGameStore(max_games=2, archive=archive))
+        for _ in range(3):
+            manager.create_game()
+        with manager.locked_game('game_1') as game:
+            game.make_move(1, 1, TicTacToeGame.PLAYER)
+            
+        store = manager.store
+        assert store._order.live() == [1, 3]
+        first, cursor = manager.list_games(limit=1)
+        rest, _ = manager.list_games(after=cursor, limit=10)
+        assert [game.game_id for game in first + rest] == ['game_1', 'game_3']
+        assert [game.game_id for game in manager.get_all_games()] == ['game_1', 'game_3']
+        in_progress, _ = manager.list_games(status='in_progress')
+        assert [game.game_id for game in in_progress] == ['game_1', 'game_3']
+        
+    def test_page_cost_does_not_grow_with_finished_games(self):
+        """Test a filtered page reads only the games it returns, however many games finished before them"""
+        class CountingDict(dict):
+            reads = 0
+            
+            def get(self, key, default=None):
+                CountingDict.reads += 1
+                return super().get(key, default)
+                
+        manager = GameManager(MemoryGameStore())
+        for _ in range(3000):
+            manager.create_game()
+        for n in range(1, 1500):
+            finish(manager, f"game_{n}", TicTacToeGame.PLAYER)
+        finish(manager, "game_2000", TicTacToeGame.SERVER)
+        store = manager.store
+        store.games = CountingDict(store.games)
+        
+        games, cursor = manager.list_games(limit=100, status='in_progress')
+        assert games[0].game_id == "game_1500"
+        assert CountingDict.reads == 100
+        manager.list_games(after=cursor, limit=100, status='in_progress')
+        assert CountingDict.reads == 200
+        assert len(store._by_status['in_progress']) == 1500
+        assert len(store._by_status['player_wins']) == 1499
@@ -0,0 +1,102 @@
+"""
+Unit tests for in-memory game retention (LRU cap and TTLs)
+"""
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore, SQLiteGameStore
+from tests.conftest import finish
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+
+class TestRetention:
+    """Test eviction policies of MemoryGameStore"""
+    
+    def test_unbounded_by_default(self):
+        """Test nothing is evicted without a policy"""
+        manager = GameManager()
+        for _ in range(100):
+            manager.create_game()
+        assert manager.stats()['resident'] == 100
+        assert manager.stats()['evicted'] == 0
+        
+    def test_lru_cap_evicts_least_recently_used(self):
+        """Test the cap evicts the in-progress game touched longest ago"""
+        clock = FakeClock()
+        manager = GameManager(MemoryGameStore(max_games=2, clock=clock))
+        first = manager.create_game()
+        clock.now = 1
+        second = manager.create_game()
+        clock.now = 2
+        manager.get_game(first.game_id)
+        clock.now = 3
+        manager.create_game()
+        
+        assert first.game_id in manager.games
+        assert second.game_id not in manager.games
+        assert manager.stats()['evicted_by_reason'] == {'capacity': 1}
+        
+    def test_cap_prefers_finished_games(self):
+        """Test finished games are evicted before in-progress ones"""
+        manager = GameManager(MemoryGameStore(max_games=2))
+        active = manager.create_game()
+        done = manager.create_game()
+        finish(manager, done.game_id)
+        manager.create_game()
+        
+        assert active.game_id in manager.games
+        assert done.game_id not in manager.games
+        
+    def test_idle_ttl(self):
+        """Test untouched in-progress games expire"""
+        clock = FakeClock()
+        manager = GameManager(MemoryGameStore(idle_ttl=60, clock=clock))
+        idle = manager.create_game()
+        busy = manager.create_game()
+        clock.now = 50
+        with manager.locked_game(busy.game_id) as game:
+            game.make_move(1, 1, TicTacToeGame.PLAYER)
+        clock.now = 70
+        manager.create_game()
+        
+        assert idle.game_id not in manager.games
+        assert busy.game_id in manager.games
+        assert manager.stats()['evicted_by_reason'] == {'idle_ttl': 1}
+        
+    def test_finished_ttl(self):
+        """Test finished games expire after their own TTL"""
+        clock = FakeClock()
+        manager = GameManager(MemoryGameStore(idle_ttl=1000, finished_ttl=10, clock=clock))
+        done = manager.create_game()
+        finish(manager, done.game_id)
+        clock.now = 5
+        manager.create_game()
+        assert done.game_id in manager.games
+        
+        clock.now = 11
+        manager.create_game()
+        assert done.game_id not in manager.games
+        assert manager.stats()['resident'] == 2
+        assert manager.stats()['evicted'] == 1
+        
+    def test_evicted_games_spill_to_archive(self, tmp_path):
+        """Test evicted games are archived and can still be read and resumed"""
+        archive = SQLiteGameStore(str(tmp_path / 'archive.db'))
+        manager = GameManager(MemoryGameStore(max_games=1, archive=archive))
+        first = manager.create_game()
+        with manager.locked_game(first.game_id) as game:
+            game.make_move(1, 1, TicTacToeGame.PLAYER)
+        manager.create_game()
+        
+        assert first.game_id not in manager.games
+        archived = manager.get_game(first.game_id)
+        assert archived.board[1][1] == 'X'
+        
+        with manager.locked_game(first.game_id) as game:
+            assert game.make_move(0, 0, TicTacToeGame.PLAYER)
+        assert first.game_id in manager.games
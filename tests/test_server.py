@@ -0,0 +1,241 @@
+"""
+Tests for the Flask routes
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app import metrics, profiler, server
+from app.game_logic import GameManager
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def client():
+    return server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False}).test_client()
+
+
+class TestAppFactory:
+    """Test importing the server module has no side effects"""
+    
+    def test_import_creates_nothing(self, tmp_path):
+        """Test a fresh interpreter importing app.server gets no log directory, handlers or app"""
+        code = (
+            "import logging, os, app.server\n"
+            "assert not os.path.exists('logs'), 'logs directory created'\n"
+            "assert logging.getLogger().handlers == [], logging.getLogger().handlers\n"
+            "assert 'app' not in vars(app.server) and 'game_manager' not in vars(app.server)\n"
+        )
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        result = subprocess.run([sys.executable, '-c', code], cwd=str(tmp_path), env=env,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestExport:
+    """Test the streaming NDJSON export"""
+    
+    def test_export_streams_games_with_moves(self, client):
+        """Test each game is one line with its moves inline"""
+        for _ in range(3):
+            client.post('/game')
+        client.post('/game/game_2/move', json={'row': 1, 'col': 1})
+        
+        response = client.get('/games/export')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['game_id'] for line in lines] == ['game_1', 'game_2', 'game_3']
+        assert len(lines[1]['moves']) == 2
+        assert lines[1]['moves'][0]['position'] == {'row': 1, 'col': 1}
+        
+    def test_export_spans_pages_and_resumes(self, client, monkeypatch):
+        """Test the export walks every page and resumes from a line's cursor"""
+        monkeypatch.setattr(server, 'EXPORT_PAGE_SIZE', 2)
+        for _ in range(5):
+            client.post('/game')
+            
+        lines = [json.loads(line) for line in client.get('/games/export').get_data(as_text=True).splitlines()]
+        assert len(lines) == 5
+        
+        resumed = client.get(f"/games/export?after={lines[2]['cursor']}").get_data(as_text=True).splitlines()
+        assert [json.loads(line)['game_id'] for line in resumed] == ['game_4', 'game_5']
+        
+    def test_export_rejects_bad_cursor(self, client):
+        """Test invalid cursors are rejected before streaming starts"""
+        assert client.get('/games/export?after=abc').status_code == 400
+
+
+class TestBatchMoves:
+    """Test the batch move endpoint"""
+    
+    def test_batch_matches_single_move_semantics(self, client):
+        """Test each item gets the same result a single move request would"""
+        client.post('/game')
+        client.post('/game')
+        
+        response = client.post('/games/moves', json={'moves': [
+            {'game_id': 'game_1', 'row': 1, 'col': 1},
+            {'game_id': 'game_2', 'row': 0, 'col': 0},
+            {'game_id': 'game_1', 'row': 1, 'col': 1},
+            {'game_id': 'missing', 'row': 0, 'col': 0},
+            {'game_id': 'game_2', 'row': 3, 'col': 0},
+            {'row': 0, 'col': 0}
+        ]})
+        assert response.status_code == 200
+        results = response.get_json()['results']
+        assert [r['code'] for r in results] == [200, 200, 400, 404, 400, 400]
+        assert results[0]['body']['message'] == 'Your turn!'
+        assert results[2]['body']['details'] == 'Position is already occupied or invalid'
+        assert len(client.get('/game/game_1/moves').get_json()['moves']) == 2
+        assert len(client.get('/game/game_2/moves').get_json()['moves']) == 2
+        
+    def test_batch_rejects_bad_envelope(self, client, monkeypatch):
+        """Test malformed or oversized batches are rejected as a whole"""
+        monkeypatch.setattr(server, 'MAX_BATCH_SIZE', 2)
+        client.post('/game')
+        assert client.post('/games/moves', json={}).status_code == 400
+        assert client.post('/games/moves', json={'moves': []}).status_code == 400
+        move = {'game_id': 'game_1', 'row': 0, 'col': 0}
+        assert client.post('/games/moves', json={'moves': [move] * 3}).status_code == 400
+        assert client.get('/game/game_1/moves').get_json()['moves'] == []
+
+
+class TestConditionalGet:
+    """Test ETags and the fragment cache on the polled read routes"""
+    
+    def test_moves_not_modified_until_a_move(self, client):
+        """Test If-None-Match gets 304 until the game changes"""
+        client.post('/game')
+        first = client.get('/game/game_1/moves')
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+        
+        cached = client.get('/game/game_1/moves', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.headers['ETag'] == etag
+        assert cached.data == b''
+        
+        client.post('/game/game_1/move', json={'row': 1, 'col': 1})
+        changed = client.get('/game/game_1/moves', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert len(changed.get_json()['moves']) == 2
+        
+    def test_etag_differs_between_stores(self, client):
+        """Test a game with the same ID and version in another process's store is not 304"""
+        client.post('/game')
+        client.post('/game/game_1/move', json={'row': 0, 'col': 0})
+        etag = client.get('/game/game_1/moves').headers['ETag']
+        listing = client.get('/games').headers['ETag']
+        
+        other = server.create_app({'GAME_MANAGER': GameManager(), 'LOGGING': False}).test_client()
+        other.post('/game')
+        other.post('/game/game_1/move', json={'row': 2, 'col': 2})
+        response = other.get('/game/game_1/moves', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['moves'][0]['position'] == {'row': 2, 'col': 2}
+        assert other.get('/games', headers={'If-None-Match': listing}).status_code == 200
+        
+    def test_games_page_etag_tracks_every_game(self, client):
+        """Test the listing's ETag changes when any game on the page changes"""
+        client.post('/game')
+        client.post('/game')
+        etag = client.get('/games').headers['ETag']
+        assert client.get('/games', headers={'If-None-Match': etag}).status_code == 304
+        
+        client.post('/game/game_2/move', json={'row': 0, 'col': 0})
+        response = client.get('/games', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert [game['game_id'] for game in body['games']] == ['game_1', 'game_2']
+        assert body['games'][1]['board'][0][0] == 'X'
+        assert body['next_cursor'] is None
+        
+    def test_unchanged_games_are_served_from_cache(self, client):
+        """Test summaries of unchanged games are not serialized again"""
+        client.post('/game')
+        client.post('/game')
+        client.get('/games')
+        client.post('/game/game_2/move', json={'row': 0, 'col': 0})
+        
+        hits = metrics.FRAGMENT_LOOKUPS.labels('summary', 'hit')
+        misses = metrics.FRAGMENT_LOOKUPS.labels('summary', 'miss')
+        before = hits.value, misses.value
+        client.get('/games')
+        assert (hits.value - before[0], misses.value - before[1]) == (1, 1)
+
+
+class TestProfiler:
+    """Test the admin sampling profiler route"""
+    
+    TOKEN = {'Authorization': 'Bearer secret'}
+    
+    def test_disabled_by_default(self, monkeypatch):
+        """Test the route does not exist without a configured token"""
+        monkeypatch.delenv('TICTACTOE_PROFILER_TOKEN', raising=False)
+        client = server.create_app({'LOGGING': False}).test_client()
+        assert client.post('/admin/profile?seconds=0.1', headers=self.TOKEN).status_code == 404
+        
+    def test_requires_token(self, client):
+        """Test callers without the admin token are refused"""
+        client.application.config['PROFILER_TOKEN'] = 'secret'
+        response = client.post('/admin/profile?seconds=0.1', headers={'Authorization': 'Bearer guess'})
+        assert response.status_code == 401
+        assert client.post('/admin/profile?seconds=0', headers=self.TOKEN).status_code == 400
+        assert client.post('/admin/profile?format=svg', headers=self.TOKEN).status_code == 400
+        for query in ('seconds=nan', 'seconds=inf', 'interval=nan', 'interval=inf', 'interval=-inf'):
+            assert client.post(f'/admin/profile?{query}', headers=self.TOKEN).status_code == 400
+            
+    def test_seconds_capped_by_config(self, client):
+        """Test profiles longer than PROFILER_MAX_SECONDS are refused before sampling"""
+        client.application.config['PROFILER_TOKEN'] = 'secret'
+        client.application.config['PROFILER_MAX_SECONDS'] = 5
+        response = client.post('/admin/profile?seconds=10', headers=self.TOKEN)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'seconds must be between 0 and 5'
+        assert server.config_from_env({'TICTACTOE_PROFILER_MAX_SECONDS': '25'})['PROFILER_MAX_SECONDS'] == 25.0
+        
+    def test_samples_request_threads(self, client):
+        """Test stacks of requests running on other threads are attributed to their routes"""
+        client.application.config['PROFILER_TOKEN'] = 'secret'
+        stop = threading.Event()
+        
+        def load():
+            other = client.application.test_client()
+            while not stop.is_set():
+                game_id = other.post('/game', json={'strategy': 'perfect'}).get_json()['game_id']
+                other.post(f'/game/{game_id}/move', json={'row': 0, 'col': 0})
+                
+        worker = threading.Thread(target=load)
+        worker.start()
+        try:
+            response = client.post('/admin/profile?seconds=0.5&interval=0.001', headers=self.TOKEN)
+            collapsed = client.post('/admin/profile?seconds=0.2&interval=0.001&format=collapsed',
+                                    headers=self.TOKEN)
+        finally:
+            stop.set()
+            worker.join()
+            
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['samples'] > 0
+        assert set(body['routes']) <= {'create_game', 'make_move'}
+        assert sum(route['samples'] for route in body['routes'].values()) == body['samples']
+        first = body['collapsed'].splitlines()[0]
+        assert first.split(';')[1] in ('app.server:create_game', 'app.server:make_move')
+        assert collapsed.mimetype == 'text/plain'
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in collapsed.get_data(as_text=True).splitlines())
+        
+    def test_one_profile_at_a_time(self, client):
+        """Test a profile requested while another runs is refused"""
+        client.application.config['PROFILER_TOKEN'] = 'secret'
+        with profiler._running:
+            assert client.post('/admin/profile?seconds=0.1', headers=self.TOKEN).status_code == 409
@@ -0,0 +1,46 @@
+"""
+Unit tests for headless self-play
+"""
+import pytest
+
+from app.game_logic import STATUS_CODES, TicTacToeGame
+from app.simulate import read_games, simulate
+
+
+def test_games_follow_the_server_rules(tmp_path):
+    """Test every simulated game replays to the same result through TicTacToeGame"""
+    path = str(tmp_path / 'games.bin')
+    stats = simulate(500, output=path, batch=128, seed=1)
+    games = list(read_games(path))
+    
+    assert len(games) == stats['games'] == 500
+    for code, cells in games:
+        game = TicTacToeGame("test_game_1")
+        for turn, cell in enumerate(cells):
+            assert game.status == 'in_progress'
+            game.make_move(*divmod(cell, 3), TicTacToeGame.SERVER if turn % 2 else TicTacToeGame.PLAYER)
+            game.update_status()
+        assert STATUS_CODES[game.status] == code
+    assert sum(stats['results'].values()) == sum(stats['lengths'].values()) == 500
+
+
+def test_perfect_play():
+    """Test perfect play never loses"""
+    assert simulate(300, 'perfect', 'perfect', seed=1)['results'] == {'player_wins': 0, 'server_wins': 0, 'draw': 300}
+    assert simulate(300, 'random', 'perfect', seed=1)['results']['player_wins'] == 0
+
+
+def test_process_pool_matches_serial(tmp_path):
+    """Test seeded games do not depend on the number of workers"""
+    serial = str(tmp_path / 'serial.bin')
+    pooled = str(tmp_path / 'pooled.bin')
+    simulate(300, output=serial, batch=100, seed=7)
+    simulate(300, output=pooled, batch=100, seed=7, workers=2)
+    
+    assert list(read_games(serial)) == list(read_games(pooled))
+
+
+def test_unknown_policy():
+    """Test an unknown policy is rejected"""
+    with pytest.raises(ValueError):
+        simulate(1, player='clairvoyant')
@@ -0,0 +1,111 @@
+"""
+Unit tests for the GameManager storage backends
+"""
+import multiprocessing
+
+import pytest
+
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import GameStore, SQLiteGameStore
+
+
+def create_games(path, count):
+    manager = GameManager(SQLiteGameStore(path))
+    for _ in range(count):
+        game = manager.create_game()
+        with manager.locked_game(game.game_id) as locked:
+            locked.make_move(1, 1, TicTacToeGame.PLAYER)
+            locked.make_server_move()
+            locked.update_status()
+
+
+class TestStores:
+    """Behaviour shared by every backend"""
+    
+    def test_create_and_get(self, manager):
+        """Test created games can be read back"""
+        game = manager.create_game('perfect')
+        stored = manager.get_game(game.game_id)
+        assert stored.game_id == "game_1"
+        assert stored.strategy == 'perfect'
+        assert manager.game_counter == 1
+        assert len(manager.games) == 1
+        
+    def test_locked_game_persists_changes(self, manager):
+        """Test changes made inside locked_game are visible afterwards"""
+        game = manager.create_game()
+        with manager.locked_game(game.game_id) as locked:
+            for col in range(3):
+                locked.make_move(0, col, TicTacToeGame.PLAYER)
+            locked.update_status()
+            
+        stored = manager.get_game(game.game_id)
+        assert stored.board[0] == ['X', 'X', 'X']
+        assert stored.status == 'player_wins'
+        assert len(stored.get_moves()) == 3
+        
+    def test_all_games_in_creation_order(self, manager):
+        """Test games are listed in creation order"""
+        ids = [manager.create_game().game_id for _ in range(5)]
+        assert [game.game_id for game in manager.get_all_games()] == ids
+        
+    def test_missing_game(self, manager):
+        """Test unknown games are reported as None"""
+        assert manager.get_game("nonexistent") is None
+        with manager.locked_game("nonexistent") as game:
+            assert game is None
+            
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test a backend missing part of the interface fails when instantiated"""
+        class ReadOnly(GameStore):
+            games = {}
+            game_counter = 0
+            
+            def get(self, game_id):
+                return None
+                
+        with pytest.raises(TypeError):
+            ReadOnly()
+            
+    def test_large_board_round_trip(self, manager):
+        """Test board size, k and an incremental win survive storage"""
+        game = manager.create_game(size=9, k=4)
+        with manager.locked_game(game.game_id) as locked:
+            for row in range(4):
+                locked.make_move(row, row, TicTacToeGame.SERVER)
+                
+        stored = manager.get_game(game.game_id)
+        assert (stored.size, stored.k) == (9, 4)
+        assert stored.check_winner() == 'server'
+
+
+class TestSQLiteGameStore:
+    """Behaviour specific to the shared SQLite backend"""
+    
+    def test_games_shared_between_managers(self, tmp_path):
+        """Test two managers on the same file see each other's games"""
+        path = str(tmp_path / 'games.db')
+        first = GameManager(SQLiteGameStore(path))
+        second = GameManager(SQLiteGameStore(path))
+        
+        game = first.create_game()
+        assert second.get_game(game.game_id) is not None
+        assert second.create_game().game_id == "game_2"
+        
+    def test_concurrent_processes(self, tmp_path):
+        """Test worker processes allocate unique IDs and keep every move"""
+        path = str(tmp_path / 'games.db')
+        SQLiteGameStore(path)
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=create_games, args=(path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            assert worker.exitcode == 0
+            
+        manager = GameManager(SQLiteGameStore(path))
+        games = manager.get_all_games()
+        assert len(games) == 100
+        assert len({game.game_id for game in games}) == 100
+        assert all(len(game.get_moves()) == 2 for game in games)
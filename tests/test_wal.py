@@ -0,0 +1,175 @@
+"""
+Unit tests for the move log and snapshot recovery
+"""
+import copy
+import os
+import threading
+
+import pytest
+
+from app.game_logic import GameManager, TicTacToeGame
+from app.storage import MemoryGameStore
+from app.wal import FSYNC_POLICIES, MoveLog, MoveLogLocked, decode_game, encode_game
+
+
+def open_manager(directory, **kwargs):
+    return GameManager(MemoryGameStore(wal=MoveLog(str(directory), **kwargs)))
+
+
+def play(manager, game_id, row, col):
+    with manager.locked_game(game_id) as game:
+        game.make_move(row, col, TicTacToeGame.PLAYER)
+        game.update_status()
+
+
+def state(manager):
+    return copy.deepcopy({game_id: game.to_record() for game_id, game in manager.games.items()})
+
+
+class TestRecovery:
+    """Rebuilding a store from the snapshot and the log"""
+    
+    @pytest.mark.parametrize('fsync', FSYNC_POLICIES)
+    def test_recover_from_log(self, tmp_path, fsync):
+        """Test games and moves come back from the log alone"""
+        manager = open_manager(tmp_path, fsync=fsync)
+        first = manager.create_game('perfect').game_id
+        second = manager.create_game('random', size=5, k=4).game_id
+        play(manager, first, 0, 0)
+        play(manager, second, 2, 2)
+        with manager.locked_game(first) as game:
+            game.make_server_move()
+            game.update_status()
+        expected = state(manager)
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        assert state(recovered) == expected
+        assert recovered.game_counter == 2
+        assert recovered.create_game().game_id == 'game_3'
+        recovered.store.wal.close()
+        
+    def test_finished_games_are_indexed(self, tmp_path):
+        """Test a game that finished before the crash is listed as finished"""
+        manager = open_manager(tmp_path)
+        game_id = manager.create_game().game_id
+        for col in range(3):
+            play(manager, game_id, 0, col)
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        games, _ = recovered.list_games(status='player_wins')
+        assert [game.game_id for game in games] == [game_id]
+        assert recovered.list_games(status='in_progress')[0] == []
+        recovered.store.wal.close()
+        
+    def test_snapshot_and_tail(self, tmp_path):
+        """Test a snapshot plus the log written after it restores everything"""
+        manager = open_manager(tmp_path)
+        before = manager.create_game().game_id
+        play(manager, before, 1, 1)
+        manager.store.wal.snapshot()
+        after = manager.create_game().game_id
+        play(manager, before, 0, 0)
+        play(manager, after, 2, 2)
+        expected = state(manager)
+        manager.store.wal.close()
+        
+        logs = [name for name in os.listdir(tmp_path) if name.endswith('.log')]
+        assert len(logs) == 1
+        recovered = open_manager(tmp_path)
+        assert state(recovered) == expected
+        recovered.store.wal.close()
+        
+    def test_snapshot_then_recover_again(self, tmp_path):
+        """Test recovery after a snapshot taken by a recovered store"""
+        manager = open_manager(tmp_path)
+        game_id = manager.create_game().game_id
+        play(manager, game_id, 1, 1)
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        recovered.store.wal.snapshot()
+        play(recovered, game_id, 0, 0)
+        expected = state(recovered)
+        recovered.store.wal.close()
+        
+        again = open_manager(tmp_path)
+        assert state(again) == expected
+        assert len(again.games[game_id].moves) == 2
+        again.store.wal.close()
+        
+    def test_torn_tail_is_ignored(self, tmp_path):
+        """Test a half-written last record is dropped and the rest recovered"""
+        manager = open_manager(tmp_path)
+        game_id = manager.create_game().game_id
+        play(manager, game_id, 1, 1)
+        expected = state(manager)
+        play(manager, game_id, 0, 0)
+        manager.store.wal.close()
+        
+        log = os.path.join(tmp_path, sorted(os.listdir(tmp_path))[-1])
+        with open(log, 'r+b') as f:
+            f.truncate(os.path.getsize(log) - 3)
+        recovered = open_manager(tmp_path)
+        assert state(recovered) == expected
+        recovered.store.wal.close()
+        
+    def test_evicted_games_stay_evicted(self, tmp_path):
+        """Test games dropped by retention are not brought back by recovery"""
+        manager = GameManager(MemoryGameStore(max_games=2, wal=MoveLog(str(tmp_path))))
+        ids = [manager.create_game().game_id for _ in range(3)]
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        assert sorted(recovered.games) == sorted(ids[1:])
+        assert recovered.game_counter == 3
+        recovered.store.wal.close()
+        
+    def test_concurrent_moves(self, tmp_path):
+        """Test moves from many threads sharing group commits are all recovered"""
+        manager = open_manager(tmp_path)
+        ids = [manager.create_game(size=7, k=7).game_id for _ in range(8)]
+        
+        def worker(game_id):
+            for cell in range(10):
+                play(manager, game_id, *divmod(cell, 5))
+                
+        threads = [threading.Thread(target=worker, args=(game_id,)) for game_id in ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = state(manager)
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        assert state(recovered) == expected
+        assert all(len(game.moves) == 10 for game in recovered.games.values())
+        recovered.store.wal.close()
+        
+    def test_directory_is_locked_while_open(self, tmp_path):
+        """Test a second log on the same directory fails until the first is closed"""
+        manager = open_manager(tmp_path)
+        manager.create_game()
+        with pytest.raises(MoveLogLocked):
+            open_manager(tmp_path)
+        manager.store.wal.close()
+        
+        recovered = open_manager(tmp_path)
+        assert list(recovered.games) == ['game_1']
+        recovered.store.wal.close()
+        
+    def test_invalid_policy(self, tmp_path):
+        """Test an unknown fsync policy is rejected"""
+        with pytest.raises(ValueError):
+            MoveLog(str(tmp_path), fsync='sometimes')
+
+
+def test_snapshot_encoding_round_trip():
+    """Test the binary snapshot form preserves a game record"""
+    game = TicTacToeGame('game_42', 'random', 4, 3)
+    game.make_move(0, 3, TicTacToeGame.PLAYER)
+    game.make_move(3, 0, TicTacToeGame.SERVER)
+    game.update_status()
+    assert TicTacToeGame.from_record(decode_game(encode_game(game.to_record()))).to_record() == game.to_record()